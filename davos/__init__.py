@@ -24,30 +24,32 @@ __all__ = [
     'require_pip',
     'require_python',
     'smuggle',
+    'startup_report',
     'use_default_project'
 ]
 
 
 import sys
+import time
 import warnings
 from types import ModuleType
 
-from packaging.specifiers import InvalidSpecifier, SpecifierSet
-if sys.version_info < (3, 8):
-    import importlib_metadata as metadata
-else:
-    from importlib import metadata
+_import_start = time.perf_counter()
 
-from davos.core.config import DavosConfig
-
-
-__version__ = metadata.version('davos')
+from davos.core.config import (
+    _STARTUP_CACHE_PATH,
+    _startup_step,
+    _STARTUP_STEPS,
+    DavosConfig
+)
 
 # config must be instantiated before importing implementations module
 config = DavosConfig()
 
 
-import davos.implementations
+with _startup_step('load environment implementations'):
+    import davos.implementations
+from davos.core.catalog import catalog_projects
 from davos.core.core import smuggle
 from davos.core.exceptions import DavosConfigError, DavosError
 from davos.core.project import (
@@ -104,6 +106,25 @@ class ConfigProxyModule(ModuleType):
         else:
             super().__setattr__(name, value)
 
+    @property
+    def __version__(self):
+        """
+        Get the installed version of davos.
+
+        Read from the package metadata when accessed, rather than on
+        import, since loading `importlib.metadata` is relatively slow.
+
+        Returns
+        -------
+        str
+            The installed version of davos.
+        """
+        if sys.version_info < (3, 8):
+            import importlib_metadata as metadata
+        else:
+            from importlib import metadata
+        return metadata.version('davos')
+
     @property
     def all_projects(self):
         """
@@ -112,13 +133,11 @@ class ConfigProxyModule(ModuleType):
         Returns
         -------
         list of AbstractProject or ConcreteProject
-            A list of projects found in `DAVOS_PROJECT_DIR`.
+            A list of projects in `DAVOS_PROJECT_DIR`, read from the
+            project catalog (see `davos.core.catalog`) after
+            reconciling it with the directories in `DAVOS_PROJECT_DIR`.
         """
-        projects_list = []
-        for path in DAVOS_PROJECT_DIR.iterdir():
-            if path.is_dir():
-                projects_list.append(Project(path.name))
-        return projects_list
+        return [Project(entry['safe_name']) for entry in catalog_projects()]
 
 
 # pylint: disable=unused-argument
@@ -126,11 +145,16 @@ def configure(
         *,
         active=...,
         auto_rerun=...,
+        base_projects=...,
         confirm_install=...,
+        install_timeout=...,
+        max_projects_bytes=...,
         noninteractive=...,
         pip_executable=...,
         project=...,
-        suppress_stdout=...
+        show_progress=...,
+        suppress_stdout=...,
+        use_lockfile=...
 ):
     """
     Set multiple `davos.config` fields at once.
@@ -142,8 +166,14 @@ def configure(
     auto_rerun : bool, optional
         Value to assign to "`auto_rerun`" field. Must be `False`
         (default) in Colaboratory notebooks.
+    base_projects : iterable of str, pathlib.Path, or davos.Project, optional
+        Value to assign to "`base_projects`" field.
     confirm_install : bool, optional
         Value to assign to "`confirm_install`" field.
+    install_timeout : int, float, or None, optional
+        Value to assign to "`install_timeout`" field.
+    max_projects_bytes : int or None, optional
+        Value to assign to "`max_projects_bytes`" field.
     noninteractive : bool, optional
         Value to assign to "`noninteractive`" field. Must be `False`
         (default) in Colaboratory notebooks.
@@ -152,8 +182,12 @@ def configure(
         real file.
     project : str, pathlib.Path, None, or davos.Project, optional
         Value to assign to "`project`" field.
+    show_progress : bool, optional
+        Value to assign to "`show_progress`" field.
     suppress_stdout : bool, optional
         Value to assign to "`suppress_stdout`" field.
+    use_lockfile : bool, optional
+        Value to assign to "`use_lockfile`" field.
 
     Raises
     -------
@@ -221,7 +255,10 @@ def configure(
 
     for name, new_value in kwargs.items():
         if new_value is not Ellipsis:
-            old_value = getattr(config, name)
+            # read the underlying attribute rather than the property so
+            # that, e.g., setting `project` doesn't first determine the
+            # (lazily initialized) default project
+            old_value = getattr(config, f"_{name}")
             try:
                 setattr(config, name, new_value)
             except Exception:
@@ -279,6 +316,8 @@ def require_pip(version_spec, warn=False, extra_msg=None, prereleases=None):
     require_python :
         Analogous function for constraining the user's Python version.
     """
+    from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
     valid_specifiers = ('===', '==', '<=', '>=', '!=', '~=', '<', '>')
     for spec in valid_specifiers:
         if version_spec.startswith(spec):
@@ -292,6 +331,11 @@ def require_pip(version_spec, warn=False, extra_msg=None, prereleases=None):
             )
 
     version_constraint = SpecifierSet(version_spec, prereleases=prereleases)
+    if sys.version_info < (3, 8):
+        import importlib_metadata as metadata
+    else:
+        from importlib import metadata
+
     pip_version = metadata.version('pip')
     if pip_version not in version_constraint:
         msg = (
@@ -372,6 +416,8 @@ def require_python(version_spec, warn=False, extra_msg=None, prereleases=None):
         Analogous function for constraining the pip version used to
         install missing packages.
     """
+    from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
     valid_specifiers = ('===', '==', '<=', '>=', '!=', '~=', '<', '>')
     for spec in valid_specifiers:
         if version_spec.startswith(spec):
@@ -401,10 +447,50 @@ def require_python(version_spec, warn=False, extra_msg=None, prereleases=None):
             raise DavosError(msg)
 
 
+def startup_report():
+    """
+    Show how long importing `davos` took, and where the time went.
+
+    Prints the total time spent executing the top-level `davos` module,
+    broken down into the steps of initialization that are timed
+    individually (e.g., probing the environment for a `pip` executable).
+    Time not accounted for by any step (mostly spent importing `davos`'s
+    own submodules and their dependencies) is shown as "other". Each
+    step's note shows whether its result was read from the startup
+    cache (`~/.davos/startup-cache.json`), computed, or deferred until
+    it's first needed.
+
+    Examples
+    --------
+    ```
+    import davos
+
+    davos.startup_report()
+    ```
+    """
+    total = _import_seconds
+    lines = [f"import davos: {total * 1000:.1f} ms"]
+    for step in _STARTUP_STEPS:
+        line = f"  {step['seconds'] * 1000:7.1f} ms  {step['label']}"
+        if step['note'] is not None:
+            line = f"{line} ({step['note']})"
+        lines.append(line)
+    other = total - sum(step['seconds'] for step in _STARTUP_STEPS)
+    lines.append(f"  {max(other, 0) * 1000:7.1f} ms  other (module imports)")
+    lines.append(f"startup cache: {_STARTUP_CACHE_PATH}")
+    print('\n'.join(lines))
+
+
 sys.modules[__name__].__class__ = ConfigProxyModule
 
-config.active = True
+with _startup_step('activate'):
+    if config.environment == 'Python':
+        # davos can't (yet) be activated outside of IPython, but it can
+        # still be imported to manage projects from scripts or the
+        # command line
+        config._active = False
+    else:
+        config.active = True
 
 DAVOS_PROJECT_DIR.mkdir(parents=True, exist_ok=True)
-
-use_default_project()
+_import_seconds = time.perf_counter() - _import_start
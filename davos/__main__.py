@@ -0,0 +1,390 @@
+"""
+Command line interface for managing davos projects.
+
+This module makes it possible to inspect and manage the projects in
+`davos.DAVOS_PROJECT_DIR` (`~/.davos/projects/`) from outside of a
+notebook kernel, e.g.:
+```
+python -m davos list
+python -m davos du
+python -m davos freeze ~/notebooks/analysis.ipynb
+python -m davos prune --yes
+python -m davos gc --dry-run
+python -m davos rename ~/old/analysis.ipynb ~/new/analysis.ipynb
+python -m davos reindex
+```
+Projects are read from the project catalog (see `davos.core.catalog`)
+rather than by walking `DAVOS_PROJECT_DIR`, and `IPython` is never
+imported, so commands start quickly enough to be run regularly (e.g.,
+from a cron job) across many users' home directories. Run
+`python -m davos <command> --help` for details on each command.
+"""
+
+
+__all__ = ['main']
+
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+from davos import config
+from davos.core.catalog import (
+    catalog_projects,
+    rebuild_catalog,
+    record_removal
+)
+from davos.core.exceptions import DavosError
+from davos.core.project import (
+    _dir_is_empty,
+    _safename_to_filepath,
+    DAVOS_PROJECT_DIR,
+    get_project,
+    PATHSEP_REPLACEMENT,
+    prune_projects
+)
+
+
+# empty project directories modified more recently than this many hours
+# ago may belong to a running kernel that hasn't installed anything into
+# them yet, so `gc` leaves them alone by default
+_GC_MIN_AGE_HOURS = 24
+
+
+def _cmd_du(args):
+    """Show disk space used by each project (`python -m davos du`)."""
+    # sizes are recorded in the catalog when packages are installed, so
+    # project directories don't need to be walked
+    sizes = [(entry['size_bytes'], entry['name'])
+             for entry in catalog_projects()]
+    sizes.sort(reverse=True)
+    if args.bytes:
+        fmt = str
+    else:
+        fmt = _format_size
+    for size, name in sizes:
+        print(f'{fmt(size)}\t{name}')
+    print(f'{fmt(sum(size for size, _ in sizes))}\ttotal')
+
+
+def _cmd_freeze(args):
+    """Show a project's installed packages (`python -m davos freeze`)."""
+    project = get_project(args.project)
+    if project is None:
+        raise DavosError(f"No project named {args.project!r}")
+    frozen = project.freeze()
+    if frozen:
+        print(frozen)
+
+
+def _cmd_gc(args):
+    """Remove empty projects (`python -m davos gc`)."""
+    # these are normally removed automatically when the interpreter
+    # that created them exits, but may be left behind if it was killed
+    # or crashed
+    # these are also (usually) missing from the catalog, so this walks
+    # `DAVOS_PROJECT_DIR` rather than reading the catalog
+    min_mtime = time.time() - args.min_age * 60 * 60
+    for name, project_dir, _ in _iter_projects():
+        if (
+                _has_installed_packages(project_dir)
+                or _last_modified(project_dir) > min_mtime
+        ):
+            continue
+        if args.dry_run:
+            print(f'would remove\t{name}')
+        else:
+            shutil.rmtree(project_dir, ignore_errors=True)
+            record_removal(project_dir.name)
+            print(f'removed\t{name}')
+
+
+def _cmd_list(args):
+    """List all projects (`python -m davos list`)."""
+    for entry in catalog_projects():
+        name = entry['name']
+        is_abstract = (entry['notebook_path'] is not None
+                       and not os.path.isfile(entry['notebook_path']))
+        if args.abstract and not is_abstract:
+            continue
+        kind = 'abstract' if is_abstract else 'concrete'
+        print(f'{kind}\t{name}')
+
+
+def _cmd_prune(args):
+    """Remove abstract projects (`python -m davos prune`)."""
+    if not args.yes and not sys.stdin.isatty():
+        # can't prompt for confirmation (e.g., when run from a cron job)
+        raise DavosError(
+            "stdin is not a terminal, so removal can't be confirmed. Pass "
+            "--yes to remove projects without confirmation."
+        )
+    prune_projects(yes=args.yes)
+
+
+def _cmd_reindex(args):
+    """Rebuild the project catalog (`python -m davos reindex`)."""
+    rebuild_catalog()
+    n_projects = len(catalog_projects())
+    print(f'indexed {n_projects} project{"" if n_projects == 1 else "s"}')
+
+
+def _cmd_rename(args):
+    """Rename a project (`python -m davos rename`)."""
+    project = get_project(args.project)
+    if project is None:
+        raise DavosError(f"No project named {args.project!r}")
+    project.rename(args.new_name)
+
+
+def _format_size(n_bytes):
+    """
+    Format a number of bytes as a human-readable string.
+
+    Parameters
+    ----------
+    n_bytes : int
+        The number of bytes.
+
+    Returns
+    -------
+    str
+        The size in the largest unit (B, KiB, MiB, GiB, or TiB) in which
+        it's at least 1, e.g., `'1.5 MiB'`.
+    """
+    size = float(n_bytes)
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = 'TiB'
+    if unit == 'B':
+        return f'{int(size)} {unit}'
+    return f'{size:.1f} {unit}'
+
+
+def _has_installed_packages(project_dir):
+    """
+    Check whether any packages are installed in a project directory.
+
+    Checks every `site-packages` directory in the project (there may be
+    more than one if the project was used with multiple Python
+    versions), so that packages installed by other versions of Python
+    are accounted for.
+
+    Parameters
+    ----------
+    project_dir : pathlib.Path
+        The project directory to check.
+
+    Returns
+    -------
+    bool
+        `True` if any `site-packages` directory in the project contains
+        files (other than `.DS_Store`), otherwise `False`.
+    """
+    return any(
+        not _dir_is_empty(site_packages_dir)
+        for site_packages_dir in project_dir.glob('lib/python*/site-packages')
+    )
+
+
+def _last_modified(project_dir):
+    """
+    Get the time a project directory was last modified.
+
+    Parameters
+    ----------
+    project_dir : pathlib.Path
+        The project directory.
+
+    Returns
+    -------
+    float
+        The most recent modification time (in seconds since the epoch)
+        of the project directory or any directory inside it, or `0` if
+        it no longer exists.
+    """
+    last_modified = 0
+    for dirpath, _, _ in os.walk(project_dir):
+        try:
+            last_modified = max(last_modified, os.stat(dirpath).st_mtime)
+        except FileNotFoundError:
+            pass
+    return last_modified
+
+
+def _iter_projects():
+    """
+    Iterate over the projects in `DAVOS_PROJECT_DIR`.
+
+    Reads project directories directly from the filesystem rather than
+    creating `Project` instances.
+
+    Yields
+    ------
+    name : str
+        The project's name (for notebook-specific projects, the path to
+        the notebook).
+    project_dir : pathlib.Path
+        The project's directory.
+    is_abstract : bool
+        Whether the project is an `AbstractProject` (i.e., is
+        notebook-specific, but its notebook no longer exists).
+    """
+    for project_dir in sorted(DAVOS_PROJECT_DIR.iterdir()):
+        if not project_dir.is_dir():
+            # skip .DS_Store files, etc.
+            continue
+        if PATHSEP_REPLACEMENT in project_dir.name:
+            name = _safename_to_filepath(project_dir.name)
+            is_abstract = not os.path.isfile(name)
+        else:
+            name = project_dir.name
+            is_abstract = False
+        yield name, project_dir, is_abstract
+
+
+def _make_parser():
+    """
+    Create the argument parser for the `davos` CLI.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser, with one subparser per command.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m davos',
+        description=(
+            f"Manage davos projects (stored in {DAVOS_PROJECT_DIR})."
+        )
+    )
+    subparsers = parser.add_subparsers(title='commands', dest='command',
+                                       metavar='<command>')
+    subparsers.required = True
+
+    list_parser = subparsers.add_parser(
+        'list',
+        help="List all projects.",
+        description=(
+            "List all projects. Each is shown as 'abstract' (its notebook "
+            "no longer exists) or 'concrete', followed by its name."
+        )
+    )
+    list_parser.add_argument('--abstract', action='store_true',
+                             help="List only abstract projects.")
+    list_parser.set_defaults(func=_cmd_list)
+
+    du_parser = subparsers.add_parser(
+        'du',
+        help="Show disk space used by each project.",
+        description="Show disk space used by each project, largest first."
+    )
+    du_parser.add_argument('-b', '--bytes', action='store_true',
+                           help="Show sizes in bytes.")
+    du_parser.set_defaults(func=_cmd_du)
+
+    freeze_parser = subparsers.add_parser(
+        'freeze',
+        help="List a project's installed packages.",
+        description=(
+            "List a project's installed packages in pip-freeze format."
+        )
+    )
+    freeze_parser.add_argument('project', help="The project's name.")
+    freeze_parser.set_defaults(func=_cmd_freeze)
+
+    prune_parser = subparsers.add_parser(
+        'prune',
+        help="Remove projects whose notebooks no longer exist.",
+        description=(
+            "Remove projects whose notebooks no longer exist. Prompts for "
+            "confirmation before removing each one unless --yes is passed "
+            "(required if stdin is not a terminal)."
+        )
+    )
+    prune_parser.add_argument('-y', '--yes', action='store_true',
+                              help="Don't prompt for confirmation.")
+    prune_parser.set_defaults(func=_cmd_prune)
+
+    gc_parser = subparsers.add_parser(
+        'gc',
+        help="Remove projects with no installed packages.",
+        description=(
+            "Remove project directories that contain no installed packages "
+            "(e.g., left behind by a kernel that was killed before it could "
+            "clean them up) and haven't been modified recently."
+        )
+    )
+    gc_parser.add_argument('-n', '--dry-run', action='store_true',
+                           help="Show what would be removed without "
+                                "removing anything.")
+    gc_parser.add_argument('--min-age', type=float, default=_GC_MIN_AGE_HOURS,
+                           metavar='HOURS',
+                           help="Only remove project directories last "
+                                "modified at least this many hours ago "
+                                "(default: %(default)s), since newer ones may "
+                                "belong to a running kernel.")
+    gc_parser.set_defaults(func=_cmd_gc)
+
+    rename_parser = subparsers.add_parser(
+        'rename',
+        help="Rename a project.",
+        description=(
+            "Rename a project, e.g., to re-link a notebook-specific project "
+            "with its notebook after the notebook was moved or renamed."
+        )
+    )
+    rename_parser.add_argument('project', help="The project's current name.")
+    rename_parser.add_argument('new_name', help="The project's new name.")
+    rename_parser.set_defaults(func=_cmd_rename)
+
+    reindex_parser = subparsers.add_parser(
+        'reindex',
+        help="Rebuild the project catalog.",
+        description=(
+            "Rebuild the project catalog from the contents of the project "
+            "directory, e.g., after projects were added, removed, or "
+            "modified outside of davos."
+        )
+    )
+    reindex_parser.set_defaults(func=_cmd_reindex)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the `davos` command line interface.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command line arguments (not including the program name). If
+        `None` (default), `sys.argv[1:]` is used.
+
+    Returns
+    -------
+    int
+        The exit status: `0` if the command succeeded, `1` if it raised
+        a `davos` error.
+    """
+    parser = _make_parser()
+    args = parser.parse_args(argv)
+    # commands run outside of any notebook, so there's no current
+    # project (this also keeps `prune` from creating a default one)
+    config.project = None
+    try:
+        args.func(args)
+    except DavosError as e:
+        print(f'{parser.prog}: error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
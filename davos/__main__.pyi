@@ -0,0 +1,22 @@
+from argparse import ArgumentParser, Namespace
+from collections.abc import Iterator
+from pathlib import PosixPath
+from typing import Final, Literal
+
+__all__ = list[Literal['main']]
+
+_GC_MIN_AGE_HOURS: Final[Literal[24]]
+
+def _cmd_du(args: Namespace) -> None: ...
+def _cmd_freeze(args: Namespace) -> None: ...
+def _cmd_gc(args: Namespace) -> None: ...
+def _cmd_list(args: Namespace) -> None: ...
+def _cmd_prune(args: Namespace) -> None: ...
+def _cmd_reindex(args: Namespace) -> None: ...
+def _cmd_rename(args: Namespace) -> None: ...
+def _format_size(n_bytes: int) -> str: ...
+def _has_installed_packages(project_dir: PosixPath) -> bool: ...
+def _iter_projects() -> Iterator[tuple[str, PosixPath, bool]]: ...
+def _last_modified(project_dir: PosixPath) -> float: ...
+def _make_parser() -> ArgumentParser: ...
+def main(argv: list[str] | None = ...) -> Literal[0, 1]: ...
@@ -0,0 +1,440 @@
+"""
+Export and import davos projects as compressed archives.
+
+This module implements `Project.export()` and `Project.import_()`,
+which pack a project's installed packages into a single `.tar.gz`
+archive and unpack it again (e.g., on a fresh machine or CI runner), so
+a project can be restored by extracting one file rather than
+reinstalling each smuggled package with `pip`. Along with the contents
+of the project directory, each archive contains a small manifest
+(`davos-project.json`) recording the project's name, the Python version
+and platform it was used with, and its installed packages. Since
+compiled extensions are only compatible with the interpreter ABI and
+platform they were built for, archives can only be imported in an
+environment with the same interpreter, ABI, and platform tags.
+
+Archives are relocatable: paths within them are relative to the project
+directory, and the shebang lines of any installed scripts are rewritten
+on import to point to the importing environment's Python interpreter.
+Archives are extracted in a single streaming pass, with files written
+by a pool of worker threads while the archive is decompressed.
+"""
+
+
+__all__ = ['export_project', 'import_project', 'MANIFEST_NAME']
+
+
+import json
+import os
+import shutil
+import sys
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path, PurePosixPath
+
+from davos import config
+from davos.core.exceptions import DavosProjectError
+from davos.core.lockfile import _environment_tag
+from davos.core.project import (
+    _dir_is_empty,
+    _filepath_to_safename,
+    _get_project_name_type,
+    _get_registered_project,
+    DAVOS_PROJECT_DIR
+)
+
+
+MANIFEST_NAME = 'davos-project.json'
+# files larger than this are written directly while reading the archive
+# rather than buffered in memory and handed off to a worker thread
+_MAX_BUFFERED_FILE_SIZE = 4 * 1024 ** 2
+# max number of files buffered in memory waiting to be written
+_MAX_PENDING_WRITES = 64
+
+
+def _check_member(member, dest_dir, real_dest_dir):
+    """
+    Check that an archive member can be safely extracted.
+
+    Since earlier members may include symbolic links, paths are checked
+    by resolving them on disk rather than just inspecting them.
+
+    Parameters
+    ----------
+    member : tarfile.TarInfo
+        The archive member.
+    dest_dir : pathlib.Path
+        The directory the archive is being extracted into.
+    real_dest_dir : str
+        `dest_dir` with any symbolic links resolved.
+
+    Returns
+    -------
+    pathlib.Path
+        The path the member should be extracted to.
+
+    Raises
+    ------
+    davos.core.exceptions.DavosProjectError
+        If the member's path (or link target) is or resolves to a
+        location outside `dest_dir`, something has already been
+        extracted to its path, or it isn't a regular file, directory,
+        or (hard or symbolic) link.
+    """
+    path = PurePosixPath(member.name)
+    dest_path = dest_dir.joinpath(*path.parts)
+    if (
+            path.is_absolute()
+            or '..' in path.parts
+            or not _resolves_within(dest_path.parent, real_dest_dir)
+    ):
+        raise DavosProjectError(
+            f"Refusing to extract {member.name!r}: path is outside the "
+            "project directory"
+        )
+    if member.issym():
+        target = PurePosixPath(member.linkname)
+        if (
+                target.is_absolute()
+                or not _resolves_within(dest_path.parent.joinpath(target),
+                                        real_dest_dir)
+        ):
+            raise DavosProjectError(
+                f"Refusing to extract {member.name!r}: link target is "
+                "outside the project directory"
+            )
+    elif member.islnk():
+        target = PurePosixPath(member.linkname)
+        if (
+                target.is_absolute()
+                or '..' in target.parts
+                or not _resolves_within(dest_dir.joinpath(*target.parts),
+                                        real_dest_dir)
+        ):
+            raise DavosProjectError(
+                f"Refusing to extract {member.name!r}: link target is "
+                "outside the project directory"
+            )
+    elif not (member.isfile() or member.isdir()):
+        raise DavosProjectError(
+            f"Refusing to extract {member.name!r}: unsupported file type"
+        )
+    if not member.isdir() and os.path.lexists(dest_path):
+        # never write through a file (or link) extracted earlier
+        raise DavosProjectError(
+            f"Refusing to extract {member.name!r}: path appears in the "
+            "archive more than once"
+        )
+    return dest_path
+
+
+def _extract_stream(archive, dest_dir, interpreter):
+    """
+    Extract an archive's contents in a single streaming pass.
+
+    Members are read from the archive sequentially (as it's
+    decompressed), while files are written to disk by a pool of worker
+    threads.
+
+    Parameters
+    ----------
+    archive : tarfile.TarFile
+        The archive, opened in streaming mode, positioned after the
+        manifest.
+    dest_dir : pathlib.Path
+        The directory to extract the archive into.
+    interpreter : str
+        The Python interpreter installed scripts should run with.
+    """
+    scripts_dir = dest_dir.joinpath('bin')
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    real_dest_dir = os.path.realpath(dest_dir)
+    with ThreadPoolExecutor() as executor:
+        pending = []
+        # iterating over the TarFile itself would restart from the
+        # first member (the manifest), which can't be re-read from a
+        # stream
+        for member in iter(archive.next, None):
+            path = _check_member(member, dest_dir, real_dest_dir)
+            if member.isdir():
+                path.mkdir(parents=True, exist_ok=True)
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if member.issym():
+                os.symlink(member.linkname, path)
+                continue
+            if member.islnk():
+                # wait for the file being linked to to be written
+                for future in pending:
+                    future.result()
+                pending.clear()
+                os.link(dest_dir.joinpath(member.linkname), path)
+                continue
+            f = archive.extractfile(member)
+            if member.size > _MAX_BUFFERED_FILE_SIZE:
+                with path.open('xb') as out:
+                    shutil.copyfileobj(f, out)
+                _set_attrs(path, member)
+                continue
+            data = f.read()
+            if path.parent == scripts_dir:
+                data = _rewrite_shebang(data, interpreter)
+            pending.append(executor.submit(_write_file, path, data, member))
+            if len(pending) >= _MAX_PENDING_WRITES:
+                pending.pop(0).result()
+        for future in pending:
+            # raise any errors from writing files
+            future.result()
+
+
+def _read_manifest(archive, path):
+    """
+    Read the manifest from the start of a project archive.
+
+    Parameters
+    ----------
+    archive : tarfile.TarFile
+        The archive, opened in streaming mode.
+    path : pathlib.Path
+        The archive's path (used in error messages).
+
+    Returns
+    -------
+    dict
+        The archive's manifest.
+
+    Raises
+    ------
+    davos.core.exceptions.DavosProjectError
+        If the archive's first member isn't a valid manifest.
+    """
+    member = archive.next()
+    if member is None or member.name != MANIFEST_NAME or not member.isfile():
+        raise DavosProjectError(f"{path} is not a davos project archive")
+    try:
+        return json.load(archive.extractfile(member))
+    except ValueError as e:
+        raise DavosProjectError(
+            f"{path} contains an invalid project manifest"
+        ) from e
+
+
+def _resolves_within(path, real_dir):
+    """
+    Check whether a path resolves to a location inside a directory.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The path to check. It (or any of its parent directories) need
+        not exist yet.
+    real_dir : str
+        The directory, with any symbolic links resolved.
+
+    Returns
+    -------
+    bool
+        `True` if `path` is `real_dir` or is inside it once any symbolic
+        links in it are resolved. Otherwise, `False`.
+    """
+    real_path = os.path.realpath(path)
+    return os.path.commonpath([real_path, real_dir]) == real_dir
+
+
+def _rewrite_shebang(data, interpreter):
+    """
+    Point a script's shebang line to a different Python interpreter.
+
+    Parameters
+    ----------
+    data : bytes
+        The script's contents.
+    interpreter : str
+        Path to the Python interpreter the script should run with.
+
+    Returns
+    -------
+    bytes
+        The script's contents with its shebang line replaced, if it
+        runs with a Python interpreter. Otherwise, `data` unchanged.
+    """
+    first_line, newline, rest = data.partition(b'\n')
+    if (
+            not first_line.startswith(b'#!')
+            or b'python' not in first_line
+            or ' ' in interpreter
+    ):
+        # not a Python script, or the interpreter's path can't be used
+        # in a shebang line (pip uses a /bin/sh "trampoline" for these)
+        return data
+    return b''.join((b'#!', os.fsencode(interpreter), newline, rest))
+
+
+def _set_attrs(path, member):
+    """
+    Set an extracted file's permissions and modification time.
+
+    Modification times are preserved so bytecode (`.pyc`) files cached
+    in the archive remain valid.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The extracted file.
+    member : tarfile.TarInfo
+        The file's archive member.
+    """
+    os.chmod(path, member.mode & 0o777)
+    os.utime(path, (member.mtime, member.mtime))
+
+
+def _write_file(path, data, member):
+    """
+    Write an extracted file's contents and attributes.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The file to write.
+    data : bytes
+        The file's contents.
+    member : tarfile.TarInfo
+        The file's archive member.
+    """
+    # mode "x" fails rather than writing through an existing link
+    with path.open('xb') as f:
+        f.write(data)
+    _set_attrs(path, member)
+
+
+def export_project(project, path):
+    """
+    Pack a project into a compressed archive.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project to export.
+    path : str or pathlib.Path
+        Path to the archive to create (typically ending in `.tar.gz`).
+        An existing file at this path is replaced.
+
+    Returns
+    -------
+    pathlib.Path
+        The absolute path to the created archive.
+    """
+    path = Path(os.path.expandvars(path)).expanduser().resolve()
+    manifest = {
+        'name': project.name,
+        'python_version': '.'.join(map(str, sys.version_info[:2])),
+        'environment': _environment_tag(),
+        'packages': project.freeze().splitlines()
+    }
+    manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+    manifest_info = tarfile.TarInfo(MANIFEST_NAME)
+    manifest_info.size = len(manifest_bytes)
+    manifest_info.mtime = int(os.path.getmtime(project.project_dir))
+    # write to a temporary file and move it into place, so a failed
+    # export doesn't leave a partial archive behind
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with tarfile.open(tmp_path, 'w:gz') as archive:
+            # the manifest goes first so it can be read (and checked)
+            # before extracting the rest of the archive
+            archive.addfile(manifest_info, BytesIO(manifest_bytes))
+            for child in sorted(project.project_dir.iterdir()):
+                if child.name == '.DS_Store':
+                    continue
+                archive.add(child, arcname=child.name)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    return path
+
+
+def import_project(path, name=None):
+    """
+    Create a project from an archive created by `export_project()`.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the project archive.
+    name : str or pathlib.Path, optional
+        The name for the imported project. Defaults to the name of the
+        exported project. Since notebook-specific projects are named
+        for their notebooks' paths, a different name should usually be
+        passed when importing one on a different machine (e.g., the
+        path to the notebook on that machine).
+
+    Returns
+    -------
+    AbstractProject or ConcreteProject
+        The imported project.
+
+    Raises
+    ------
+    davos.core.exceptions.DavosProjectError
+        If the archive isn't a valid project archive, was created with
+        a different version of Python or on a different platform (see
+        `davos.core.lockfile._environment_tag()`), or contains files
+        outside the project directory, or if a non-empty project named
+        `name` already exists.
+    """
+    # imported here to avoid circular imports
+    from davos.core.catalog import record_install
+    from davos.core.core import _get_pip_interpreter
+    from davos.core.store import ingest_project
+
+    path = Path(os.path.expandvars(path)).expanduser().resolve()
+    with tarfile.open(path, 'r|*') as archive:
+        manifest = _read_manifest(archive, path)
+        python_version = '.'.join(map(str, sys.version_info[:2]))
+        if manifest.get('python_version') != python_version:
+            raise DavosProjectError(
+                f"{path} was exported from a project used with Python "
+                f"{manifest.get('python_version')}, but this is Python "
+                f"{python_version}"
+            )
+        environment = _environment_tag()
+        if manifest.get('environment') != environment:
+            raise DavosProjectError(
+                f"{path} was exported from a project used in a "
+                f"{manifest.get('environment')} environment, but this is "
+                f"a {environment} environment"
+            )
+        if name is None:
+            name = manifest['name']
+        project_name, project_type = _get_project_name_type(name)
+        safe_name = _filepath_to_safename(project_name)
+        project_dir = DAVOS_PROJECT_DIR.joinpath(safe_name)
+        if project_dir.is_dir() and not _dir_is_empty(project_dir):
+            raise DavosProjectError(
+                f"a Project named {project_name!r} already exists and is "
+                "non-empty. To import the archive with this name, first "
+                "`.remove()` the existing project."
+            )
+        interpreter = (_get_pip_interpreter(config._pip_executable)
+                       or sys.executable)
+        # extract into a temporary directory, then move it into place
+        # so other processes never see a partially imported project
+        tmp_dir = DAVOS_PROJECT_DIR.joinpath(f'.{safe_name}.{os.getpid()}')
+        try:
+            _extract_stream(archive, tmp_dir, interpreter)
+            if project_dir.is_dir():
+                # remove empty project directory
+                shutil.rmtree(project_dir)
+            tmp_dir.rename(project_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    project = _get_registered_project(project_name, project_type)
+    # share the imported packages' files with other projects
+    ingest_project(project)
+    record_install(project)
+    return project
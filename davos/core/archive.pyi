@@ -0,0 +1,27 @@
+from pathlib import PosixPath
+from tarfile import TarFile, TarInfo
+from typing import Final, Literal, TypedDict
+
+from davos.core.project import AbstractProject, ConcreteProject, Project
+
+__all__ = list[Literal['export_project', 'import_project', 'MANIFEST_NAME']]
+
+MANIFEST_NAME: Final[Literal['davos-project.json']]
+_MAX_BUFFERED_FILE_SIZE: Final[int]
+_MAX_PENDING_WRITES: Final[int]
+
+class _Manifest(TypedDict):
+    name: str
+    python_version: str
+    environment: str
+    packages: list[str]
+
+def _check_member(member: TarInfo, dest_dir: PosixPath, real_dest_dir: str) -> PosixPath: ...
+def _extract_stream(archive: TarFile, dest_dir: PosixPath, interpreter: str) -> None: ...
+def _read_manifest(archive: TarFile, path: PosixPath) -> _Manifest: ...
+def _resolves_within(path: PosixPath, real_dir: str) -> bool: ...
+def _rewrite_shebang(data: bytes, interpreter: str) -> bytes: ...
+def _set_attrs(path: PosixPath, member: TarInfo) -> None: ...
+def _write_file(path: PosixPath, data: bytes, member: TarInfo) -> None: ...
+def export_project(project: Project, path: PosixPath | str) -> PosixPath: ...
+def import_project(path: PosixPath | str, name: PosixPath | str | None = ...) -> AbstractProject | ConcreteProject: ...
@@ -0,0 +1,673 @@
+"""
+SQLite catalog of local davos projects.
+
+This module maintains a small SQLite database
+(`~/.davos/catalog.sqlite3`) that records each project in
+`davos.DAVOS_PROJECT_DIR` along with the notebook it belongs to (for
+notebook-specific projects), the distributions installed in it, its
+size on disk, and when a package was last smuggled with it. The catalog
+is updated (transactionally) when packages are installed into a project
+and when a project is renamed or removed, so listing, pruning, and
+summarizing projects doesn't require walking `DAVOS_PROJECT_DIR` --
+which can contain thousands of projects for a single user on a shared
+server.
+
+If the catalog doesn't exist yet (e.g., the first time this version of
+`davos` is used), it's built from the contents of `DAVOS_PROJECT_DIR`
+when it's first opened. Projects can also be created or removed without
+the catalog being updated (e.g., project directories created before any
+packages are installed into them, or by other versions of `davos`), so
+before projects are listed, the catalog is reconciled with the
+directories actually in `DAVOS_PROJECT_DIR`. This only lists
+`DAVOS_PROJECT_DIR` (without walking the projects in it) if its
+modification time has changed since the last time it was checked. If
+projects are modified outside of `davos`, the catalog can be rebuilt
+with `rebuild_catalog()` (or `python -m davos reindex`).
+"""
+
+
+__all__ = [
+    'catalog_projects',
+    'distribution_last_imported',
+    'notebook_identities',
+    'rebuild_catalog',
+    'record_imports',
+    'record_install',
+    'record_removal',
+    'record_rename',
+    'record_use'
+]
+
+
+import os
+import time
+import warnings
+from contextlib import contextmanager
+
+from davos.core.config import DAVOS_CONFIG_DIR
+from davos.core.identity import read_notebook_identity
+from davos.core.project import (
+    _read_dist_name_version,
+    _safename_to_filepath,
+    DAVOS_PROJECT_DIR,
+    PATHSEP_REPLACEMENT
+)
+
+
+CATALOG_PATH = DAVOS_CONFIG_DIR.joinpath('catalog.sqlite3')
+# filesystems may record modification times with as little as 2-second
+# precision, so `DAVOS_PROJECT_DIR` is listed whenever it was modified
+# within this many seconds of the last time it was checked
+_MTIME_PRECISION = 2
+# max number of seconds to wait for another process (e.g., a different
+# notebook kernel) to finish writing to the catalog
+_CATALOG_TIMEOUT = 30
+# min number of seconds between updates to the same project's
+# last-used time from a single interpreter session, so smuggling many
+# packages in a row doesn't write to the catalog each time
+_USE_RECORD_INTERVAL = 60
+# maps names of projects whose last-used time was recorded during the
+# current interpreter session to when it was recorded
+_RECORDED_USES = {}
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    safe_name TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    notebook_path TEXT,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    last_used REAL
+);
+CREATE TABLE IF NOT EXISTS distributions (
+    project TEXT NOT NULL
+        REFERENCES projects (safe_name) ON DELETE CASCADE ON UPDATE CASCADE,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (project, name)
+);
+CREATE TABLE IF NOT EXISTS distribution_imports (
+    project TEXT NOT NULL
+        REFERENCES projects (safe_name) ON DELETE CASCADE ON UPDATE CASCADE,
+    name TEXT NOT NULL,
+    last_imported REAL NOT NULL,
+    PRIMARY KEY (project, name)
+);
+CREATE TABLE IF NOT EXISTS notebook_identities (
+    project TEXT PRIMARY KEY
+        REFERENCES projects (safe_name) ON DELETE CASCADE ON UPDATE CASCADE,
+    notebook_id TEXT,
+    cell_ids TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS project_dir_state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    mtime_ns INTEGER NOT NULL,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+def _add_project_dir(conn, safe_name):
+    """
+    Add a project to the catalog from the contents of its directory.
+
+    Reads the project's installed distributions from its metadata and
+    computes its size by walking its directory. Until a package is
+    smuggled with the project, its directory's modification time is
+    used as its last-used time.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        A connection to the catalog database, with an open transaction.
+    safe_name : str
+        The name of the project's directory in `DAVOS_PROJECT_DIR`.
+    """
+    project_dir = DAVOS_PROJECT_DIR.joinpath(safe_name)
+    if PATHSEP_REPLACEMENT in safe_name:
+        name = notebook_path = _safename_to_filepath(safe_name)
+    else:
+        name = safe_name
+        notebook_path = None
+    distributions = set()
+    # check every site-packages directory in the project (there may be
+    # more than one if it was used with multiple Python versions)
+    metadata_paths = project_dir.glob('lib/python*/site-packages/*-info')
+    for dist_info in metadata_paths:
+        if dist_info.suffix in ('.dist-info', '.egg-info'):
+            name_version = _read_dist_name_version(dist_info)
+            if name_version is not None:
+                distributions.add(name_version)
+    _upsert_project(conn, safe_name, name, notebook_path,
+                    _dir_size(project_dir), sorted(distributions))
+    try:
+        mtime = project_dir.stat().st_mtime
+    except OSError:
+        mtime = None
+    conn.execute(
+        'UPDATE projects SET last_used = ? '
+        'WHERE safe_name = ? AND last_used IS NULL',
+        (mtime, safe_name)
+    )
+    if notebook_path is not None:
+        _upsert_identity(conn, safe_name, notebook_path)
+
+
+@contextmanager
+def _connect():
+    """
+    Open a transaction on the catalog database.
+
+    Creates the catalog (and populates it from `DAVOS_PROJECT_DIR`) if
+    it doesn't exist yet. Changes made within the context are committed
+    when it exits, or rolled back if an error is raised.
+
+    Yields
+    ------
+    sqlite3.Connection
+        A connection to the catalog database.
+    """
+    # sqlite3 is imported here rather than at the top of the module
+    # since it's relatively slow to import and isn't needed unless
+    # projects are listed or modified
+    import sqlite3
+
+    is_new = not CATALOG_PATH.is_file()
+    CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(CATALOG_PATH), timeout=_CATALOG_TIMEOUT)
+    try:
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.executescript(_SCHEMA)
+        with conn:
+            if is_new:
+                _populate(conn)
+            yield conn
+    finally:
+        conn.close()
+
+
+def _dir_size(path):
+    """
+    Get the total size of all files under a directory.
+
+    Symbolic links are counted as links (not followed), and files that
+    disappear while the directory is being walked are skipped.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The directory whose size should be computed.
+
+    Returns
+    -------
+    int
+        The total size (in bytes) of all files under `path`.
+    """
+    total = 0
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return 0
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    total += _dir_size(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _list_project_dirs():
+    """
+    List the names of the project directories in `DAVOS_PROJECT_DIR`.
+
+    Returns
+    -------
+    list of str
+        The names of the project directories, sorted.
+    """
+    try:
+        with os.scandir(DAVOS_PROJECT_DIR) as entries:
+            return sorted(
+                entry.name for entry in entries
+                # skip .DS_Store files, etc. and temporary directories
+                # (e.g., projects being imported from archives)
+                if entry.is_dir() and not entry.name.startswith('.')
+            )
+    except FileNotFoundError:
+        return []
+
+
+def _populate(conn):
+    """
+    Add every project in `DAVOS_PROJECT_DIR` to the catalog.
+
+    Reads each project's installed distributions from its metadata and
+    computes its size by walking its directory, so this is slow for
+    large numbers of projects and is done only when the catalog is
+    first created or explicitly rebuilt.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        A connection to the catalog database, with an open transaction.
+    """
+    for safe_name in _list_project_dirs():
+        _add_project_dir(conn, safe_name)
+
+
+def _reconcile(conn):
+    """
+    Update the catalog to match the projects in `DAVOS_PROJECT_DIR`.
+
+    Project directories not in the catalog are added, and projects whose
+    directories no longer exist are removed. Projects already in the
+    catalog aren't re-read. Does nothing if `DAVOS_PROJECT_DIR` hasn't
+    been modified (i.e., no project directories have been created,
+    removed, or renamed) since it was last checked.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        A connection to the catalog database, with an open transaction.
+    """
+    try:
+        mtime_ns = DAVOS_PROJECT_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = 0
+    state = conn.execute(
+        'SELECT mtime_ns, checked_at FROM project_dir_state'
+    ).fetchone()
+    if (
+            state is not None
+            and state[0] == mtime_ns
+            and state[1] - mtime_ns / 1e9 > _MTIME_PRECISION
+    ):
+        return
+    checked_at = time.time()
+    dir_names = set(_list_project_dirs())
+    catalog_names = {safe_name for safe_name, in conn.execute(
+        'SELECT safe_name FROM projects'
+    )}
+    conn.executemany('DELETE FROM projects WHERE safe_name = ?',
+                     ((safe_name,) for safe_name in catalog_names - dir_names))
+    for safe_name in sorted(dir_names - catalog_names):
+        _add_project_dir(conn, safe_name)
+    conn.execute(
+        'INSERT OR REPLACE INTO project_dir_state (id, mtime_ns, checked_at) '
+        'VALUES (0, ?, ?)',
+        (mtime_ns, checked_at)
+    )
+
+
+def _upsert_identity(conn, safe_name, notebook_path):
+    """
+    Record the identity of a notebook-specific project's notebook.
+
+    Used to recognize the notebook if it's moved or copied (see
+    `davos.core.identity`). Nothing is recorded if the notebook can't
+    be read.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        A connection to the catalog database, with an open transaction.
+    safe_name : str
+        The name of the project's directory in `DAVOS_PROJECT_DIR`.
+    notebook_path : str
+        Path to the project's notebook.
+    """
+    identity = read_notebook_identity(notebook_path)
+    if identity is None:
+        return
+    notebook_id, cell_ids = identity
+    conn.execute(
+        'INSERT OR REPLACE INTO notebook_identities '
+        '(project, notebook_id, cell_ids) VALUES (?, ?, ?)',
+        (safe_name, notebook_id, ' '.join(sorted(cell_ids)))
+    )
+
+
+def _upsert_project(conn, safe_name, name, notebook_path, size_bytes,
+                    distributions):
+    """
+    Add or update a project in the catalog.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        A connection to the catalog database, with an open transaction.
+    safe_name : str
+        The name of the project's directory in `DAVOS_PROJECT_DIR`.
+    name : str
+        The project's name.
+    notebook_path : str or None
+        Path to the project's notebook, if it's notebook-specific.
+    size_bytes : int
+        The total size of the project's directory.
+    distributions : list of tuple of str
+        The `(name, version)` of each distribution installed in the
+        project.
+    """
+    # (not using an "upsert" clause, since it requires SQLite>=3.24)
+    conn.execute(
+        'INSERT OR IGNORE INTO projects (safe_name, name) VALUES (?, ?)',
+        (safe_name, name)
+    )
+    conn.execute(
+        'UPDATE projects SET name = ?, notebook_path = ?, size_bytes = ? '
+        'WHERE safe_name = ?',
+        (name, notebook_path, size_bytes, safe_name)
+    )
+    conn.execute('DELETE FROM distributions WHERE project = ?', (safe_name,))
+    # the same distribution may be installed for multiple Python
+    # versions, possibly with different versions
+    conn.executemany(
+        'INSERT OR REPLACE INTO distributions (project, name, version) '
+        'VALUES (?, ?, ?)',
+        ((safe_name, dist_name, version)
+         for dist_name, version in distributions)
+    )
+
+
+@contextmanager
+def _warn_on_error():
+    """
+    Turn failures to update the catalog into warnings.
+
+    Keeps a locked, corrupted, or read-only catalog from interfering
+    with installing and loading packages. The catalog can be rebuilt
+    afterward with `rebuild_catalog()`.
+    """
+    import sqlite3
+
+    try:
+        yield
+    except (sqlite3.Error, OSError) as e:
+        warnings.warn(f"Failed to update davos project catalog: {e}",
+                      category=RuntimeWarning)
+
+
+def catalog_projects():
+    """
+    List the projects recorded in the catalog.
+
+    Returns
+    -------
+    list of dict
+        One dict per project, sorted by project name, with the keys:
+          - `'safe_name'` (`str`): the name of the project's directory
+            in `DAVOS_PROJECT_DIR`
+          - `'name'` (`str`): the project's name
+          - `'notebook_path'` (`str` or `None`): the path to the
+            project's notebook, if it's notebook-specific
+          - `'size_bytes'` (`int`): the project's size on disk as of
+            the last time packages were installed into it
+          - `'last_used'` (`float` or `None`): when a package was last
+            smuggled with the project, as a Unix timestamp
+          - `'distributions'` (`list` of `tuple` of `str`): the
+            `(name, version)` of each installed distribution
+
+    Notes
+    -----
+    The catalog is first reconciled with the project directories in
+    `DAVOS_PROJECT_DIR`, so projects created or removed without updating
+    the catalog are included or omitted accordingly.
+    """
+    with _connect() as conn:
+        _reconcile(conn)
+        rows = conn.execute(
+            'SELECT safe_name, name, notebook_path, size_bytes, last_used '
+            'FROM projects ORDER BY name'
+        ).fetchall()
+        dist_rows = conn.execute(
+            'SELECT project, name, version FROM distributions ORDER BY name'
+        ).fetchall()
+    distributions = {}
+    for project, dist_name, version in dist_rows:
+        distributions.setdefault(project, []).append((dist_name, version))
+    return [
+        {
+            'safe_name': safe_name,
+            'name': name,
+            'notebook_path': notebook_path,
+            'size_bytes': size_bytes,
+            'last_used': last_used,
+            'distributions': distributions.get(safe_name, [])
+        }
+        for safe_name, name, notebook_path, size_bytes, last_used in rows
+    ]
+
+
+def distribution_last_imported(safe_name):
+    """
+    Get when each of a project's distributions was last imported.
+
+    Parameters
+    ----------
+    safe_name : str
+        The name of the project's directory in `DAVOS_PROJECT_DIR`.
+
+    Returns
+    -------
+    dict
+        Unix timestamps (`float`) of when a module from each
+        distribution was last loaded from the project, keyed by the
+        distributions' canonicalized names. Distributions never
+        imported (since this was first tracked) are omitted.
+    """
+    with _connect() as conn:
+        return dict(conn.execute(
+            'SELECT name, last_imported FROM distribution_imports '
+            'WHERE project = ?',
+            (safe_name,)
+        ).fetchall())
+
+
+def notebook_identities():
+    """
+    List the recorded identities of notebook-specific projects'
+    notebooks.
+
+    Returns
+    -------
+    list of dict
+        One dict per notebook-specific project whose notebook's identity
+        has been recorded, with the keys:
+          - `'safe_name'` (`str`): the name of the project's directory
+            in `DAVOS_PROJECT_DIR`
+          - `'name'` (`str`): the project's name
+          - `'notebook_path'` (`str`): the path to the project's
+            notebook
+          - `'last_used'` (`float` or `None`): when a package was last
+            smuggled with the project, as a Unix timestamp
+          - `'notebook_id'` (`str` or `None`): the ID stored in the
+            notebook's metadata, if any
+          - `'cell_ids'` (`frozenset` of `str`): the IDs of the
+            notebook's cells
+    """
+    with _connect() as conn:
+        _reconcile(conn)
+        rows = conn.execute(
+            'SELECT p.safe_name, p.name, p.notebook_path, p.last_used, '
+            'i.notebook_id, i.cell_ids FROM notebook_identities AS i '
+            'JOIN projects AS p ON p.safe_name = i.project'
+        ).fetchall()
+    return [
+        {
+            'safe_name': safe_name,
+            'name': name,
+            'notebook_path': notebook_path,
+            'last_used': last_used,
+            'notebook_id': notebook_id,
+            'cell_ids': frozenset(cell_ids.split())
+        }
+        for safe_name, name, notebook_path, last_used, notebook_id, cell_ids
+        in rows
+    ]
+
+
+def rebuild_catalog():
+    """
+    Rebuild the catalog from the contents of `DAVOS_PROJECT_DIR`.
+
+    Useful if projects have been added, removed, or modified outside of
+    `davos`. Projects' last-used times and their distributions'
+    last-imported times are preserved.
+    """
+    with _connect() as conn:
+        last_used = dict(conn.execute(
+            'SELECT safe_name, last_used FROM projects'
+        ).fetchall())
+        last_imported = conn.execute(
+            'SELECT project, name, last_imported FROM distribution_imports'
+        ).fetchall()
+        conn.execute('DELETE FROM projects')
+        _populate(conn)
+        conn.executemany(
+            'UPDATE projects SET last_used = ? WHERE safe_name = ?',
+            ((timestamp, safe_name) for safe_name, timestamp
+             in last_used.items() if timestamp is not None)
+        )
+        # (only for projects that still exist)
+        conn.executemany(
+            'INSERT INTO distribution_imports (project, name, last_imported) '
+            'SELECT ?, ?, ? WHERE EXISTS '
+            '(SELECT 1 FROM projects WHERE safe_name = ?)',
+            ((*row, row[0]) for row in last_imported)
+        )
+
+
+def record_imports(project, dist_names):
+    """
+    Record that modules from a project's distributions were imported.
+
+    Only projects already in the catalog (i.e., that packages have been
+    installed into) are updated.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project the modules were loaded from.
+    dist_names : iterable of str
+        The canonicalized names of the distributions the modules belong
+        to.
+    """
+    now = time.time()
+    with _warn_on_error(), _connect() as conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO distribution_imports '
+            '(project, name, last_imported) '
+            'SELECT ?, ?, ? WHERE EXISTS '
+            '(SELECT 1 FROM projects WHERE safe_name = ?)',
+            ((project.safe_name, dist_name, now, project.safe_name)
+             for dist_name in dist_names)
+        )
+
+
+def record_install(project):
+    """
+    Update a project's catalog entry after installing packages into it.
+
+    Records the project's installed distributions and current size on
+    disk (which requires walking the project directory once), and
+    marks it as just used. For notebook-specific projects, also records
+    the identity of the project's notebook.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project packages were installed into.
+    """
+    if PATHSEP_REPLACEMENT in project.safe_name:
+        notebook_path = project.name
+    else:
+        notebook_path = None
+    size_bytes = _dir_size(project.project_dir)
+    now = time.time()
+    with _warn_on_error(), _connect() as conn:
+        _upsert_project(conn, project.safe_name, project.name, notebook_path,
+                        size_bytes, project.installed_packages)
+        conn.execute(
+            'UPDATE projects SET last_used = ? WHERE safe_name = ?',
+            (now, project.safe_name)
+        )
+        if notebook_path is not None:
+            _upsert_identity(conn, project.safe_name, notebook_path)
+    _RECORDED_USES[project.safe_name] = now
+
+
+def record_removal(safe_name):
+    """
+    Remove a project from the catalog after its directory is deleted.
+
+    Parameters
+    ----------
+    safe_name : str
+        The name of the removed project's directory in
+        `DAVOS_PROJECT_DIR`.
+    """
+    with _warn_on_error(), _connect() as conn:
+        conn.execute('DELETE FROM projects WHERE safe_name = ?', (safe_name,))
+    _RECORDED_USES.pop(safe_name, None)
+
+
+def record_rename(old_safe_name, project):
+    """
+    Update a project's catalog entry after it's renamed.
+
+    Parameters
+    ----------
+    old_safe_name : str
+        The name of the project's directory in `DAVOS_PROJECT_DIR`
+        before it was renamed.
+    project : davos.core.project.Project
+        The renamed project.
+    """
+    if PATHSEP_REPLACEMENT in project.safe_name:
+        notebook_path = project.name
+    else:
+        notebook_path = None
+    with _warn_on_error(), _connect() as conn:
+        # the new name may have belonged to an empty project, whose
+        # directory was replaced by the renamed project's
+        conn.execute('DELETE FROM projects WHERE safe_name = ?',
+                     (project.safe_name,))
+        conn.execute(
+            'UPDATE projects SET safe_name = ?, name = ?, notebook_path = ? '
+            'WHERE safe_name = ?',
+            (project.safe_name, project.name, notebook_path, old_safe_name)
+        )
+    if old_safe_name in _RECORDED_USES:
+        _RECORDED_USES[project.safe_name] = _RECORDED_USES.pop(old_safe_name)
+
+
+def record_use(project):
+    """
+    Update a project's last-used time after smuggling a package with it.
+
+    Only projects already in the catalog (i.e., that packages have been
+    installed into) are updated. To avoid writing to the catalog for
+    every `smuggle` statement, a project's last-used time is updated at
+    most once every `_USE_RECORD_INTERVAL` seconds per interpreter
+    session.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project used to smuggle a package.
+    """
+    now = time.time()
+    last_recorded = _RECORDED_USES.get(project.safe_name)
+    if (
+            last_recorded is not None
+            and now - last_recorded < _USE_RECORD_INTERVAL
+    ):
+        return
+    with _warn_on_error(), _connect() as conn:
+        conn.execute(
+            'UPDATE projects SET last_used = ? WHERE safe_name = ?',
+            (now, project.safe_name)
+        )
+    _RECORDED_USES[project.safe_name] = now
@@ -0,0 +1,59 @@
+from collections.abc import Iterable
+from contextlib import AbstractContextManager
+from pathlib import PosixPath
+from sqlite3 import Connection
+from typing import Final, Literal, TypedDict
+
+from davos.core.project import ConcreteProject, Project
+
+__all__ = list[Literal['catalog_projects', 'distribution_last_imported', 'notebook_identities', 'rebuild_catalog',
+                       'record_imports', 'record_install', 'record_removal', 'record_rename', 'record_use']]
+
+CATALOG_PATH: Final[PosixPath]
+_CATALOG_TIMEOUT: Final[int]
+_MTIME_PRECISION: Final[int]
+_RECORDED_USES: dict[str, float]
+_SCHEMA: Final[str]
+_USE_RECORD_INTERVAL: Final[int]
+
+class _CatalogEntry(TypedDict):
+    safe_name: str
+    name: str
+    notebook_path: str | None
+    size_bytes: int
+    last_used: float | None
+    distributions: list[tuple[str, str]]
+
+class _NotebookIdentity(TypedDict):
+    safe_name: str
+    name: str
+    notebook_path: str
+    last_used: float | None
+    notebook_id: str | None
+    cell_ids: frozenset[str]
+
+def _add_project_dir(conn: Connection, safe_name: str) -> None: ...
+def _connect() -> AbstractContextManager[Connection]: ...
+def _dir_size(path: PosixPath | str) -> int: ...
+def _list_project_dirs() -> list[str]: ...
+def _populate(conn: Connection) -> None: ...
+def _reconcile(conn: Connection) -> None: ...
+def _upsert_identity(conn: Connection, safe_name: str, notebook_path: str) -> None: ...
+def _upsert_project(
+        conn: Connection,
+        safe_name: str,
+        name: str,
+        notebook_path: str | None,
+        size_bytes: int,
+        distributions: Iterable[tuple[str, str]]
+) -> None: ...
+def _warn_on_error() -> AbstractContextManager[None]: ...
+def catalog_projects() -> list[_CatalogEntry]: ...
+def distribution_last_imported(safe_name: str) -> dict[str, float]: ...
+def notebook_identities() -> list[_NotebookIdentity]: ...
+def rebuild_catalog() -> None: ...
+def record_imports(project: Project, dist_names: Iterable[str]) -> None: ...
+def record_install(project: ConcreteProject) -> None: ...
+def record_removal(safe_name: str) -> None: ...
+def record_rename(old_safe_name: str, project: Project) -> None: ...
+def record_use(project: ConcreteProject) -> None: ...
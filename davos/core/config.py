@@ -18,15 +18,17 @@ via attributes of the top-level `davos` module.
 __all__ = ['DavosConfig']
 
 
+import json
 import os
-import pprint
 import shlex
 import shutil
 import site
 import sys
 import sysconfig
+import time
 import traceback
 import warnings
+from contextlib import contextmanager
 from io import StringIO
 from os.path import expandvars
 from pathlib import Path
@@ -40,6 +42,32 @@ from davos.core.exceptions import (
 )
 
 
+class _PendingDefaultProject:    # pylint: disable=too-few-public-methods
+    """
+    Placeholder for the default project before it has been determined.
+
+    Identifying the default project can require querying running
+    Jupyter servers, so it's deferred until the project is first needed
+    (i.e., when a package is smuggled or `davos.project` is accessed)
+    rather than done when `davos` is imported. Until then, this object
+    is stored as `davos.config._project`.
+    """
+
+    def __repr__(self):
+        return '<default project (determined on first use)>'
+
+
+_PENDING_DEFAULT_PROJECT = _PendingDefaultProject()
+
+DAVOS_CONFIG_DIR = Path.home().joinpath('.davos')
+# results of slow environment probes, reused across kernel sessions
+# that use the same Python interpreter
+_STARTUP_CACHE_PATH = DAVOS_CONFIG_DIR.joinpath('startup-cache.json')
+# records of each step of `import davos` timed by `_startup_step`, in
+# the order they ran. Shown by `davos.startup_report()`
+_STARTUP_STEPS = []
+
+
 class SingletonConfig(type):
     """Metaclass that enforces singleton behavior for `DavosConfig`"""
 
@@ -68,6 +96,16 @@ class DavosConfig(metaclass=SingletonConfig):
                 upon smuggling a package that cannot be dynamically
                 reloaded (Note: currently implemented for Jupyter
                 notebooks only)
+            base_projects : tuple of pathlib.Path
+                Directories of shared, read-only projects whose packages
+                are available to every project. Their `site-packages`
+                directories are searched (in order) after the current
+                project's, and smuggled packages already installed in
+                them aren't installed again. `davos` never installs
+                packages into or removes packages from base projects.
+                Defaults to the directories listed in the
+                `DAVOS_BASE_PROJECTS` environment variable (separated
+                by `os.pathsep`), if set.
             conda_env: str or None
                 NOTE: NOT CURRENTLY SUPPORTED.
                 The name of the resident conda environment of the
@@ -77,6 +115,24 @@ class DavosConfig(metaclass=SingletonConfig):
                 If `True` (default: `False`), prompt for user input
                 before installing any smuggled packages not already
                 available locally.
+            install_timeout : int, float, or None
+                The maximum number of seconds a single package
+                installation may take. If exceeded, the installer
+                program is terminated, the partial installation is
+                undone (for installations into a project), and an
+                `InstallerTimeoutError` is raised. May be overridden for
+                individual packages via the `--install-timeout` onion
+                comment option. If `None` (default), installations may
+                run indefinitely.
+            max_projects_bytes : int or None
+                The maximum space (in bytes) used on disk by all
+                projects in `davos.DAVOS_PROJECT_DIR` and the package
+                store, counting files shared between projects once. If
+                exceeded after packages are installed, the least
+                recently used projects (other than the current project)
+                are removed in a background thread until the space used
+                is within this limit. If `None` (default), projects'
+                size is unlimited.
             noninteractive : bool
                 If `True` (default: `False`) run `davos` in
                 non-interactive mode. All user input and confirmation
@@ -91,7 +147,9 @@ class DavosConfig(metaclass=SingletonConfig):
             project : davos.core.project.ConcreteProject
                 The "Project" environment into which smuggled packages
                 should be installed. The default is a notebook-specific
-                Project whose name is the path to the current notebook.
+                Project whose name is the path to the current notebook,
+                determined the first time a package is smuggled or this
+                field is accessed.
                 This field may also be specified as a `str` or
                 `pathlib.Path`, which will be converted to a
                 `ConcreteProject` instance on assignment. If set to
@@ -101,11 +159,25 @@ class DavosConfig(metaclass=SingletonConfig):
                 construct specific to `davos`. For additional info, see
                 https://github.com/ContextLab/davos#readme and
                 the `davos.core.project` module.
+            show_progress : bool
+                If `True` (default: `False`), replace the installer's
+                streamed output with a single, periodically updated
+                progress line while installing smuggled packages. The
+                full installer output is written to a log file whose
+                path is shown once installation finishes.
             suppress_stdout: bool
                 If `True` (default: `False`), suppress all unnecessary
                 output issued by the program. This is often useful when
                 smuggling packages that need to install many
                 dependencies and therefore generate extensive output.
+            use_lockfile : bool
+                If `True` (default), record the exact versions of all
+                packages installed into a notebook-specific project in
+                a lockfile next to the notebook
+                (`<notebook-name>.davos.lock`), and install any packages
+                it lists that are missing from the project all at once
+                the first time a package is smuggled in a new
+                interpreter session.
         **Read-only fields**:
             conda_avail : bool
                 NOTE: NOT CURRENTLY SUPPORTED.
@@ -173,59 +245,110 @@ class DavosConfig(metaclass=SingletonConfig):
         ########################################
         #           READ-ONLY FIELDS           #
         ########################################
-        try:
-            # (function exists globally when imported into IPython context)
-            self._ipython_shell = get_ipython()
-        except NameError:
-            # see _block_greedy_ipython_completer() docstring
-            _block_greedy_ipython_completer()
-            # imported from a non-interactive Python script
-            self._ipython_shell = None
-            self._environment = 'Python'
-        else:
-            import IPython
-            if isinstance(
-                    self._ipython_shell,
+        with _startup_step('detect environment'):
+            try:
+                # (function exists globally when imported into IPython context)
+                self._ipython_shell = get_ipython()
+            except NameError:
+                # see _block_greedy_ipython_completer() docstring
+                _block_greedy_ipython_completer()
+                # imported from a non-interactive Python script
+                self._ipython_shell = None
+                self._environment = 'Python'
+            else:
+                import IPython
+                terminal_shell_cls = (
                     IPython.terminal.interactiveshell.TerminalInteractiveShell
-            ):
-                _msg = ("davos does not officially support IPython terminal "
-                        "shells. Some features may not work as expected.")
-                warnings.warn(_msg, category=RuntimeWarning)
-            if IPython.version_info[0] >= 7:
-                if 'google.colab' in str(self._ipython_shell):
-                    self._environment = 'Colaboratory'
+                )
+                if isinstance(self._ipython_shell, terminal_shell_cls):
+                    _msg = ("davos does not officially support IPython "
+                            "terminal shells. Some features may not work as "
+                            "expected.")
+                    warnings.warn(_msg, category=RuntimeWarning)
+                if IPython.version_info[0] >= 7:
+                    if 'google.colab' in str(self._ipython_shell):
+                        self._environment = 'Colaboratory'
+                    else:
+                        self._environment = 'IPython>=7.0'
                 else:
-                    self._environment = 'IPython>=7.0'
-            else:
-                self._environment = 'IPython<7.0'
+                    self._environment = 'IPython<7.0'
         self._conda_avail = None
         self._conda_envs_dirs = None
-        self._default_pip_executable = self._find_default_pip_executable()
+        startup_cache = _load_startup_cache()
+        with _startup_step('find default pip executable') as step:
+            cached_pip_exe = startup_cache.get('default_pip_executable')
+            if cached_pip_exe is not None and Path(cached_pip_exe).is_file():
+                self._default_pip_executable = cached_pip_exe
+                step['note'] = 'cached'
+            else:
+                pip_exe = self._find_default_pip_executable()
+                self._default_pip_executable = pip_exe
+                step['note'] = 'computed'
+                _update_startup_cache(default_pip_executable=pip_exe)
         self._ipy_showsyntaxerror_orig = None
-        self._jupyter_interface = _get_jupyter_interface()
-        self._repr_formatter = pprint.PrettyPrinter()
-        if sys.version_info.minor >= 8:
-            # sort_dicts constructor param added in Python 3.8, defaults
-            # to True. Set it to False here for consistency.
-            self._repr_formatter._sort_dicts = False
+        # determined lazily, since it requires running a subprocess
+        self._jupyter_interface = None
+        # created when first needed, since the pprint module (and its
+        # dependencies) is relatively slow to import
+        self._repr_formatter = None
         self._smuggled = {}
-        self._stdlib_modules = _get_stdlib_modules()
+        with _startup_step('get stdlib module names') as step:
+            if sys.version_info.minor >= 10:
+                self._stdlib_module_names = sys.stdlib_module_names
+                step['note'] = 'builtin'
+            elif 'stdlib_modules' in startup_cache:
+                self._stdlib_module_names = frozenset(
+                    startup_cache['stdlib_modules']
+                )
+                step['note'] = 'cached'
+            else:
+                # determined lazily, since it requires walking the
+                # stdlib directory
+                self._stdlib_module_names = None
+                step['note'] = 'deferred'
         ########################################
         #          CONFIGURABLE FIELDS         #
         ########################################
         self._active = True
         self._auto_rerun = False
+        self._base_projects = ()
+        base_projects_env = os.environ.get('DAVOS_BASE_PROJECTS')
+        if base_projects_env:
+            try:
+                self.base_projects = [
+                    path for path in base_projects_env.split(os.pathsep)
+                    if path
+                ]
+            except DavosConfigError as e:
+                warnings.warn(
+                    "Ignoring DAVOS_BASE_PROJECTS environment variable: "
+                    f"{e}",
+                    category=RuntimeWarning
+                )
         self._conda_env = None
         self._confirm_install = False
+        self._install_timeout = None
+        self._max_projects_bytes = None
         self._noninteractive = False
-        self._project = None
+        self._project = _PENDING_DEFAULT_PROJECT
+        self._show_progress = False
         self._suppress_stdout = False
+        self._use_lockfile = True
         self._pip_executable = self._default_pip_executable
 
     def __repr__(self):
+        import pprint
+
+        if self._repr_formatter is None:
+            self._repr_formatter = pprint.PrettyPrinter()
+            if sys.version_info.minor >= 8:
+                # sort_dicts constructor param added in Python 3.8,
+                # defaults to True. Set it to False here for
+                # consistency.
+                self._repr_formatter._sort_dicts = False
         cls_name = self.__class__.__name__
         base_indent = len(cls_name) + 1
-        attrs_in_repr = ['active', 'auto_rerun']
+        attrs_in_repr = ['active', 'auto_rerun', 'base_projects']
         if self._conda_avail is not None:
             attrs_in_repr.append('conda_avail')
             if self._conda_avail is True:
@@ -233,12 +356,16 @@ class DavosConfig(metaclass=SingletonConfig):
         attrs_in_repr.extend([
             'confirm_install',
             'environment',
+            'install_timeout',
             'ipython_shell',
+            'max_projects_bytes',
             'noninteractive',
             'pip_executable',
             'project',
+            'show_progress',
             'suppress_stdout',
-            'smuggled'
+            'smuggled',
+            'use_lockfile'
         ])
         newline_delim = ',\n' + ' ' * base_indent
         last_item_ix = len(attrs_in_repr) - 1
@@ -290,6 +417,40 @@ class DavosConfig(metaclass=SingletonConfig):
             )
         self._auto_rerun = value
 
+    @property
+    def base_projects(self):
+        return self._base_projects
+
+    @base_projects.setter
+    def base_projects(self, value):
+        if value is None:
+            value = []
+        elif isinstance(value, (str, Path)) or hasattr(value, 'project_dir'):
+            value = [value]
+        base_projects = []
+        try:
+            for base_project in value:
+                # accept Project objects as well as paths to their
+                # directories
+                base_project = getattr(base_project, 'project_dir',
+                                       base_project)
+                if not isinstance(base_project, (str, Path)):
+                    raise TypeError
+                path = Path(expandvars(base_project)).expanduser().resolve()
+                if not path.is_dir():
+                    raise DavosConfigError(
+                        'base_projects', f"'{path}' is not a directory"
+                    )
+                if path not in base_projects:
+                    base_projects.append(path)
+        except TypeError as e:
+            raise DavosConfigError(
+                'base_projects',
+                "field may be a list of paths to project directories or "
+                "'None'"
+            ) from e
+        self._base_projects = tuple(base_projects)
+
     @property
     def confirm_install(self):
         return self._confirm_install
@@ -313,6 +474,22 @@ class DavosConfig(metaclass=SingletonConfig):
     def environment(self, _):
         raise DavosConfigError('environment', 'field is read-only')
 
+    @property
+    def install_timeout(self):
+        return self._install_timeout
+
+    @install_timeout.setter
+    def install_timeout(self, value):
+        if value is not None and (
+                isinstance(value, bool) or
+                not isinstance(value, (int, float)) or
+                value <= 0
+        ):
+            raise DavosConfigError('install_timeout',
+                                   "field may be a positive number of "
+                                   "seconds or 'None'")
+        self._install_timeout = value
+
     @property
     def ipython_shell(self):
         return self._ipython_shell
@@ -321,6 +498,22 @@ class DavosConfig(metaclass=SingletonConfig):
     def ipython_shell(self, _):
         raise DavosConfigError('ipython_shell', 'field is read-only')
 
+    @property
+    def max_projects_bytes(self):
+        return self._max_projects_bytes
+
+    @max_projects_bytes.setter
+    def max_projects_bytes(self, value):
+        if value is not None and (
+                isinstance(value, bool) or
+                not isinstance(value, int) or
+                value < 0
+        ):
+            raise DavosConfigError('max_projects_bytes',
+                                   "field may be a non-negative integer "
+                                   "number of bytes or 'None'")
+        self._max_projects_bytes = value
+
     @property
     def noninteractive(self):
         return self._noninteractive
@@ -363,6 +556,9 @@ class DavosConfig(metaclass=SingletonConfig):
 
     @property
     def project(self):
+        if self._project is _PENDING_DEFAULT_PROJECT:
+            from davos.core.project import use_default_project
+            use_default_project()
         return self._project
 
     @project.setter
@@ -395,6 +591,17 @@ class DavosConfig(metaclass=SingletonConfig):
                 "davos.Project instance, or None"
             )
 
+    @property
+    def show_progress(self):
+        return self._show_progress
+
+    @show_progress.setter
+    def show_progress(self, value):
+        if not isinstance(value, bool):
+            raise DavosConfigError('show_progress',
+                                   "field may be 'True' or 'False'")
+        self._show_progress = value
+
     @property
     def smuggled(self):
         return self._smuggled
@@ -414,6 +621,32 @@ class DavosConfig(metaclass=SingletonConfig):
                                    "field may be 'True' or 'False'")
         self._suppress_stdout = value
 
+    @property
+    def use_lockfile(self):
+        return self._use_lockfile
+
+    @use_lockfile.setter
+    def use_lockfile(self, value):
+        if not isinstance(value, bool):
+            raise DavosConfigError('use_lockfile',
+                                   "field may be 'True' or 'False'")
+        self._use_lockfile = value
+
+    @property
+    def _stdlib_modules(self):
+        """
+        Names of standard library modules.
+
+        On Python<3.10, these are read from the startup cache if
+        possible, or otherwise determined (and cached) on first access.
+        """
+        if self._stdlib_module_names is None:
+            self._stdlib_module_names = _get_stdlib_modules()
+            _update_startup_cache(
+                stdlib_modules=sorted(self._stdlib_module_names)
+            )
+        return self._stdlib_module_names
+
     def _find_default_pip_executable(self):
         """
         Finds the pip executable that should be used to install smuggled
@@ -491,7 +724,9 @@ class DavosConfig(metaclass=SingletonConfig):
             # environment instead
             pip_exe = shutil.which('pip')
             if pip_exe is not None:
-                return pip_exe
+                # may be relative if $PATH contains relative dirs, which
+                # would make the cached path invalid from other dirs
+                return os.path.abspath(pip_exe)
         raise DavosError(
             "Could not locate a 'pip' executable in the current Python "
             "environment. To ensure you have 'pip' installed in your "
@@ -566,7 +801,7 @@ def _get_jupyter_interface():
     """
     Determines whether the notebook is being run through the "classic"
     Jupyter notebook interface or JupyterLab. Used to set the value of
-    `davos.config._jupyter_interface`.
+    `davos.config._jupyter_interface` the first time it's needed.
 
     Returns
     -------
@@ -599,15 +834,9 @@ def _get_jupyter_interface():
          fallback/default value.
     3. `subprocess.check_output` is called directly rather than using
        `davos.core.core.run_shell_command` like most other davos
-       functions that run shell commands. In IPython environments,
-       `run_shell_command` internally calls
-       `IPython.utils.process.system`, which for some strange reason
-       truncates the stdout from this particular command at 80 columns
-       rather than wrapping it like it does with seemingly every other
-       command. The shell commands we need to get from the output
-       of `ps` can be quite long because they include multiple absolute
-       paths, and the info we care about may not be in the first 80
-       characters.
+       functions that run shell commands because this function runs
+       while the `davos.core.config` module is being initialized, before
+       `davos.core.core` can be imported.
     """
     cmd = f'ps -o command= -p {os.getppid()}'
     try:
@@ -664,3 +893,133 @@ def _get_stdlib_modules():
 
     stdlib_modules.extend(sys.builtin_module_names)
     return frozenset(stdlib_modules)
+
+
+def _interpreter_key():
+    """
+    Get the key for the current interpreter's startup cache entry.
+
+    Returns
+    -------
+    str
+        The path to the Python executable, or the interpreter's prefix
+        if the path is unknown (e.g., for embedded interpreters, where
+        `sys.executable` may be an empty string).
+    """
+    return sys.executable or sys.prefix
+
+
+def _interpreter_token():
+    """
+    Get a value that changes when the current interpreter is replaced.
+
+    Used to validate the interpreter's startup cache entry. This is the
+    Python executable's modification time if it can be read. Otherwise
+    (e.g., if `sys.executable` is empty or isn't a file), it's the
+    interpreter's version string, which includes its build date, so the
+    cache entry is still validated (rather than recomputed and rewritten
+    on every import) and is discarded if the interpreter is upgraded.
+
+    Returns
+    -------
+    float or str
+        The token for the current interpreter.
+    """
+    try:
+        return os.stat(sys.executable).st_mtime
+    except OSError:
+        return sys.version
+
+
+def _load_startup_cache():
+    """
+    Load cached environment probe results for the current interpreter.
+
+    Results are stored in `~/.davos/startup-cache.json`, keyed by the
+    path to the Python executable, along with a token that identifies
+    the installed interpreter (see `_interpreter_token`). If the
+    interpreter has been changed (e.g., upgraded or reinstalled) since
+    the results were cached, they're discarded.
+
+    Returns
+    -------
+    dict
+        The cached results for the current interpreter. Empty if there
+        are none, they're out of date, or the cache file can't be read.
+    """
+    try:
+        with _STARTUP_CACHE_PATH.open() as f:
+            entry = json.load(f)[_interpreter_key()]
+        if entry['token'] != _interpreter_token():
+            return {}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    return entry
+
+
+@contextmanager
+def _startup_step(label):
+    """
+    Time a step of `davos`'s initialization.
+
+    Appends the step to `_STARTUP_STEPS` so it can be shown by
+    `davos.startup_report()`.
+
+    Parameters
+    ----------
+    label : str
+        A short description of the step.
+
+    Yields
+    ------
+    dict
+        The step's record. A `'note'` (e.g., whether the result was
+        cached) may be set on it inside the `with` block.
+    """
+    step = {'label': label, 'seconds': None, 'note': None}
+    start = time.perf_counter()
+    try:
+        yield step
+    finally:
+        step['seconds'] = time.perf_counter() - start
+        _STARTUP_STEPS.append(step)
+
+
+def _update_startup_cache(**values):
+    """
+    Store environment probe results for the current interpreter.
+
+    Merges `values` into the current interpreter's entry in the cache
+    file (see `_load_startup_cache`). The file is written atomically so
+    kernels starting concurrently never read a partial file. Failing to
+    write the cache (e.g., on a read-only filesystem) is not an error.
+
+    Parameters
+    ----------
+    **values
+        JSON-serializable results to store.
+    """
+    try:
+        key = _interpreter_key()
+        token = _interpreter_token()
+        try:
+            with _STARTUP_CACHE_PATH.open() as f:
+                cache = json.load(f)
+            if not isinstance(cache, dict):
+                cache = {}
+        except (OSError, ValueError):
+            cache = {}
+        entry = cache.get(key)
+        if not isinstance(entry, dict) or entry.get('token') != token:
+            entry = {'token': token}
+        entry.update(values)
+        cache[key] = entry
+        _STARTUP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _STARTUP_CACHE_PATH.with_name(
+            f'{_STARTUP_CACHE_PATH.name}.{os.getpid()}.tmp'
+        )
+        with tmp_path.open('w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, _STARTUP_CACHE_PATH)
+    except OSError:
+        pass
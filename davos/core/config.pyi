@@ -1,7 +1,8 @@
 from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager
 from pathlib import PosixPath
 from pprint import PrettyPrinter
-from typing import ClassVar, Generic, Literal, NoReturn, Protocol, Type, TypeVar
+from typing import ClassVar, Final, Generic, Literal, NoReturn, Protocol, Type, TypedDict, TypeVar
 from google.colab._shell import Shell    # type: ignore
 from IPython.core.interactiveshell import InteractiveShell    # type: ignore
 from davos.core.project import AbstractProject, ConcreteProject
@@ -19,6 +20,25 @@ class _IpyShowSyntaxErrorPre7(Protocol):
 class _IpyShowSyntaxErrorPost7(Protocol):
     def __call__(self, filename: str | None = ..., running_compile_code: bool = ...) -> None: ...
 
+class _PendingDefaultProject:
+    def __repr__(self) -> str: ...
+
+_PENDING_DEFAULT_PROJECT: _PendingDefaultProject
+
+class _StartupCacheEntry(TypedDict, total=False):
+    token: float | str
+    default_pip_executable: str
+    stdlib_modules: list[str]
+
+class _StartupStep(TypedDict):
+    label: str
+    seconds: float | None
+    note: str | None
+
+DAVOS_CONFIG_DIR: Final[PosixPath]
+_STARTUP_CACHE_PATH: Final[PosixPath]
+_STARTUP_STEPS: list[_StartupStep]
+
 class SingletonConfig(type, Generic[_DC]):
     # ignoring an overly strict mypy check that doesn't account for this
     # use case. see https://github.com/python/mypy/issues/5144
@@ -28,6 +48,7 @@ class SingletonConfig(type, Generic[_DC]):
 class DavosConfig(metaclass=SingletonConfig):
     _active: bool
     _auto_rerun: bool
+    _base_projects: tuple[PosixPath, ...]
     _conda_avail: bool | None
     _conda_env: str | None
     _conda_envs_dirs: dict[str, str] | None
@@ -35,15 +56,19 @@ class DavosConfig(metaclass=SingletonConfig):
     _default_pip_executable: str
     _environment: _Environment
     _ipy_showsyntaxerror_orig: _IpyShowSyntaxErrorPre7 | _IpyShowSyntaxErrorPost7 | None
+    _install_timeout: float | None
     _ipython_shell: IpythonShell | None
-    _jupyter_interface: Literal['notebook', 'lab']
+    _jupyter_interface: Literal['notebook', 'lab'] | None
+    _max_projects_bytes: int | None
     _noninteractive: bool
     _pip_executable: str
-    _project: AbstractProject | ConcreteProject | None
-    _repr_formatter: PrettyPrinter
+    _project: AbstractProject | ConcreteProject | _PendingDefaultProject | None
+    _repr_formatter: PrettyPrinter | None
+    _show_progress: bool
     _smuggled: dict[str, str]
-    _stdlib_modules: frozenset[str]
+    _stdlib_module_names: frozenset[str] | None
     _suppress_stdout: bool
+    _use_lockfile: bool
     @staticmethod
     def __mock_sorted(__iterable: _I, key: Callable | None = ..., reverse: bool = ...) -> _I: ...
     def __init__(self) -> None: ...
@@ -57,6 +82,13 @@ class DavosConfig(metaclass=SingletonConfig):
     @auto_rerun.setter
     def auto_rerun(self, value: bool) -> None: ...
     @property
+    def base_projects(self) -> tuple[PosixPath, ...]: ...
+    @base_projects.setter
+    def base_projects(
+            self,
+            value: Iterable[ConcreteProject | PosixPath | str] | ConcreteProject | PosixPath | str | None
+    ) -> None: ...
+    @property
     def conda_avail(self) -> bool: ...
     @conda_avail.setter
     def conda_avail(self, _: object) -> NoReturn: ...
@@ -77,10 +109,18 @@ class DavosConfig(metaclass=SingletonConfig):
     @environment.setter
     def environment(self, _: object) -> NoReturn: ...
     @property
+    def install_timeout(self) -> float | None: ...
+    @install_timeout.setter
+    def install_timeout(self, value: float | None) -> None: ...
+    @property
     def ipython_shell(self) -> IpythonShell | None: ...
     @ipython_shell.setter
     def ipython_shell(self, _: object) -> NoReturn: ...
     @property
+    def max_projects_bytes(self) -> int | None: ...
+    @max_projects_bytes.setter
+    def max_projects_bytes(self, value: int | None) -> None: ...
+    @property
     def noninteractive(self) -> bool: ...
     @noninteractive.setter
     def noninteractive(self, value: bool) -> None: ...
@@ -89,10 +129,14 @@ class DavosConfig(metaclass=SingletonConfig):
     @pip_executable.setter
     def pip_executable(self, exe_path: PosixPath | str) -> None: ...
     @property
-    def project(self) -> AbstractProject | ConcreteProject: ...
+    def project(self) -> ConcreteProject | None: ...
     @project.setter
     def project(self, proj: AbstractProject | ConcreteProject | PosixPath | str | None) -> None: ...
     @property
+    def show_progress(self) -> bool: ...
+    @show_progress.setter
+    def show_progress(self, value: bool) -> None: ...
+    @property
     def smuggled(self) -> dict[str, str]: ...
     @smuggled.setter
     def smuggled(self, _: object) -> NoReturn: ...
@@ -100,8 +144,19 @@ class DavosConfig(metaclass=SingletonConfig):
     def suppress_stdout(self) -> bool: ...
     @suppress_stdout.setter
     def suppress_stdout(self, value: bool) -> None: ...
+    @property
+    def use_lockfile(self) -> bool: ...
+    @use_lockfile.setter
+    def use_lockfile(self, value: bool) -> None: ...
+    @property
+    def _stdlib_modules(self) -> frozenset[str]: ...
     def _find_default_pip_executable(self) -> str: ...
 
 def _block_greedy_ipython_completer() -> None: ...
 def _get_jupyter_interface() -> Literal['notebook', 'lab']: ...
 def _get_stdlib_modules() -> frozenset[str]: ...
+def _interpreter_key() -> str: ...
+def _interpreter_token() -> float | str: ...
+def _load_startup_cache() -> _StartupCacheEntry: ...
+def _startup_step(label: str) -> AbstractContextManager[_StartupStep]: ...
+def _update_startup_cache(**values: object) -> None: ...
@@ -12,6 +12,7 @@ loading them into the user's namespace, and more.
 
 # pylint: disable=too-many-lines
 __all__ = [
+    'capture_progress',
     'capture_stdout',
     'check_conda',
     'get_previously_imported_pkgs',
@@ -29,44 +30,246 @@ __all__ = [
 import functools
 import importlib
 import itertools
+import json
+import os
+import re
+import shlex
+import shutil
+import site
 import sys
+import sysconfig
+import time
 import warnings
 from contextlib import contextmanager, redirect_stdout
 from io import StringIO
 from pathlib import Path
-from subprocess import CalledProcessError
-
-from packaging.requirements import InvalidRequirement
-from packaging.specifiers import SpecifierSet
-if sys.version_info < (3, 8):
-    import importlib_metadata as metadata
-else:
-    from importlib import metadata
+from subprocess import CalledProcessError, TimeoutExpired
 
 from davos import config
 from davos.core.exceptions import (
     DavosError,
     InstallerError,
+    InstallerTimeoutError,
     OnionArgumentError,
     OnionParserError,
     ParserNotImplementedError,
     SmugglerError,
     TheNightIsDarkAndFullOfErrors
 )
+from davos.core.executor import run_command, split_command
+from davos.core.finders import invalidate_path_caches, project_finder
 from davos.core.parsers import pip_parser
 from davos.core.regexps import (
+    install_timeout_arg_regex,
     pip_installed_pkgs_regex,
+    pip_progress_regex,
     smuggle_statement_regex
 )
 # noinspection PyUnresolvedReferences
 from davos.implementations import (
-    _check_conda_avail_helper,
-    _run_shell_command_helper,
+    _display_progress_helper,
     auto_restart_rerun,
     prompt_restart_rerun_buttons
 )
 
 
+# maps alternate pip executables to the site directories of the Python
+# environments they install packages into. Filled the first time
+# `_get_alternate_site_dirs()` is called for each executable
+_ALTERNATE_SITE_DIRS = {}
+# name of the `.pth` file that makes base projects' packages visible to
+# pip while it installs packages into a project
+_BASE_PROJECTS_PTH_NAME = '_davos_base_projects.pth'
+# name of the directory (inside a project's directory) its contents are
+# backed up to while installing packages with a time limit
+_INSTALL_BACKUP_DIRNAME = '.davos-install-backup'
+
+
+class capture_progress:    # pylint: disable=invalid-name
+    """
+    Context manager for summarizing installer output as a progress line.
+
+    Like `capture_stdout`, sends stdout to any number of streams while
+    the context is active. However, rather than also echoing it to
+    `sys.stdout`, it writes the raw output to a log file and parses it
+    line-by-line (via `davos.core.regexps.pip_progress_regex`) to track
+    which package is currently being collected, downloaded, built, or
+    installed, along with the counts `pip` reports (requirements already
+    satisfied and the amount of the current file downloaded so far).
+    `pip` doesn't know how many packages it will need to collect until
+    dependency resolution finishes, so the collecting stage shows how
+    many requirements have been found so far. A one-line summary of that
+    state is rendered (via the environment-dependent
+    `_display_progress_helper()` function) at most once every
+    `min_interval` seconds, so packages with many dependencies don't
+    flood the output area or re-render it for every line `pip` prints.
+    A final summary with the total elapsed time and the path to the full
+    log is always rendered upon exiting the context. Only the `max_logs`
+    most recent logs are kept in `~/.davos/logs/`, and each is truncated
+    after `max_log_bytes`, since `pip`'s progress bars can produce a lot
+    of output.
+    """
+
+    max_log_bytes = 5 * 1024 * 1024
+    max_logs = 20
+    min_interval = 0.25
+
+    def __init__(self, *streams, closing=True):
+        """
+        Parameters
+        ----------
+        *streams : tuple of io.TextIOBase
+            I/O stream(s) to receive data sent to `sys.stdout`. Must be
+            subclasses of `io.TextIOBase` (i.e., support reading/writing
+            `str` data, rather than `bytes`).
+        closing : bool, optional
+            if `True` (default), close streams upon exiting the context
+            block.
+        """
+        self.streams = streams
+        self.closing = closing
+        self.sys_stdout_write = sys.stdout.write
+        self.display_handle = None
+        self.log_file = None
+        self.log_path = None
+        self._buffer = ''
+        self._last_render = 0.0
+        self._log_bytes = 0
+        self._n_collected = 0
+        self._n_downloaded = 0
+        self._n_satisfied = 0
+        self._stage_status = None
+        self._start_time = None
+        self._status = 'starting installer'
+
+    def __enter__(self):
+        # imported here to avoid circular import
+        # pylint: disable=import-outside-toplevel
+        from davos.core.project import DAVOS_CONFIG_DIR
+        log_dir = DAVOS_CONFIG_DIR.joinpath('logs')
+        log_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_old_logs(log_dir)
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        self.log_path = log_dir.joinpath(f'install-{timestamp}-{os.getpid()}.log')
+        # pylint: disable=consider-using-with
+        self.log_file = self.log_path.open('w', encoding='utf-8')
+        self._start_time = time.monotonic()
+        sys.stdout.write = self._write
+        self._render(force=True)
+        if len(self.streams) == 1:
+            return self.streams[0]
+        return self.streams
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        sys.stdout.write = self.sys_stdout_write
+        if self._buffer:
+            self._parse_line(self._buffer)
+            self._buffer = ''
+        self.log_file.close()
+        elapsed = time.monotonic() - self._start_time
+        if exc_type is None:
+            outcome = 'done'
+        else:
+            outcome = 'failed'
+        self._status = f'{outcome} in {elapsed:.1f}s — full log: {self.log_path}'
+        self._render(force=True, final=True)
+        if self.closing:
+            for stream in self.streams:
+                stream.close()
+
+    def _parse_line(self, line):
+        match = pip_progress_regex.match(line)
+        if match is None:
+            return
+        stage = match.lastgroup
+        value = match.group(stage)
+        if stage == 'collecting':
+            self._n_collected += 1
+            self._stage_status = f'collecting {value}'
+            self._status = self._resolving_status()
+        elif stage == 'satisfied':
+            self._n_satisfied += 1
+            if self._stage_status is None:
+                self._stage_status = 'checking requirements'
+            if self._n_downloaded == 0:
+                self._status = self._resolving_status()
+        elif stage == 'downloading':
+            # pip fetches standalone metadata files for some packages
+            # before resolving; these aren't package downloads
+            if value.endswith('.metadata'):
+                return
+            self._n_downloaded += 1
+            filename = value.rsplit('/', maxsplit=1)[-1]
+            self._stage_status = (
+                f'downloading {self._n_downloaded} of '
+                f'{max(self._n_collected, self._n_downloaded)}: {filename}'
+            )
+            self._status = self._stage_status
+        elif stage == 'transferred':
+            if self._stage_status is not None and self._n_downloaded:
+                self._status = f'{self._stage_status} ({value})'
+        elif stage == 'building':
+            self._status = f'building {value}'
+        else:
+            n_pkgs = len(value.split(','))
+            self._status = f"installing {n_pkgs} package{'s' * (n_pkgs > 1)}"
+
+    def _remove_old_logs(self, log_dir):
+        # keep room for the new log among the `max_logs` most recent
+        logs = []
+        for log_path in log_dir.glob('install-*.log'):
+            try:
+                logs.append((log_path.stat().st_mtime, log_path))
+            except OSError:
+                # removed by another process
+                continue
+        logs.sort()
+        for _, log_path in logs[:max(len(logs) - self.max_logs + 1, 0)]:
+            try:
+                log_path.unlink()
+            except OSError:
+                pass
+
+    def _render(self, force=False, final=False):
+        now = time.monotonic()
+        if not force and now - self._last_render < self.min_interval:
+            return
+        self._last_render = now
+        if final:
+            text = self._status
+        else:
+            text = f'{self._status} ({now - self._start_time:.1f}s)'
+        self.display_handle = _display_progress_helper(
+            text, display_handle=self.display_handle, final=final
+        )
+
+    def _resolving_status(self):
+        n_found = self._n_collected + self._n_satisfied
+        return (f"{self._stage_status} ({n_found} requirement"
+                f"{'s' * (n_found != 1)} found, {self._n_satisfied} "
+                "already satisfied)")
+
+    def _write(self, data):
+        for stream in self.streams:
+            stream.write(data)
+        if self._log_bytes <= self.max_log_bytes:
+            n_bytes = len(data.encode('utf-8', errors='replace'))
+            self._log_bytes += n_bytes
+            if self._log_bytes <= self.max_log_bytes:
+                self.log_file.write(data)
+            else:
+                self.log_file.write(
+                    f'\n[davos: log truncated after {self.max_log_bytes} '
+                    'bytes]\n'
+                )
+        # pip redraws its own progress bars using carriage returns, so
+        # treat those as line breaks too
+        *lines, self._buffer = re.split(r'[\r\n]', self._buffer + data)
+        for line in lines:
+            self._parse_line(line)
+        self._render()
+
+
 class capture_stdout:    # pylint: disable=invalid-name
     """
     Context manager for sending stdout to multiple streams at once.
@@ -118,82 +321,397 @@ class capture_stdout:    # pylint: disable=invalid-name
         sys.stdout.flush()
 
 
+@contextmanager
+def _expose_base_projects(project):
+    """
+    Make base projects' packages visible to `pip` while it runs.
+
+    Lets `pip` see packages already installed in base projects (see
+    `davos.config.base_projects`), so it doesn't reinstall dependencies
+    they satisfy into the project (it won't modify the base projects
+    themselves, since they're outside of the project). While the
+    context is active, the project's `site-packages` directory contains
+    a `.pth` file listing the base projects' `site-packages`
+    directories, which `pip` (run with the project as its user base)
+    adds to `sys.path` *after* the project's own `site-packages`
+    directory, so packages installed in the project take priority. Does
+    nothing if `project` is `None` or there are no base projects.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project or None
+        The project packages are being installed into.
+    """
+    if project is None or not project_finder.base_dirs:
+        yield
+        return
+    pth_path = project.site_packages_dir.joinpath(_BASE_PROJECTS_PTH_NAME)
+    pth_path.parent.mkdir(parents=True, exist_ok=True)
+    pth_path.write_text(''.join(f'{base_dir}\n'
+                                for base_dir in project_finder.base_dirs),
+                        encoding='utf-8')
+    try:
+        yield
+    finally:
+        try:
+            pth_path.unlink()
+        except FileNotFoundError:
+            # removed if a timed-out installation was rolled back
+            pass
+
+
+def _find_conda_envs(root_prefix):
+    """
+    Get the names and paths of all conda environments.
+
+    Reads the environments directly from the filesystem rather than
+    running `conda info --envs`, which requires starting conda (often
+    1-3 seconds). Environments are found in the installation's `envs/`
+    directory, the user's `~/.conda/envs/` directory, any directories
+    listed in the `CONDA_ENVS_PATH` environment variable, and
+    `~/.conda/environments.txt` (where conda records every environment
+    it creates).
+
+    Parameters
+    ----------
+    root_prefix : pathlib.Path
+        The path to the root (i.e., "base") conda installation.
+
+    Returns
+    -------
+    dict of {str: str}
+        Mapping of environment names to their paths. Like `conda info
+        --envs`, excludes environments that aren't inside an `envs`
+        directory (i.e., those created with `-p`/`--prefix`), since they
+        can't be referenced by name.
+    """
+    envs_dirs = [root_prefix.joinpath('envs'),
+                 Path.home().joinpath('.conda', 'envs')]
+    envs_path_var = os.environ.get('CONDA_ENVS_PATH')
+    if envs_path_var:
+        envs_dirs.extend(Path(p) for p in envs_path_var.split(os.pathsep) if p)
+
+    env_paths = []
+    for envs_dir in envs_dirs:
+        try:
+            env_paths.extend(sorted(envs_dir.iterdir()))
+        except OSError:
+            continue
+    try:
+        environments_txt = Path.home().joinpath('.conda', 'environments.txt')
+        env_paths.extend(Path(line.strip()) for line
+                         in environments_txt.read_text().splitlines()
+                         if line.strip())
+    except OSError:
+        pass
+
+    envs_dirs_dict = {'base': str(root_prefix)}
+    for env_path in env_paths:
+        if (
+                env_path.parent.name != 'envs' or
+                env_path.name in envs_dirs_dict or
+                not env_path.joinpath('conda-meta').is_dir()
+        ):
+            continue
+        envs_dirs_dict[env_path.name] = str(env_path)
+    return envs_dirs_dict
+
+
+def _find_conda_root(env_prefix=None):
+    """
+    Find the root conda installation that manages an environment.
+
+    Parameters
+    ----------
+    env_prefix : pathlib.Path, optional
+        The path to a conda environment. If `None` (e.g., for Python
+        interpreters outside of any conda environment), the root
+        installation is found from the conda executable alone.
+
+    Returns
+    -------
+    pathlib.Path or None
+        The path to the root (i.e., "base") conda installation, or
+        `None` if it can't be found.
+
+    Notes
+    -----
+    Checks, in order:
+        1. The `CONDA_EXE` environment variable (set by `conda
+           activate` to `<root>/bin/conda`).
+        2. Whether `env_prefix` is itself the root installation.
+        3. Whether `env_prefix` is in the root installation's `envs/`
+           directory.
+        4. The conda executable recorded in the first `# cmd:` line of
+           the environment's `conda-meta/history` file (i.e., the one
+           used to create it).
+        5. The `conda` executable on `$PATH`.
+    The root installation that a conda executable belongs to is the
+    nearest directory above it that contains a `conda-meta` directory,
+    since `# cmd:` lines may record a script inside the installation's
+    `site-packages` directory rather than `bin/conda` (e.g., when conda
+    was run with `python -m conda`).
+    """
+    def _is_root(prefix):
+        return prefix.joinpath('conda-meta').is_dir() and (
+            prefix.joinpath('condabin').is_dir() or
+            # older conda versions don't create `condabin/`
+            prefix.joinpath('bin', 'conda').is_file()
+        )
+
+    def _root_from_exe(exe_path):
+        exe_path = Path(exe_path)
+        if not exe_path.is_file():
+            return None
+        for parent in exe_path.parents:
+            if parent.joinpath('conda-meta').is_dir():
+                return parent
+        return None
+
+    conda_exe = os.environ.get('CONDA_EXE')
+    if conda_exe:
+        root_prefix = _root_from_exe(conda_exe)
+        if root_prefix is not None:
+            return root_prefix
+    if env_prefix is not None:
+        candidates = [env_prefix]
+        if env_prefix.parent.name == 'envs':
+            candidates.append(env_prefix.parent.parent)
+        for candidate in candidates:
+            if _is_root(candidate):
+                return candidate
+        try:
+            with env_prefix.joinpath('conda-meta', 'history').open() as f:
+                for line in f:
+                    if line.startswith('# cmd:'):
+                        cmd_exe = line[len('# cmd:'):].split(maxsplit=1)[0]
+                        root_prefix = _root_from_exe(cmd_exe)
+                        if root_prefix is not None:
+                            return root_prefix
+                        break
+        except (OSError, IndexError):
+            pass
+    path_conda_exe = shutil.which('conda')
+    if path_conda_exe is not None:
+        return _root_from_exe(os.path.realpath(path_conda_exe))
+    return None
+
+
 def check_conda():
     """
     Check whether conda is installed and get environment info, if so.
 
     Called lazily to set values for `conda_avail`, `conda_env`, and
-    `conda_envs_dirs` config fields. Checks whether the conda executable
-    is available by running `conda list IPython` (via environment-
-    dependent `_check_conda_avail_helper()` function). If successful,
-    parses command output for name of active conda environment. Also
-    parses {env_name: env_path} mapping of all available environments
-    from the output of `conda info --envs`.
+    `conda_envs_dirs` config fields. Determines whether `davos` is
+    running in a conda environment (i.e., whether `sys.prefix` or
+    `$CONDA_PREFIX` contains a `conda-meta` directory), locates the
+    conda installation that manages it (or, if the interpreter isn't in
+    a conda environment, the one `$CONDA_EXE` or `$PATH` points to), and
+    builds a {env_name: env_path} mapping of all available
+    environments. Everything is
+    read directly from the filesystem rather than by running conda, so
+    this takes a few milliseconds rather than seconds. The results are
+    stored on the config object, so this runs at most once per kernel.
 
     Raises
     ------
     DavosError
-        If the environment mapping could be parsed from the output of
-        `conda info --envs`, but the active environment name couldn't be
-        parsed from the output of `conda list IPython`
+        If the environment mapping was created, but the active
+        environment isn't in it (e.g., it was created with
+        `-p`/`--prefix` rather than given a name).
     """
-    conda_list_output = _check_conda_avail_helper()
-    if conda_list_output is None:
+    active_prefix = None
+    for prefix in (sys.prefix, os.environ.get('CONDA_PREFIX')):
+        if prefix and Path(prefix, 'conda-meta').is_dir():
+            active_prefix = Path(prefix)
+            break
+
+    root_prefix = _find_conda_root(active_prefix)
+    if root_prefix is None or not (
+            root_prefix.joinpath('bin', 'conda').is_file() or
+            root_prefix.joinpath('condabin', 'conda').is_file() or
+            shutil.which('conda') is not None
+    ):
         config._conda_avail = False
         return
 
     config._conda_avail = True
-    # try to create mapping of environment names to paths to validate
+    # create mapping of environment names to paths to validate
     # environments used in onion comments or to set config.conda_env.
     # Want both names and paths so we can check both `-n`/`--name` &
     # `-p`/`--prefix` when parsing onion comments
-    envs_dict_command = r"conda info --envs | grep -E '^\w' | sed -E 's/ +\*? +/ /g'"
-    # noinspection PyBroadException
-    try:
-        conda_info_output = run_shell_command(envs_dict_command,
-                                              live_stdout=False)
-        # noinspection PyTypeChecker
-        envs_dirs_dict = dict(map(str.split, conda_info_output.splitlines()))
-    except Exception:    # pylint: disable=broad-except
-        # if no environments are found or output can't be parsed for
-        # some reason, just count any conda env provided as valid. This
-        # doesn't cause any major problems, we just can't catch errors
-        # as early and defer to the conda executable to throw an error
-        # when the user actually goes to install a package into an
-        # environment that doesn't exist.
-        # (just set to None so it can be referenced down below)
-        envs_dirs_dict = None
-
+    envs_dirs_dict = _find_conda_envs(root_prefix)
     config._conda_envs_dirs = envs_dirs_dict
-    # format of first line of output seems to reliably be: `# packages
-    # in environment at /path/to/environment/dir:` but can't hurt to
-    # parse more conservatively since output is so short
-    for word in conda_list_output.split():
-        if '/' in word:
-            env_name = word.split('/')[-1].rstrip(':')
-            if (
-                    envs_dirs_dict is not None and
-                    env_name not in envs_dirs_dict.keys()
-            ):
-                continue
+    if active_prefix is None:
+        # conda is installed, but this interpreter isn't in one of its
+        # environments
+        config._conda_env = None
+        return
+    for env_name, env_path in envs_dirs_dict.items():
+        if Path(env_path) == active_prefix:
             config._conda_env = env_name
             return
 
-    if envs_dirs_dict is not None:
-        # if we somehow fail to parse the environment directory path
-        # from the output, but we DID successfully create the
-        # environment mapping, something weird is going on and it's
-        # worth throwing an error with some info now. Otherwise, defer
-        # potential errors to conda executable
-        raise DavosError(
-            "Failed to programmatically determine path to conda environment "
-            "directory. If you want to install smuggled packages using conda, "
-            "you can either:\n\t1. set `davos.conda_env_path` to your "
-            "environment's path (e.g., $CONDA_PREFIX/envs/this_env)\n\t2. "
-            "pass the environment path to `-p`/`--prefix` in each onion "
-            "comment\n\t3. pass your environment's name to `-n`/`--name` in "
-            "each onion comment"
+    raise DavosError(
+        "Failed to programmatically determine path to conda environment "
+        "directory. If you want to install smuggled packages using conda, "
+        "you can either:\n\t1. set `davos.conda_env_path` to your "
+        "environment's path (e.g., $CONDA_PREFIX/envs/this_env)\n\t2. "
+        "pass the environment path to `-p`/`--prefix` in each onion "
+        "comment\n\t3. pass your environment's name to `-n`/`--name` in "
+        "each onion comment"
+    )
+
+
+def _get_alternate_site_dirs(pip_executable):
+    """
+    Get the site directories of the environment a `pip` executable uses.
+
+    Runs the Python interpreter the `pip` executable belongs to (see
+    `_get_pip_interpreter`) to get the directories it installs packages
+    into. Results are cached for each `pip` executable, so the
+    interpreter is run only the first time a given executable is used.
+
+    Parameters
+    ----------
+    pip_executable : str
+        Path to the `pip` executable.
+
+    Returns
+    -------
+    list of str or None
+        The environment's `purelib`, `platlib`, and user site-packages
+        directories (without duplicates), or `None` if its interpreter
+        couldn't be found or run.
+    """
+    try:
+        return _ALTERNATE_SITE_DIRS[pip_executable]
+    except KeyError:
+        pass
+    python_exe = _get_pip_interpreter(pip_executable)
+    if python_exe is None:
+        return None
+    code = (
+        "import json, site, sysconfig; "
+        "paths = sysconfig.get_paths(); "
+        "print(json.dumps([paths['purelib'], paths['platlib'], "
+        "site.getusersitepackages()]))"
+    )
+    command = ' '.join(map(shlex.quote, (python_exe, '-c', code)))
+    try:
+        stdout = run_shell_command(command, live_stdout=False)
+        site_dirs = json.loads(stdout.strip().splitlines()[-1])
+    except (CalledProcessError, ValueError, IndexError):
+        return None
+    site_dirs = list(dict.fromkeys(site_dirs))
+    _ALTERNATE_SITE_DIRS[pip_executable] = site_dirs
+    return site_dirs
+
+
+def _get_pip_interpreter(pip_executable):
+    """
+    Find the Python interpreter a `pip` executable runs with.
+
+    Reads the interpreter from the executable's shebang line (including
+    the `/bin/sh` "trampoline" pip uses for interpreter paths that are
+    too long for a shebang), falling back to a `python` executable in
+    the same directory as `pip`. If `pip_executable` is a command that
+    runs `pip` as a module (e.g., `"/path/to/python -m pip"`), the
+    interpreter it runs is returned.
+
+    Parameters
+    ----------
+    pip_executable : str
+        Path to the `pip` executable, or a command that runs `pip`
+        (which may be quoted, and may begin with environment variable
+        assignments; see `davos.core.executor.split_command`).
+
+    Returns
+    -------
+    str or None
+        Path to the interpreter, or `None` if it couldn't be found.
+    """
+    if not os.path.isfile(pip_executable):
+        # (otherwise, a path containing spaces would be split)
+        try:
+            argv, _ = split_command(pip_executable)
+        except ValueError:
+            # e.g., unbalanced quotes
+            return None
+        if argv[1:3] == ['-m', 'pip']:
+            return shutil.which(argv[0])
+        pip_executable = argv[0]
+    try:
+        with open(pip_executable, encoding='utf-8') as f:
+            first_line = f.readline().strip()
+            second_line = f.readline().strip()
+    except (OSError, UnicodeDecodeError):
+        first_line = second_line = ''
+    candidates = []
+    if first_line.startswith('#!'):
+        shebang = first_line[2:].split()
+        if shebang and Path(shebang[0]).name == 'sh':
+            # second line looks like:
+            #     '''exec' "/long/path/to/bin/python" "$0" "$@"
+            match = re.match(r"^'''exec' \"?([^\"]+)\"? ", second_line)
+            if match is not None:
+                candidates.append(match.group(1))
+        elif shebang and Path(shebang[0]).name == 'env':
+            if len(shebang) > 1:
+                candidates.append(shutil.which(shebang[1]))
+        elif shebang:
+            candidates.append(shebang[0])
+    pip_dir = Path(pip_executable).parent
+    candidates.extend((pip_dir.joinpath('python'),
+                       pip_dir.joinpath('python3')))
+    for candidate in candidates:
+        if candidate is not None and Path(candidate).is_file():
+            return str(candidate)
+    return None
+
+
+def _get_pip_show_location(installed_name):
+    """
+    Get a package's install location from `pip show`.
+
+    Parameters
+    ----------
+    installed_name : str
+        Package name as passed to the `pip install` command.
+
+    Returns
+    -------
+    str
+        The directory containing the installed package.
+
+    Raises
+    ------
+    davos.core.exceptions.SmugglerError
+        If the package's location couldn't be determined.
+    """
+    if '/' in installed_name:
+        # handle local paths, local/remote VCS, PEP 440 direct ref, etc.
+        dist_name = installed_name.split('@')[0].split('#')[0].split('/')[-1]
+    else:
+        # common case
+        dist_name = installed_name
+
+    pip_show_cmd = f'{config._pip_executable} show {dist_name}'
+    try:
+        pip_show_stdout = run_shell_command(pip_show_cmd, live_stdout=False)
+        location_line = next(
+            l for l in pip_show_stdout.strip().splitlines()
+            if l.startswith('Location')
+        )
+    except (CalledProcessError, StopIteration) as e:
+        msg = (
+            "Unable to locate package installed installed with non-default "
+            f"'pip' executable: {dist_name}. Package has been successfully "
+            "installed but not loaded."
         )
+        raise SmugglerError(msg) from e
+
+    return location_line.split(': ', maxsplit=1)[1].strip()
 
 
 def get_previously_imported_pkgs(install_cmd_stdout, installer):
@@ -239,6 +757,11 @@ def get_previously_imported_pkgs(install_cmd_stdout, installer):
         raise NotImplementedError(
             "conda-install stdout parsing is not yet implemented"
         )
+    if sys.version_info < (3, 8):
+        import importlib_metadata as metadata
+    else:
+        from importlib import metadata
+
     installed_pkg_regex = pip_installed_pkgs_regex
 
     matches = installed_pkg_regex.findall(install_cmd_stdout)
@@ -284,16 +807,20 @@ def handle_alternate_pip_executable(installed_name):
 
     Context manager that makes it possible to load packages installed
     into a different Python environment by changing the `pip` executable
-    (`davos.pip_executable`). This is done by using the `pip` executable
-    with which the package was installed to determine its location, and
-    then temporarily prepending that location to the module search path.
+    (`davos.pip_executable`). This is done by searching the site
+    directories of the environment the `pip` executable belongs to (via
+    `davos.core.finders.project_finder`) while the context is active.
+    The site directories are determined by running the environment's
+    interpreter the first time a given `pip` executable is used, and
+    cached for subsequent imports.
 
     Parameters
     ----------
     installed_name : str
         Package name as passed to the `pip install` command. This is the
         value of self.install_name for the Onion object for the
-        just-installed package.
+        just-installed package. Used to locate the package only if the
+        environment's site directories can't be determined.
 
     Notes
     -----
@@ -301,41 +828,19 @@ def handle_alternate_pip_executable(installed_name):
     pip_executable to smuggle local package from CWD and supplies
     relative path in onion comment (i.e., "# pip: . <args>").
     """
-    if '/' in installed_name:
-        # handle local paths, local/remote VCS, PEP 440 direct ref, etc.
-        dist_name = installed_name.split('@')[0].split('#')[0].split('/')[-1]
-    else:
-        # common case
-        dist_name = installed_name
-
-    # get install location from `pip show ___` command.
-    # In most cases, this will be `davos.pip_executable` with
-    # trailing 'bin/pip' replaced with python<major.minor>/site-packages
-    # but since this runs only if non-default pip_executable is set,
-    # it's worth the extra run time to check the safer way in order to
-    # handle various edge cases (e.g., installing from VCS, etc.)
-    pip_show_cmd = f'{config._pip_executable} show {dist_name}'
-    try:
-        pip_show_stdout = run_shell_command(pip_show_cmd, live_stdout=False)
-        location_line = next(
-            l for l in pip_show_stdout.strip().splitlines()
-            if l.startswith('Location')
-        )
-    except (CalledProcessError, StopIteration) as e:
-        msg = (
-            "Unable to locate package installed installed with non-default "
-            f"'pip' executable: {dist_name}. Package has been successfully "
-            "installed but not loaded."
-        )
-        raise SmugglerError(msg) from e
-
-    install_location = location_line.split(': ', maxsplit=1)[1].strip()
-    sys.path.insert(0, install_location)
+    site_dirs = _get_alternate_site_dirs(config._pip_executable)
+    if site_dirs is None:
+        # couldn't find or run the environment's interpreter, so fall
+        # back to asking pip where the package was installed
+        site_dirs = [_get_pip_show_location(installed_name)]
+    # make sure the import machinery notices the just-installed package
+    invalidate_path_caches(*site_dirs)
+    project_finder.install()
+    project_finder.alternate_site_dirs = site_dirs
     try:
         yield
     finally:
-        # remove temporary dir from path
-        sys.path.remove(install_location)
+        project_finder.alternate_site_dirs = []
 
 
 def import_name(name):
@@ -477,7 +982,11 @@ class Onion:
                 "installers are:\n\t'pip'"  # and 'conda'"
             )
         self.args_str = args_str
-        self.cache_key = f"{installer};{';'.join(args_str.split())}"
+        # davos-specific option, not passed to the installer or included
+        # in the cache key (since it doesn't affect what's installed)
+        installer_args = install_timeout_arg_regex.sub('', args_str)
+        self.cache_key = f"{installer};{';'.join(installer_args.split())}"
+        self.install_timeout = installer_kwargs.pop('install_timeout', None)
         if args_str == '':
             # bare smuggle statement without onion comment
             self.is_editable = False
@@ -578,7 +1087,9 @@ class Onion:
         if self.args_str == '':
             args = self.install_name
         else:
-            args = self.args_str.replace("<", "'<'").replace(">", "'>'")
+            args = install_timeout_arg_regex.sub('', self.args_str)
+            args = ' '.join(args.split())
+            args = args.replace("<", "'<'").replace(">", "'>'")
         if self.installer == 'pip':
             install_exe = config._pip_executable
             if config.noninteractive:
@@ -593,6 +1104,13 @@ class Onion:
     @property
     def is_installed(self):
         """True if the package is installed locally; otherwise, False"""
+        from packaging.requirements import InvalidRequirement
+        from packaging.specifiers import SpecifierSet
+        if sys.version_info < (3, 8):
+            import importlib_metadata as metadata
+        else:
+            from importlib import metadata
+
         installer_kwargs = self.installer_kwargs
         if self.import_name in config._stdlib_modules:
             # smuggled module is part of standard library
@@ -670,17 +1188,86 @@ class Onion:
             "smuggling packages via conda is not yet supported"
         )
 
+    def _install_locations(self):
+        """
+        Get the directories into which the installer may write files.
+
+        Returns
+        -------
+        list of pathlib.Path
+            Directories whose new contents should be removed if the
+            installation is cancelled. Nested directories are listed
+            before the directories that contain them.
+        """
+        installer_kwargs = self.installer_kwargs
+        project = config.project
+        if project is not None:
+            project_dir = project.project_dir
+            return [project.site_packages_dir,
+                    project_dir.joinpath('bin'),
+                    project_dir]
+        if 'target' in installer_kwargs:
+            return [Path(installer_kwargs['target'])]
+        if 'prefix' in installer_kwargs:
+            prefix = installer_kwargs['prefix']
+            paths = sysconfig.get_paths(vars={'base': prefix,
+                                              'platbase': prefix})
+        elif installer_kwargs.get('user'):
+            paths = sysconfig.get_paths(scheme=f'{os.name}_user')
+            paths['purelib'] = site.getusersitepackages()
+        else:
+            paths = sysconfig.get_paths()
+        return list(dict.fromkeys(
+            Path(paths[key]) for key in ('purelib', 'platlib', 'scripts')
+        ))
+
     def _pip_install_package(self):
+        project = config.project
+        if project is not None:
+            # if the package and its dependencies are all available in
+            # the shared package store, link them into the project
+            # rather than running pip (imported here to avoid a
+            # circular import)
+            from davos.core.store import link_from_store
+            stdout = link_from_store(self, project)
+            if stdout is not None:
+                return stdout
+        timeout = self.install_timeout
+        if timeout is None:
+            timeout = config._install_timeout
+        if timeout is None or project is None:
+            # installations outside of a project aren't rolled back,
+            # since their install locations are shared with packages
+            # davos didn't install
+            snapshot = None
+        else:
+            # record the project's state so a partial installation
+            # (which may have already upgraded or removed distributions)
+            # can be undone if it times out
+            snapshot = _snapshot_project(project)
+        start_time = time.monotonic()
         try:
-            stdout = run_shell_command(self.install_cmd)
+            with _expose_base_projects(project):
+                stdout = run_shell_command(self.install_cmd, timeout=timeout)
         except CalledProcessError as e:
             raise InstallerError.from_error(e)
+        except TimeoutExpired as e:
+            elapsed = time.monotonic() - start_time
+            if snapshot is not None:
+                _restore_project(project, snapshot)
+            raise InstallerTimeoutError.from_timeout(
+                e, elapsed=elapsed, rolled_back=snapshot is not None
+            ) from None
+        finally:
+            if snapshot is not None:
+                shutil.rmtree(snapshot[2], ignore_errors=True)
         # handle packages installed in non-standard locations
         install_dir = self.installer_kwargs.get('target')
-        if install_dir is not None and install_dir not in sys.path:
-            # make sure alternate target directory is in the module
-            # search path so import machinery will find it
-            sys.path.insert(0, install_dir)
+        if install_dir is not None:
+            # make sure import machinery will find packages in the
+            # alternate target directory
+            project_finder.install()
+            project_finder.add_path(install_dir)
         elif self.is_editable:
             install_dir = self.installer_kwargs.get('src')
             if install_dir is not None:
@@ -696,11 +1283,244 @@ class Onion:
                 proj_name = proj_name.replace('_', '-')
                 install_dir = Path(install_dir).resolve().joinpath(proj_name,
                                                                    subdir_name)
-                if install_dir not in sys.path:
-                    sys.path.insert(0, str(install_dir))
+                project_finder.install()
+                project_finder.add_path(install_dir)
         return stdout
 
 
+def _refresh_pkg_resources(install_cmd_stdout, locations):
+    """
+    Add just-installed distributions to `pkg_resources`'s working set.
+
+    `pkg_resources` builds its global working set (a cache of all
+    installed distributions) when it's first imported, so packages
+    installed afterward aren't visible to it (e.g., to packages that use
+    `pkg_resources.get_distribution()` to set their `__version__`).
+    Rather than reloading the `pkg_resources` module, which rescans every
+    distribution on `sys.path`, this adds only the distributions listed
+    in the installer's output, replacing any other versions of them in
+    the working set. The module is reloaded only if the installed
+    distributions can't be determined or found. Does nothing if
+    `pkg_resources` hasn't been imported.
+
+    Distributions are added without running the working set's
+    activation callbacks, since `pkg_resources`'s own callback would
+    insert their location at the front of `sys.path` (so packages in
+    the current project would shadow the rest of the environment for
+    the rest of the interpreter session).
+
+    Parameters
+    ----------
+    install_cmd_stdout : str
+        Captured stdout generated by installing the smuggled package.
+    locations : iterable of str or pathlib.Path
+        Directories the packages may have been installed into.
+    """
+    pkg_resources = sys.modules.get('pkg_resources')
+    if pkg_resources is None:
+        return
+
+    matches = pip_installed_pkgs_regex.findall(install_cmd_stdout)
+    # install names, normalized (e.g., "Scikit_Learn" -> "scikit-learn")
+    # to match keys in pkg_resources's working set
+    installed_names = {
+        pkg_resources.safe_name(dist_name.rsplit('-', maxsplit=1)[0]).lower()
+        for dist_name in itertools.chain(*map(str.split, matches))
+    }
+    if installed_names:
+        working_set = pkg_resources.working_set
+        callbacks = working_set.callbacks
+        working_set.callbacks = []
+        try:
+            for location in dict.fromkeys(map(str, locations)):
+                for dist in pkg_resources.find_distributions(location,
+                                                             only=True):
+                    if dist.key in installed_names:
+                        # only updates the working set's own list of
+                        # entries (not sys.path)
+                        working_set.add(dist, entry=location, replace=True)
+                        installed_names.discard(dist.key)
+        finally:
+            working_set.callbacks = callbacks
+        if not installed_names:
+            return
+    # couldn't parse the installed packages from the installer's output
+    # (e.g., it was run with -qqq) or find them all in the expected
+    # locations, so fall back to rebuilding the working set from scratch
+    importlib.reload(pkg_resources)
+
+
+def _remove_unlinked_files(path):
+    """
+    Remove files that aren't hard linked anywhere else.
+
+    Used when undoing a partial installation, since every file of a
+    distribution installed before it is linked into the package store
+    (or the backup directory), while files `pip` just wrote aren't.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        A file, or a directory whose files (recursively) should be
+        checked. Directories left empty are removed.
+    """
+    if path.is_symlink() or not path.is_dir():
+        try:
+            if path.lstat().st_nlink == 1:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+        return
+    for dirpath, _, filenames in os.walk(path, topdown=False):
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            try:
+                if os.lstat(file_path).st_nlink == 1:
+                    os.unlink(file_path)
+            except FileNotFoundError:
+                continue
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            # not empty
+            pass
+
+
+def _restore_project(project, snapshot):
+    """
+    Undo a partial installation into a project.
+
+    Used after installing a package into a project times out. Entries
+    the installation added to the project's `site-packages` and `bin`
+    directories are removed, and distributions it removed or replaced
+    are linked back into the project from the package store (or the
+    backup directory, for those that aren't in the store), after
+    removing any files the installation wrote in their place.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project to restore.
+    snapshot : tuple
+        The project's state before the installation, as returned by
+        `_snapshot_project()`.
+    """
+    # imported here to avoid a circular import
+    from davos.core.store import _find_stored_dist, _store_lock, link_tree
+
+    top_level_names, records, backup_dir = snapshot
+    project_dir = project.project_dir
+    site_packages_dir = project.site_packages_dir
+    for dirpath, names in top_level_names.items():
+        try:
+            current_names = os.listdir(dirpath)
+        except FileNotFoundError:
+            continue
+        for name in current_names:
+            if name in names:
+                continue
+            path = dirpath.joinpath(name)
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink()
+    with _store_lock():
+        sources = []
+        for dist_info_name, record_id in records.items():
+            try:
+                record_stat = site_packages_dir.joinpath(
+                    dist_info_name, 'RECORD'
+                ).stat()
+            except OSError:
+                pass
+            else:
+                if (record_stat.st_dev, record_stat.st_ino) == record_id:
+                    # not changed by the installation
+                    continue
+            entry_dir = _find_stored_dist(dist_info_name, record_id)
+            if entry_dir is not None:
+                sources.append(entry_dir)
+        if backup_dir.is_dir():
+            sources.append(backup_dir)
+        for source_dir in sources:
+            for dirpath in (site_packages_dir, project_dir.joinpath('bin')):
+                rel_dir = dirpath.relative_to(project_dir)
+                try:
+                    names = os.listdir(source_dir.joinpath(rel_dir))
+                except FileNotFoundError:
+                    continue
+                for name in names:
+                    _remove_unlinked_files(dirpath.joinpath(name))
+            link_tree(source_dir, project_dir)
+
+
+def _snapshot_project(project):
+    """
+    Record a project's state so an installation into it can be undone.
+
+    Only the names of the entries in the project's `site-packages` and
+    `bin` directories and the identities (device and inode numbers) of
+    its distributions' `RECORD` files are recorded, since each
+    distribution's files are hard linked into the package store (see
+    `davos.core.store`), which keeps them intact if `pip` removes them
+    from the project. Distributions that aren't in the store (e.g., if
+    it's on a different filesystem) have their files hard linked into a
+    backup directory instead. Used to restore the project (see
+    `_restore_project()`) if installing a package into it times out.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project to snapshot.
+
+    Returns
+    -------
+    tuple
+        A dict mapping the project's `site-packages` and `bin`
+        directories (`pathlib.Path`) to the names of their entries (`set`
+        of `str`), a dict mapping the names of the project's
+        `.dist-info` directories to the device and inode numbers (`tuple`
+        of `int`) of their `RECORD` files, and the backup directory
+        (`pathlib.Path`, inside the project directory), which exists
+        only if any distributions needed to be backed up.
+    """
+    # imported here to avoid a circular import
+    from davos.core.store import _link_file
+    from davos.core.usage import _dist_files
+
+    project_dir = project.project_dir
+    site_packages_dir = project.site_packages_dir
+    backup_dir = project_dir.joinpath(_INSTALL_BACKUP_DIRNAME)
+    # remove any backup left behind by an interpreter that was killed
+    # during an installation
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    top_level_names = {}
+    for dirpath in (site_packages_dir, project_dir.joinpath('bin')):
+        try:
+            top_level_names[dirpath] = set(os.listdir(dirpath))
+        except FileNotFoundError:
+            top_level_names[dirpath] = set()
+    records = {}
+    for name in top_level_names[site_packages_dir]:
+        if not name.endswith('.dist-info'):
+            continue
+        dist_info = site_packages_dir.joinpath(name)
+        try:
+            record_stat = dist_info.joinpath('RECORD').stat()
+        except OSError:
+            continue
+        records[name] = (record_stat.st_dev, record_stat.st_ino)
+        if record_stat.st_nlink > 1:
+            # linked to the store
+            continue
+        for rel_path in _dist_files(dist_info):
+            path = os.path.normpath(site_packages_dir.joinpath(rel_path))
+            rel_path = os.path.relpath(path, project_dir)
+            if not rel_path.startswith(os.pardir) and os.path.isfile(path):
+                _link_file(path, backup_dir.joinpath(rel_path))
+    return top_level_names, records, backup_dir
+
+
 def parse_line(line):
     """
     Parse a single line of code, transforming `smuggle` statements.
@@ -872,7 +1692,7 @@ def prompt_input(prompt, default=None, interrupt=None):
             pass
 
 
-def run_shell_command(command, live_stdout=None):
+def run_shell_command(command, live_stdout=None, timeout=None):
     """
     Execute a shell command and return the generated stdout as a string.
 
@@ -880,12 +1700,22 @@ def run_shell_command(command, live_stdout=None):
     ----------
     command : str
         The shell command to run. May not end in "*&*", as background
-        processes are not supported.
+        processes are not supported. The command is split into
+        arguments using shell-like syntax and run directly (i.e., not
+        via a shell), so pipes, redirection, and variable expansion
+        are not supported. Leading `NAME=value` assignments are
+        applied to the command's environment.
     live_stdout : bool, optional
         Whether to display streaming stdout from `command` execution in
         real time *in addition to* capturing and returning it. If `None`
         (default), behavior is determined by the current value of
-        `davos.suppress_stdout`.
+        `davos.suppress_stdout`. If `True` and `davos.show_progress` is
+        also `True`, a periodically updated progress summary is shown
+        in place of the streaming stdout.
+    timeout : float, optional
+        The maximum number of seconds the command may run before it is
+        terminated. If `None` (default), the command may run
+        indefinitely.
 
     Returns
     -------
@@ -895,18 +1725,21 @@ def run_shell_command(command, live_stdout=None):
     Raises
     ------
     subprocess.CalledProcessError
-        If the command returns a non-zero exit status
+        If the command returns a non-zero exit status. The command's
+        stdout and stderr are stored in the exception's `output` and
+        `stderr` attributes, respectively.
+    subprocess.TimeoutExpired
+        If the command runs for longer than `timeout` seconds.
 
     See Also
     --------
+    capture_progress :
+        context manager used when displaying a progress summary
     capture_stdout : context manager used when displaying live stdout
     contextlib.redirect_stdout :
         context manager used when not displaying live stdout
-    implementations.ipython_common._run_shell_command_helper :
-        Helper function to run shell command in IPython environments
-    implementations.python._run_shell_command_helper :
-        Helper function to run shell command in "pure"
-        (non-interactive) Python environments
+    executor.run_command :
+        function that runs the command in a subprocess
 
     Notes
     -----
@@ -919,21 +1752,18 @@ def run_shell_command(command, live_stdout=None):
 
     if live_stdout is None:
         live_stdout = not config.suppress_stdout
-    if live_stdout:
+    if live_stdout and config.show_progress:
+        command_context = capture_progress
+    elif live_stdout:
         command_context = capture_stdout
     else:
         command_context = redirect_stdout
+    # stderr is always captured and attached to the error raised if the
+    # command fails, but is only displayed live alongside stdout
+    echo_stderr = live_stdout and not config.show_progress
 
     with command_context(StringIO()) as stdout:
-        try:
-            _run_shell_command_helper(command)
-        except CalledProcessError as e:
-            # if the exception doesn't record the output, add it
-            # manually before raising
-            stdout = stdout.getvalue()
-            if e.output is None and stdout != '':
-                e.output = stdout
-            raise e
+        run_command(command, echo_stderr=echo_stderr, timeout=timeout)
         stdout = stdout.getvalue()
     return stdout
 
@@ -961,32 +1791,42 @@ def use_project(smuggle_func):
     def smuggle_wrapper(*args, **kwargs):
         project = config.project
         if project is not None:
-            # prepend the project's site-packages directory to sys.path
-            # so project's package versions are prioritized for import
-            # over versions in "regular" environment
-            sys.path.insert(0, str(project.site_packages_dir))
-            # invalidate sys.meta_path finder caches so the global
-            # working set is regenerated based on the updated sys.path.
-            # Note: after pretty extensive spot checking, I haven't
-            # managed to find a case where this is actually necessary
-            # since migrating from pkg_resources to importlib.metadata,
-            # but the docs recommend it and the overhead is extremely
-            # minor, so probably worth including in case the user or
-            # notebook environment has implemented some unusual custom
-            # meta path finder
-            importlib.invalidate_caches()
+            # search the project's site-packages directory (for both
+            # modules and distribution metadata) ahead of the "regular"
+            # environment so project's package versions are prioritized.
+            # This is done via a dedicated sys.meta_path finder rather
+            # than by prepending the directory to sys.path, which would
+            # require invalidating the caches of every path entry finder
+            # in the process (twice per smuggle) for the import system
+            # to notice the change
+            project_finder.install()
+            project_finder.project_dir = str(project.site_packages_dir)
+            # packages in any shared base projects are available too,
+            # but the project's own versions take priority (imported
+            # here to avoid a circular import)
+            from davos.core.project import _base_site_packages_dirs
+            project_finder.base_dirs = _base_site_packages_dirs()
+            # the first time the project is used, install any packages
+            # in the notebook's lockfile that are missing from it
+            # (imported here to avoid a circular import)
+            from davos.core.lockfile import sync_notebook_lockfile
+            sync_notebook_lockfile(project)
             try:
-                return smuggle_func(*args, **kwargs)
+                smuggled_obj = smuggle_func(*args, **kwargs)
             finally:
                 # after (possibly installing and) loading the package,
-                # remove the project's site-packages directory from
-                # sys.path and restore the original working set.
-                # Note: can't assume the project site-packages dir is
-                # still sys.path[0] -- some install options result in
-                # other dirs being prepended to load modules installed
-                # in custom locations
-                sys.path.remove(str(project.site_packages_dir))
-                importlib.invalidate_caches()
+                # stop searching the project's site-packages directory
+                project_finder.project_dir = None
+                project_finder.base_dirs = []
+            # update the project's last-used time, and when the
+            # distributions just imported from it were last used, in
+            # the project catalog (imported here to avoid circular
+            # imports)
+            from davos.core.catalog import record_use
+            from davos.core.usage import flush_imports
+            record_use(project)
+            flush_imports(project)
+            return smuggled_obj
         else:
             return smuggle_func(*args, **kwargs)
 
@@ -1075,16 +1915,35 @@ def smuggle(
                     f"package {pkg_name!r} not installed"
                 ) from None
         installer_stdout = onion.install_package()
-        # invalidate sys.meta_path module finder caches. Forces import
-        # machinery to notice newly installed module
-        importlib.invalidate_caches()
-        # if pkg_resources module has already been loaded, reload it in
-        # case the just-installed package uses it internally to populate
-        # its __version__ attribute from its metadata, Otherwise,
-        # pkg_resources's cached working set won't include the new
+        # refresh the cached directory listings for the install
+        # locations (only) so the import machinery notices the newly
+        # installed module
+        install_locations = [*onion._install_locations(),
+                             *project_finder.paths]
+        invalidate_path_caches(*install_locations)
+        # if pkg_resources module has already been loaded, update its
+        # cached working set in case the just-installed package uses it
+        # internally to populate its __version__ attribute from its
+        # metadata. Otherwise, the working set won't include the new
         # package
-        if 'pkg_resources' in sys.modules:
-            importlib.reload(sys.modules['pkg_resources'])
+        _refresh_pkg_resources(installer_stdout, install_locations)
+        if config.project is not None:
+            # move the newly installed distributions' files into the
+            # shared package store, then record the project's new
+            # contents and size in the project catalog, its module
+            # manifest, and the notebook's lockfile, and remove old
+            # projects if they now exceed `config.max_projects_bytes`
+            # (imported here to avoid circular imports)
+            from davos.core.catalog import record_install
+            from davos.core.lockfile import update_notebook_lockfile
+            from davos.core.manifest import update_manifest
+            from davos.core.quota import evict_projects_in_background
+            from davos.core.store import ingest_project
+            ingest_project(config.project)
+            record_install(config.project)
+            update_manifest(config.project.site_packages_dir)
+            update_notebook_lockfile(config.project)
+            evict_projects_in_background()
         # check whether the smuggled package and/or any
         # installed/updated dependencies were already imported during
         # the current runtime
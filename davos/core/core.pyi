@@ -1,15 +1,24 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from contextlib import AbstractContextManager
 from io import TextIOBase
+from pathlib import PosixPath
 from types import TracebackType
-from typing import Generic, Literal, NoReturn, overload, Protocol, Type, TypeVar, TypedDict
+from typing import (ClassVar, Final, Generic, Literal, NoReturn, overload, Protocol, TextIO, Type, TypeVar,
+                    TypedDict)
 
-__all__ = list[Literal['capture_stdout', 'check_conda', 'get_previously_imported_pkgs', 'handle_alternate_pip_executable',
-                      'import_name', 'Onion', 'parse_line', 'prompt_input', 'run_shell_command', 'use_project', 'smuggle']]
+from davos.core.project import Project
+
+__all__ = list[Literal['capture_progress', 'capture_stdout', 'check_conda', 'get_previously_imported_pkgs',
+                      'handle_alternate_pip_executable', 'import_name', 'Onion', 'parse_line', 'prompt_input', 'run_shell_command', 'use_project', 'smuggle']]
 
 _Exc = TypeVar('_Exc', bound=BaseException)
 _Streams = TypeVar('_Streams', bound=tuple[TextIOBase, ...])
 _InstallerName = Literal['conda', 'pip']
+_ProjectSnapshot = tuple[dict[PosixPath, set[str]], dict[str, tuple[int, int]], PosixPath]
+
+_ALTERNATE_SITE_DIRS: dict[str, list[str]]
+_BASE_PROJECTS_PTH_NAME: Final[Literal['_davos_base_projects.pth']]
+_INSTALL_BACKUP_DIRNAME: Final[Literal['.davos-install-backup']]
 
 class SmuggleFunc(Protocol):
     def __call__(self, name: str, as_: str | None = ..., installer: Literal['conda', 'pip'] = ..., args_str: str = ...,
@@ -33,6 +42,7 @@ class PipInstallerKwargs(TypedDict, total=False):
     implementation: Literal['cp', 'ip', 'jy', 'pp', 'py']
     index_url: str
     install_option: list[str]
+    install_timeout: float
     isolated: bool
     log: str
     no_binary: list[str]
@@ -69,6 +79,37 @@ class PipInstallerKwargs(TypedDict, total=False):
     user: bool
     verbosity: Literal[-3, -2, -1, 0, 1, 2, 3]
 
+class capture_progress(Generic[_Streams]):
+    closing: bool
+    display_handle: object | None
+    log_file: TextIO | None
+    log_path: PosixPath | None
+    max_log_bytes: ClassVar[int]
+    max_logs: ClassVar[int]
+    min_interval: ClassVar[float]
+    streams: _Streams
+    sys_stdout_write: Callable[[str], int | None]
+    _buffer: str
+    _last_render: float
+    _log_bytes: int
+    _n_collected: int
+    _n_downloaded: int
+    _n_satisfied: int
+    _stage_status: str | None
+    _start_time: float | None
+    _status: str
+    def __init__(self, *streams: _Streams, closing: bool = ...) -> None: ...
+    def __enter__(self) -> _Streams: ...
+    @overload
+    def __exit__(self, exc_type: None, exc_value: None, exc_tb: None) -> None: ...
+    @overload
+    def __exit__(self, exc_type: Type[_Exc], exc_value: _Exc, exc_tb: TracebackType) -> bool | None: ...
+    def _parse_line(self, line: str) -> None: ...
+    def _remove_old_logs(self, log_dir: PosixPath) -> None: ...
+    def _render(self, force: bool = ..., final: bool = ...) -> None: ...
+    def _resolving_status(self) -> str: ...
+    def _write(self, data: str) -> None: ...
+
 class capture_stdout(Generic[_Streams]):
     closing: bool
     streams: _Streams
@@ -81,7 +122,13 @@ class capture_stdout(Generic[_Streams]):
     def __exit__(self, exc_type: Type[_Exc], exc_value: _Exc, exc_tb: TracebackType) -> bool | None: ...
     def _write(self, data: str) -> None: ...
 
+def _expose_base_projects(project: Project | None) -> AbstractContextManager[None]: ...
+def _find_conda_envs(root_prefix: PosixPath) -> dict[str, str]: ...
+def _find_conda_root(env_prefix: PosixPath | None = ...) -> PosixPath | None: ...
 def check_conda() -> None: ...
+def _get_alternate_site_dirs(pip_executable: str) -> list[str] | None: ...
+def _get_pip_interpreter(pip_executable: str) -> str | None: ...
+def _get_pip_show_location(installed_name: str) -> str: ...
 def get_previously_imported_pkgs(install_cmd_stdout: str, installer: _InstallerName) -> list[str]: ...
 def handle_alternate_pip_executable(installed_name: str) -> AbstractContextManager[None]: ...
 def import_name(name: str) -> object: ...
@@ -93,6 +140,7 @@ class Onion:
     import_name: str
     install_name: str
     install_package: Callable[[], str]
+    install_timeout: float | None
     installer: _InstallerName
     installer_kwargs: PipInstallerKwargs
     is_editable: bool
@@ -107,12 +155,17 @@ class Onion:
     @property
     def is_installed(self) -> bool: ...
     def _conda_install_package(self) -> NoReturn: ...
+    def _install_locations(self) -> list[PosixPath]: ...
     def _pip_install_package(self) -> str: ...
 
+def _refresh_pkg_resources(install_cmd_stdout: str, locations: Iterable[PosixPath | str]) -> None: ...
+def _remove_unlinked_files(path: PosixPath) -> None: ...
+def _restore_project(project: Project, snapshot: _ProjectSnapshot) -> None: ...
+def _snapshot_project(project: Project) -> _ProjectSnapshot: ...
 def parse_line(line: str) -> str: ...
 def prompt_input(prompt: str, default: Literal['n', 'no', 'y', 'yes'] | None = ...,
                  interrupt: Literal['n', 'no', 'y', 'yes'] | None = ...) -> bool: ...
-def run_shell_command(command: str, live_stdout: bool | None = ...) -> str: ...
+def run_shell_command(command: str, live_stdout: bool | None = ..., timeout: float | None = ...) -> str: ...
 def use_project(smuggle_func: SmuggleFunc) -> SmuggleFunc: ...
 def smuggle(name: str, as_: str | None = ..., installer: _InstallerName = ..., args_str: str = ...,
             installer_kwargs: PipInstallerKwargs | None = ...) -> None: ...
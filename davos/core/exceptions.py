@@ -11,7 +11,8 @@ __all__ = [
     'DavosProjectError',
     'ProjectNotebookNotFoundError',
     'SmugglerError',
-    'InstallerError'
+    'InstallerError',
+    'InstallerTimeoutError'
 ]
 
 
@@ -20,8 +21,6 @@ from shutil import get_terminal_size
 from subprocess import CalledProcessError
 from textwrap import fill, indent
 
-import IPython
-
 
 class DavosError(Exception):
     """Base class for all `davos` library exceptions."""
@@ -85,12 +84,12 @@ class DavosParserError(SyntaxError, DavosError):
             `target_text` where the error occurred. Defaults to `1` (the
             first character in `target_text`).
         """
-        if target_text is None or IPython.version_info[0] >= 7:
+        from davos import config
+        if target_text is None or config.environment != 'IPython<7.0':
             # flot is a 4-tuple of (filename, lineno, offset, text)
             # passed to the SyntaxError constructor.
             flot = (None, None, None, None)
         else:
-            from davos import config
             xform_manager = config.ipython_shell.input_transformer_manager
             # number of "real" lines in the current cell before the
             # start of the current "chunk" (potentially multi-line
@@ -227,9 +226,10 @@ class InstallerError(SmugglerError, CalledProcessError):
         show_output : bool, optional
             Whether or not to include the failed command's stdout and/or
             stderr in the error message. If `None` (default),
-            stdout/stderr will be displayed if the `suppress_stdout`
-            field of `davos.config` is currently set to `True` (i.e.,
-            stdout would have been suppressed during execution).
+            stdout/stderr will be displayed if the `suppress_stdout` or
+            `show_progress` field of `davos.config` is currently set to
+            `True` (i.e., stdout would not have been shown in full
+            during execution).
 
         Returns
         -------
@@ -269,22 +269,24 @@ class InstallerError(SmugglerError, CalledProcessError):
         show_output : bool, optional
             Whether or not to include the failed command's stdout and/or
             stderr in the error message. If `None` (default),
-            stdout/stderr will be displayed if the `suppress_stdout`
-            field of `davos.config` is currently set to `True` (i.e.,
-            stdout would have been suppressed during execution).
+            stdout/stderr will be displayed if the `suppress_stdout` or
+            `show_progress` field of `davos.config` is currently set to
+            `True` (i.e., stdout would not have been shown in full
+            during execution).
         """
         super().__init__(returncode=returncode, cmd=cmd, output=output,
                          stderr=stderr)
         if show_output is None:
             from davos import config
             # if stdout from installer command that raised error was
-            # suppressed, include it in the error message
-            self.show_output = config.suppress_stdout
+            # suppressed (or summarized as a progress line), include it
+            # in the error message
+            self.show_output = config.suppress_stdout or config.show_progress
         else:
             self.show_output = show_output
 
     def __str__(self):
-        msg = super().__str__()
+        msg = self._summary()
         if self.show_output and (self.output or self.stderr):
             msg = f"{msg} See below for details."
             textwidth = min(get_terminal_size().columns, 85)
@@ -295,3 +297,104 @@ class InstallerError(SmugglerError, CalledProcessError):
                 text = fill(self.stderr, textwidth, replace_whitespace=False)
                 msg = f"{msg}\n\nstderr:\n{indent(text, '    ')}"
         return msg
+
+    def _summary(self):
+        return super().__str__()
+
+
+class InstallerTimeoutError(InstallerError):
+    """
+    Class for errors raised when the installer program times out.
+
+    This exception is raised when installing a smuggled package takes
+    longer than the time limit set via `davos.config.install_timeout`
+    or an onion comment's `--install-timeout` option. By the time it is
+    raised, the installer and any processes it spawned have been
+    terminated and, if the package was being installed into a project,
+    the project has been restored to its state before the installation
+    started.
+    """
+
+    @classmethod
+    def from_timeout(
+            cls,
+            timeout_exc,
+            elapsed,
+            rolled_back=False,
+            show_output=None
+    ):
+        """
+        Create a class instance from a `subprocess.TimeoutExpired`.
+
+        Parameters
+        ----------
+        timeout_exc : subprocess.TimeoutExpired
+            The exception from which to create the
+            `InstallerTimeoutError`.
+        elapsed : float
+            The number of seconds the installer ran before it was
+            terminated.
+        rolled_back : bool, optional
+            Whether the partial installation was undone (default:
+            `False`).
+        show_output : bool, optional
+            Whether or not to include the installer's stdout and/or
+            stderr in the error message (see `InstallerError`).
+
+        Returns
+        -------
+        InstallerTimeoutError
+            The exception instance.
+        """
+        return cls(cmd=timeout_exc.cmd,
+                   timeout=timeout_exc.timeout,
+                   elapsed=elapsed,
+                   output=timeout_exc.output,
+                   stderr=timeout_exc.stderr,
+                   rolled_back=rolled_back,
+                   show_output=show_output)
+
+    def __init__(
+            self,
+            cmd,
+            timeout,
+            elapsed,
+            output=None,
+            stderr=None,
+            rolled_back=False,
+            show_output=None
+    ):
+        """
+        Parameters
+        ----------
+        cmd : str
+            Text of the command that timed out.
+        timeout : float
+            The time limit (in seconds) that was exceeded.
+        elapsed : float
+            The number of seconds the command ran before it was
+            terminated.
+        output : str, optional
+            stdout generated by `cmd` before it was terminated.
+        stderr : str, optional
+            stderr generated by `cmd` before it was terminated.
+        rolled_back : bool, optional
+            Whether the partial installation was undone (default:
+            `False`).
+        show_output : bool, optional
+            Whether or not to include the command's stdout and/or
+            stderr in the error message (see `InstallerError`).
+        """
+        super().__init__(returncode=None, cmd=cmd, output=output,
+                         stderr=stderr, show_output=show_output)
+        self.timeout = timeout
+        self.elapsed = elapsed
+        self.rolled_back = rolled_back
+
+    def _summary(self):
+        msg = (f"Command '{self.cmd}' timed out after {self.elapsed:.1f} "
+               f"seconds (time limit: {self.timeout} seconds).")
+        if self.rolled_back:
+            msg = (f"{msg} The project was restored to its state before "
+                   "the installation started.")
+        return msg
@@ -1,9 +1,9 @@
 from argparse import ArgumentError
-from subprocess import CalledProcessError
+from subprocess import CalledProcessError, TimeoutExpired
 from typing import Literal
 
 __all__ = list[Literal['DavosError', 'DavosConfigError', 'DavosParserError', 'DavosProjectError', 'InstallerError',
-                       'OnionParserError', 'OnionArgumentError', 'ParserNotImplementedError',
+                       'InstallerTimeoutError', 'OnionParserError', 'OnionArgumentError', 'ParserNotImplementedError',
                        'ProjectNotebookNotFoundError', 'SmugglerError']]
 
 class DavosError(Exception): ...
@@ -38,3 +38,15 @@ class InstallerError(SmugglerError, CalledProcessError):
     def __init__(self, returncode: int, cmd: str, output: str | None = ..., stderr: str | None = ...,
                  show_output: bool | None = ...) -> None: ...
     def __str__(self) -> str: ...
+    def _summary(self) -> str: ...
+
+class InstallerTimeoutError(InstallerError):
+    elapsed: float
+    rolled_back: bool
+    timeout: float
+    @classmethod
+    def from_timeout(cls, timeout_exc: TimeoutExpired, elapsed: float, rolled_back: bool = ...,
+                     show_output: bool | None = ...) -> InstallerTimeoutError: ...
+    def __init__(self, cmd: str, timeout: float, elapsed: float, output: str | None = ..., stderr: str | None = ...,
+                 rolled_back: bool = ..., show_output: bool | None = ...) -> None: ...
+    def _summary(self) -> str: ...
@@ -0,0 +1,270 @@
+"""
+Subprocess execution shared across all environments.
+
+This module implements the function `davos` uses to run installer
+programs and other external commands. Commands are split into an
+argument vector and run directly (rather than via `/bin/sh`) in a new
+process group. Their stdout and stderr streams are read concurrently
+via the `selectors` module, so neither pipe can fill up and deadlock
+the child process, and the parent process sleeps (rather than polling)
+while waiting for output. stdout is written to `sys.stdout` as it
+arrives so it can be captured, suppressed, or summarized by the caller
+(see `davos.core.core.run_shell_command`).
+"""
+
+
+__all__ = ['run_command', 'split_command']
+
+
+import codecs
+import locale
+import os
+import selectors
+import shlex
+import signal
+import sys
+import time
+from subprocess import CalledProcessError, DEVNULL, PIPE, Popen, TimeoutExpired
+
+
+# number of seconds to wait for the process group to exit after each
+# signal sent when the command is interrupted or times out, before
+# escalating to the next (SIGINT -> SIGTERM -> SIGKILL)
+_SIGNAL_GRACE_PERIOD = 2
+# max number of bytes read from a pipe at once
+_READ_SIZE = 2 ** 16
+
+
+def _signal_process_group(process, sig):
+    """
+    Send a signal to all processes in a child process's process group.
+
+    Parameters
+    ----------
+    process : subprocess.Popen
+        The process whose group should receive the signal. Must have
+        been started with `start_new_session=True` so that it leads its
+        own process group.
+    sig : signal.Signals
+        The signal to send.
+    """
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        # process group has already exited
+        pass
+
+
+def _terminate_process_group(process, first_signal=signal.SIGINT):
+    """
+    Stop a running command and any processes it spawned.
+
+    Sends `first_signal` to the command's process group, then escalates
+    to `SIGTERM` and `SIGKILL` if the process doesn't exit within
+    `_SIGNAL_GRACE_PERIOD` seconds of each. Once it has exited, any
+    remaining processes in its group (e.g., background jobs, which
+    ignore `SIGINT`) are killed.
+
+    Parameters
+    ----------
+    process : subprocess.Popen
+        The process to terminate.
+    first_signal : {signal.SIGINT, signal.SIGTERM}, optional
+        The first signal to send. The default, `SIGINT`, mirrors what
+        happens when a command run directly in a terminal receives
+        CTRL + C.
+    """
+    signals = (signal.SIGINT, signal.SIGTERM, signal.SIGKILL)
+    for sig in signals[signals.index(first_signal):]:
+        _signal_process_group(process, sig)
+        try:
+            process.wait(timeout=_SIGNAL_GRACE_PERIOD)
+        except TimeoutExpired:
+            continue
+        else:
+            break
+    _signal_process_group(process, signal.SIGKILL)
+
+
+def split_command(command):
+    """
+    Split a command string into an argument vector and environment.
+
+    Splits `command` using shell-like syntax (see `shlex.split`). Any
+    leading `NAME=value` tokens (e.g., `PYTHONUSERBASE="/some/path"`)
+    are treated as environment variable assignments for the command,
+    as they would be by a shell.
+
+    Parameters
+    ----------
+    command : str
+        The command to split.
+
+    Returns
+    -------
+    argv : list of str
+        The program to run, followed by its arguments.
+    env : dict of {str: str}
+        Environment variables to set (or override) for the command.
+        Empty if `command` does not begin with any assignments.
+
+    Raises
+    ------
+    ValueError
+        If `command` does not contain a program to run.
+    """
+    argv = shlex.split(command)
+    env = {}
+    while argv:
+        name, sep, value = argv[0].partition('=')
+        if not sep or not name.isidentifier():
+            break
+        env[name] = value
+        argv.pop(0)
+    if not argv:
+        raise ValueError(f"No program to run in command: {command!r}")
+    return argv, env
+
+
+def run_command(command, echo_stderr=True, timeout=None):
+    """
+    Run a command in a subprocess, streaming its stdout.
+
+    The command is run without a shell, in its own process group, with
+    stdin closed. Its stdout is written to `sys.stdout` as it arrives,
+    and its stderr is collected and (optionally) written to
+    `sys.stderr` as well. If the command fails, both streams' full
+    contents are stored on the raised error. If the calling process
+    receives a `KeyboardInterrupt` while the command runs, the command
+    and any processes it spawned are stopped before the interrupt is
+    re-raised. The same happens if the command runs for longer than
+    `timeout` seconds, after which a `subprocess.TimeoutExpired` error
+    is raised.
+
+    Parameters
+    ----------
+    command : str
+        The command to run. May begin with one or more environment
+        variable assignments (see `split_command`). Shell features such
+        as pipes, redirection, and variable expansion are not supported.
+    echo_stderr : bool, optional
+        Whether to write the command's stderr to `sys.stderr` as it
+        arrives (default: `True`). The stderr is collected either way.
+    timeout : float, optional
+        The maximum number of seconds the command may run before it
+        (and any processes it spawned) is terminated. If `None`
+        (default), the command may run indefinitely.
+
+    Returns
+    -------
+    int
+        The exit code of the command. This will always be `0` if the
+        function returns. Otherwise, an error is raised.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If the command returned a non-zero exit status, or its program
+        could not be found (in which case the return code is `127`, as
+        it would be in a shell).
+    subprocess.TimeoutExpired
+        If the command did not finish within `timeout` seconds. The
+        output the command generated before it was terminated is stored
+        in the exception's `output` and `stderr` attributes.
+    """
+    argv, env_overrides = split_command(command)
+    if env_overrides:
+        env = {**os.environ, **env_overrides}
+    else:
+        env = None
+
+    try:
+        process = Popen(argv,    # pylint: disable=consider-using-with
+                        stdin=DEVNULL,
+                        stdout=PIPE,
+                        stderr=PIPE,
+                        env=env,
+                        start_new_session=True)
+    except (FileNotFoundError, PermissionError) as e:
+        retcode = 127 if isinstance(e, FileNotFoundError) else 126
+        raise CalledProcessError(returncode=retcode,
+                                 cmd=command,
+                                 output='',
+                                 stderr=f'{argv[0]}: {e.strerror}\n') from e
+
+    if timeout is None:
+        deadline = None
+    else:
+        deadline = time.monotonic() + timeout
+    encoding = locale.getpreferredencoding(False)
+    stdout_chunks = []
+    stderr_chunks = []
+    # map each pipe to the decoder for its output, the list that
+    # collects it, and (if the output should be displayed) the function
+    # to write it to
+    pipe_handlers = {
+        process.stdout: (stdout_chunks, sys.stdout.write),
+        process.stderr: (stderr_chunks,
+                         sys.stderr.write if echo_stderr else None)
+    }
+    try:
+        with selectors.DefaultSelector() as selector:
+            for pipe, (chunks, write) in pipe_handlers.items():
+                decoder = codecs.getincrementaldecoder(encoding)('replace')
+                selector.register(pipe, selectors.EVENT_READ,
+                                  (decoder, chunks, write))
+            while selector.get_map():
+                if deadline is None:
+                    ready = selector.select()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        _terminate_process_group(process,
+                                                 first_signal=signal.SIGTERM)
+                        raise TimeoutExpired(cmd=command,
+                                             timeout=timeout,
+                                             output=''.join(stdout_chunks),
+                                             stderr=''.join(stderr_chunks))
+                    ready = selector.select(timeout=remaining)
+                for key, _ in ready:
+                    decoder, chunks, write = key.data
+                    data = os.read(key.fd, _READ_SIZE)
+                    if data:
+                        text = decoder.decode(data)
+                    else:
+                        # EOF -- flush any buffered partial characters
+                        text = decoder.decode(b'', final=True)
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                    if text:
+                        chunks.append(text)
+                        if write is not None:
+                            write(text)
+        if deadline is None:
+            retcode = process.wait()
+        else:
+            # both pipes have closed, but the process may not have
+            # exited yet
+            try:
+                retcode = process.wait(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except TimeoutExpired as e:
+                _terminate_process_group(process, first_signal=signal.SIGTERM)
+                e.output = ''.join(stdout_chunks)
+                e.stderr = ''.join(stderr_chunks)
+                raise
+    except KeyboardInterrupt:
+        # forward CTRL + C to the command's process group before raising
+        _terminate_process_group(process)
+        raise
+    finally:
+        for pipe in pipe_handlers:
+            pipe.close()
+
+    if retcode != 0:
+        raise CalledProcessError(returncode=retcode,
+                                 cmd=command,
+                                 output=''.join(stdout_chunks),
+                                 stderr=''.join(stderr_chunks))
+    return retcode
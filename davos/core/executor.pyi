@@ -0,0 +1,13 @@
+from subprocess import Popen
+from signal import Signals
+from typing import Final, Literal
+
+__all__ = list[Literal['run_command', 'split_command']]
+
+_READ_SIZE: Final[int]
+_SIGNAL_GRACE_PERIOD: Final[int]
+
+def _signal_process_group(process: Popen[bytes], sig: Signals) -> None: ...
+def _terminate_process_group(process: Popen[bytes], first_signal: Literal[Signals.SIGINT, Signals.SIGTERM] = ...) -> None: ...
+def run_command(command: str, echo_stderr: bool = ..., timeout: float | None = ...) -> Literal[0]: ...
+def split_command(command: str) -> tuple[list[str], dict[str, str]]: ...
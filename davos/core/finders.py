@@ -0,0 +1,311 @@
+"""
+Import machinery for loading packages from non-standard locations.
+
+This module implements the `sys.meta_path` finder `davos` uses to load
+smuggled packages (and their metadata) from the current project's
+`site-packages` directory and from alternate install locations (e.g.,
+`--target` or `--src` directories passed via onion comments). Rather
+than temporarily prepending these directories to `sys.path` and
+flushing every path entry finder's cache via
+`importlib.invalidate_caches()`, the finder stays installed for the
+life of the interpreter and searches only its own directories, so
+imports elsewhere in the kernel keep their cached directory listings.
+Modules in the active project are found using a precomputed manifest of
+its modules (see `davos.core.manifest`), so its directories don't need
+to be listed at all.
+"""
+
+
+__all__ = ['invalidate_path_caches', 'project_finder', 'ProjectPathFinder']
+
+
+import os
+import sys
+from importlib.machinery import PathFinder
+from importlib.util import spec_from_file_location
+
+from davos.core.manifest import load_manifest
+
+
+# doesn't subclass importlib.abc.MetaPathFinder, since importing
+# importlib.abc (and, on newer Python versions, importlib.resources)
+# noticeably slows down importing davos
+class ProjectPathFinder:
+    """
+    `sys.meta_path` finder for project and alternate install locations.
+
+    Searches (in order) the active project's `site-packages` directory
+    and any alternate install locations that have been added, ahead of
+    the module search path used by the standard path-based finder.
+    Finding modules is delegated to `importlib.machinery.PathFinder`,
+    so each directory's path entry finder (and its cached directory
+    listing) is shared with `sys.path_importer_cache`.
+
+    Attributes
+    ----------
+    project_dir : str or None
+        The `site-packages` directory of the project packages are
+        currently being smuggled from, if any. Set by
+        `davos.core.core.use_project` only while `smuggle()` runs, so
+        project packages are prioritized over the "regular" environment
+        only when they're smuggled.
+    base_dirs : list of str
+        The `site-packages` directories of the base projects (see
+        `davos.config.base_projects`) layered under the project in
+        `project_dir`. Searched after `project_dir`, and set and cleared
+        along with it.
+    alternate_site_dirs : list of str
+        Site directories of the environment a non-default
+        `davos.pip_executable` installs packages into. Set by
+        `davos.core.core.handle_alternate_pip_executable` only while a
+        just-installed package is being loaded.
+    extra_paths : list of str
+        Alternate install locations, most recently added first. These
+        are searched at all times, as though they were on `sys.path`.
+    imported_modules : dict of {str: set of str}
+        Names of top-level modules loaded from each project
+        `site-packages` directory that haven't yet been recorded in the
+        project catalog (see `davos.core.usage.flush_imports`).
+    """
+
+    def __init__(self):
+        self.project_dir = None
+        self.base_dirs = []
+        self.alternate_site_dirs = []
+        self.extra_paths = []
+        self.imported_modules = {}
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} paths={self.paths!r}>'
+
+    @property
+    def paths(self):
+        """
+        The directories searched by the finder, in order.
+
+        Returns
+        -------
+        list of str
+            The active project's `site-packages` directory and those of
+            its base projects (if any), followed by the active alternate
+            environment's site directories and alternate install
+            locations.
+        """
+        paths = [*self.alternate_site_dirs, *self.extra_paths]
+        if self.project_dir is not None:
+            paths[:0] = [self.project_dir, *self.base_dirs]
+        return paths
+
+    def add_path(self, path):
+        """
+        Add an alternate install location to be searched for modules.
+
+        Does nothing if `path` has already been added or is on
+        `sys.path`, so repeatedly installing to the same location
+        doesn't accumulate duplicate entries.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The directory to add. It's searched before any previously
+            added locations.
+        """
+        path = str(path)
+        if path not in self.extra_paths and path not in sys.path:
+            self.extra_paths.insert(0, path)
+
+    def find_distributions(self, context=None):
+        """
+        Find distributions installed in the finder's directories.
+
+        Called by `importlib.metadata` (or its `importlib_metadata`
+        backport) so that, e.g., `metadata.version()` reports the
+        version of a package installed in the active project rather
+        than the "regular" environment.
+
+        Parameters
+        ----------
+        context : importlib.metadata.DistributionFinder.Context, optional
+            The search context. If it specifies a `path` to search
+            (rather than defaulting to `sys.path`), nothing is returned.
+
+        Returns
+        -------
+        iterator of importlib.metadata.Distribution
+            Distributions matching `context.name` in the finder's
+            directories.
+        """
+        if sys.version_info < (3, 8):
+            import importlib_metadata as metadata
+        else:
+            from importlib import metadata
+
+        if context is None:
+            context = metadata.DistributionFinder.Context()
+        paths = self.paths
+        if not paths or 'path' in vars(context):
+            return iter(())
+        project_context = metadata.DistributionFinder.Context(
+            name=context.name, path=paths
+        )
+        return metadata.MetadataPathFinder.find_distributions(project_context)
+
+    def find_spec(self, fullname, path=None, target=None):
+        """
+        Find the spec for a top-level module in the finder's directories.
+
+        Parameters
+        ----------
+        fullname : str
+            The fully qualified name of the module.
+        path : list of str, optional
+            The parent package's `__path__`, for submodules. Submodules
+            of packages in the active project are found using the
+            project's module manifest (see `davos.core.manifest`). Other
+            submodules are left to the standard finder, which searches
+            their parent package's directory.
+        target : types.ModuleType, optional
+            The module being reloaded, if any.
+
+        Returns
+        -------
+        importlib.machinery.ModuleSpec or None
+            The module's spec, or `None` if it isn't found in any of the
+            finder's directories.
+        """
+        project_dir = self.project_dir
+        manifest = None
+        if project_dir is not None:
+            # modules in the project are found from its manifest rather
+            # than by listing its directories
+            manifest = load_manifest(project_dir)
+        if path is not None:
+            if manifest is None:
+                return None
+            return _spec_from_manifest(manifest, fullname, path)
+        paths = self.paths
+        spec = None
+        if manifest is not None:
+            spec = _spec_from_manifest(manifest, fullname, None)
+            if spec is None and fullname not in manifest:
+                # the module isn't in the project, so there's no need to
+                # search its site-packages directory
+                paths = paths[1:]
+        if spec is None:
+            if not paths:
+                return None
+            spec = PathFinder.find_spec(fullname, paths, target)
+            if spec is None:
+                return None
+            if spec.loader is None:
+                # namespace package -- include portions from the rest
+                # of the module search path, which would otherwise be
+                # hidden
+                spec = PathFinder.find_spec(fullname, [*paths, *sys.path],
+                                            target)
+        if project_dir is not None:
+            # note modules loaded from the project (i.e., packages whose
+            # directories or modules whose files are in it), so when
+            # each of its distributions was last used can be tracked
+            locations = spec.submodule_search_locations or [spec.origin or '']
+            if any(os.path.dirname(location) == project_dir
+                   for location in locations):
+                self.imported_modules.setdefault(project_dir, set()).add(
+                    fullname
+                )
+        return spec
+
+    def install(self):
+        """
+        Add the finder to `sys.meta_path`, if it isn't already there.
+
+        The finder is inserted immediately before the standard
+        path-based finder, so built-in and frozen modules are still
+        found first.
+        """
+        if self in sys.meta_path:
+            return
+        for ix, finder in enumerate(sys.meta_path):
+            if finder is PathFinder:
+                sys.meta_path.insert(ix, self)
+                break
+        else:
+            sys.meta_path.insert(0, self)
+
+    def invalidate_caches(self):
+        """
+        Refresh the cached directory listings for the finder's paths.
+
+        Called by `importlib.invalidate_caches()`, and by `davos` after
+        installing packages into the finder's directories.
+        """
+        invalidate_path_caches(*self.paths)
+
+
+def _spec_from_manifest(manifest, fullname, path):
+    """
+    Create a module's spec from a project's module manifest.
+
+    Parameters
+    ----------
+    manifest : dict
+        The project's module manifest, as returned by
+        `davos.core.manifest.load_manifest()`.
+    fullname : str
+        The fully qualified name of the module.
+    path : list of str or None
+        The parent package's `__path__`, for submodules.
+
+    Returns
+    -------
+    importlib.machinery.ModuleSpec or None
+        The module's spec, or `None` if the module isn't in the
+        manifest, is a namespace package (whose portions may be spread
+        across multiple directories), or (for submodules) isn't in
+        `path`.
+    """
+    entry = manifest.get(fullname)
+    if entry is None or entry[0] is None:
+        return None
+    origin, is_package = entry
+    location = os.path.dirname(origin) if is_package else origin
+    if path is not None and os.path.dirname(location) not in list(path):
+        return None
+    return spec_from_file_location(
+        fullname,
+        origin,
+        submodule_search_locations=[location] if is_package else None
+    )
+
+
+def invalidate_path_caches(*paths):
+    """
+    Refresh the cached directory listings for specific path entries.
+
+    A targeted alternative to `importlib.invalidate_caches()`, which
+    invalidates the caches of *every* path entry finder in the process.
+    Used after installing packages so the import system notices new
+    modules in the install locations without discarding cached listings
+    of unrelated directories.
+
+    Parameters
+    ----------
+    *paths : str or pathlib.Path
+        The directories whose path entry finders should be refreshed.
+        Directories that haven't been searched yet (and so have no
+        cached listing) are skipped.
+    """
+    for path in map(str, paths):
+        if path not in sys.path_importer_cache:
+            continue
+        finder = sys.path_importer_cache[path]
+        if finder is None:
+            # no finder could be created for the directory (e.g., it
+            # didn't exist yet when it was first searched), so remove
+            # the entry to try again next time
+            del sys.path_importer_cache[path]
+        elif hasattr(finder, 'invalidate_caches'):
+            finder.invalidate_caches()
+
+
+project_finder = ProjectPathFinder()
@@ -0,0 +1,34 @@
+from collections.abc import Iterator, Sequence
+from importlib.machinery import ModuleSpec
+from importlib.metadata import Distribution, DistributionFinder
+from pathlib import PosixPath
+from types import ModuleType
+from typing import Literal
+
+__all__ = list[Literal['invalidate_path_caches', 'project_finder', 'ProjectPathFinder']]
+
+class ProjectPathFinder:
+    alternate_site_dirs: list[str]
+    base_dirs: list[str]
+    extra_paths: list[str]
+    imported_modules: dict[str, set[str]]
+    project_dir: str | None
+    def __init__(self) -> None: ...
+    def __repr__(self) -> str: ...
+    @property
+    def paths(self) -> list[str]: ...
+    def add_path(self, path: PosixPath | str) -> None: ...
+    def find_distributions(self, context: DistributionFinder.Context | None = ...) -> Iterator[Distribution]: ...
+    def find_spec(self, fullname: str, path: Sequence[str] | None = ...,
+                  target: ModuleType | None = ...) -> ModuleSpec | None: ...
+    def install(self) -> None: ...
+    def invalidate_caches(self) -> None: ...
+
+def _spec_from_manifest(
+        manifest: dict[str, tuple[str | None, bool]],
+        fullname: str,
+        path: Sequence[str] | None
+) -> ModuleSpec | None: ...
+def invalidate_path_caches(*paths: PosixPath | str) -> None: ...
+
+project_finder: ProjectPathFinder
@@ -0,0 +1,222 @@
+"""
+Identify notebooks across moves, renames, and copies.
+
+Notebook-specific projects are named for their notebooks' paths, so
+moving or renaming a notebook used to leave its project behind (as an
+`AbstractProject`) and create a new, empty project for the notebook's
+new path, into which every smuggled package was reinstalled. To avoid
+this, the project catalog (see `davos.core.catalog`) also records an
+identity for each notebook-specific project's notebook, read from the
+notebook file:
+
+- a notebook ID stored in the notebook's metadata (as
+  `{"davos": {"notebook_id": "..."}}`), if present. This can be any
+  string (e.g., a UUID) and is carried along when the notebook is moved
+  or copied.
+- the IDs of the notebook's cells, which Jupyter assigns randomly when
+  cells are created (nbformat 4.5 and later).
+
+When a notebook without a project of its own is first run, `davos` looks
+for an existing project whose notebook has the same notebook ID or
+shares at least `_MIN_CELL_OVERLAP` of its cell IDs. The project is
+renamed to match the notebook's new path only if its notebook no longer
+exists (i.e., the notebook was moved or renamed), it hasn't been used
+in the last `davos.core.quota._EVICTION_MIN_IDLE` seconds (since it may
+be in use by another notebook kernel that still has the notebook open
+under its old path), and the notebook has the same notebook ID or
+shares at least `_MIN_RENAME_CELL_OVERLAP` of its cell IDs (since a
+looser match may be a different notebook built from a copy of it).
+Otherwise, the project is cloned (see `Project.clone()`), which is cheap
+since the clone's files are linked from the package store. Either way,
+the notebook can use its packages without reinstalling them.
+"""
+
+
+__all__ = ['adopt_previous_project', 'read_notebook_identity']
+
+
+import json
+import os
+import time
+import warnings
+from pathlib import Path
+
+from davos import config
+from davos.core.exceptions import DavosProjectError
+from davos.core.project import DAVOS_PROJECT_DIR, Project
+
+
+# min fraction of cell IDs two versions of a notebook must share
+# (out of all cell IDs in either) to be considered the same notebook
+_MIN_CELL_OVERLAP = 0.5
+# min fraction of cell IDs a moved notebook must share with its old
+# version for the old version's project to be renamed rather than cloned
+_MIN_RENAME_CELL_OVERLAP = 0.9
+# cache of notebooks' identities, keyed by their paths
+# format: {notebook_path: (mtime, (notebook_id, cell_ids)), ...}
+_IDENTITY_CACHE = {}
+
+
+def _find_previous_project(notebook_path):
+    """
+    Find the project used by a notebook before it was moved or copied.
+
+    Parameters
+    ----------
+    notebook_path : str
+        The absolute path to the notebook.
+
+    Returns
+    -------
+    tuple or None
+        The name of the project that most likely belonged to the
+        notebook before it was moved or copied (`str`) and whether it
+        should be cloned rather than renamed (`bool`), or `None` if no
+        project matches the notebook.
+    """
+    # imported here to avoid a circular import
+    from davos.core.catalog import notebook_identities
+    from davos.core.quota import _EVICTION_MIN_IDLE
+
+    identity = read_notebook_identity(notebook_path)
+    if identity is None:
+        return None
+    notebook_id, cell_ids = identity
+    if notebook_id is None and not cell_ids:
+        return None
+    by_notebook_id = []
+    by_cell_ids = []
+    for entry in notebook_identities():
+        if (
+                entry['notebook_path'] == notebook_path
+                or not DAVOS_PROJECT_DIR.joinpath(entry['safe_name']).is_dir()
+        ):
+            continue
+        if notebook_id is not None and entry['notebook_id'] == notebook_id:
+            by_notebook_id.append((1, entry))
+        elif cell_ids and entry['cell_ids']:
+            overlap = (len(cell_ids & entry['cell_ids'])
+                       / len(cell_ids | entry['cell_ids']))
+            if overlap >= _MIN_CELL_OVERLAP:
+                by_cell_ids.append((overlap, entry))
+    candidates = by_notebook_id or by_cell_ids
+    if not candidates:
+        return None
+    # prefer projects that can be renamed (i.e., whose notebooks were
+    # moved or renamed rather than copied, that aren't in use, and that
+    # match closely enough), then closer matches, then more recently
+    # used projects
+    idle_cutoff = time.time() - _EVICTION_MIN_IDLE
+    scored = []
+    for overlap, entry in candidates:
+        # (notebook ID matches are scored as a full overlap)
+        movable = (
+            overlap >= _MIN_RENAME_CELL_OVERLAP
+            and (entry['last_used'] or 0) <= idle_cutoff
+            and not Path(entry['notebook_path']).is_file()
+        )
+        scored.append(((movable, overlap, entry['last_used'] or 0), entry))
+    best_score, best_entry = max(scored, key=lambda item: item[0])
+    return best_entry['name'], not best_score[0]
+
+
+def adopt_previous_project(notebook_path):
+    """
+    Reuse a moved or copied notebook's existing project.
+
+    Called when the default project for a notebook is first set up and
+    the notebook has no project of its own. If the notebook was moved
+    or renamed, its old project is renamed to match its new path, as
+    long as the old project hasn't been used recently and the notebook
+    matches its old version closely. Otherwise (including when the
+    notebook was copied), the original notebook's project is cloned.
+    Failures are turned into warnings, since the notebook can still use
+    a new, empty project.
+
+    Parameters
+    ----------
+    notebook_path : str
+        The absolute path to the notebook.
+
+    Returns
+    -------
+    bool
+        `True` if an existing project was renamed or cloned for the
+        notebook. Otherwise, `False`.
+    """
+    import sqlite3
+
+    try:
+        found = _find_previous_project(notebook_path)
+        if found is None:
+            return False
+        old_name, copied = found
+        old_project = Project(old_name)
+        if copied:
+            old_project.clone(notebook_path)
+        else:
+            old_project.rename(notebook_path)
+    except (sqlite3.Error, OSError, DavosProjectError) as e:
+        warnings.warn(
+            f"Failed to reuse existing davos project for {notebook_path}: "
+            f"{e}",
+            category=RuntimeWarning
+        )
+        return False
+    if not config.suppress_stdout:
+        if not copied:
+            print(f"{notebook_path} appears to have been moved from "
+                  f"{old_name}. Moved its davos project to match.")
+        elif Path(old_name).is_file():
+            print(f"{notebook_path} appears to be a copy of {old_name}. "
+                  "Created its davos project from a copy of that "
+                  "notebook's.")
+        else:
+            print(f"{notebook_path} appears to have been moved from "
+                  f"{old_name}. Created its davos project from a copy "
+                  "of that notebook's, leaving the original in place.")
+    return True
+
+
+def read_notebook_identity(notebook_path):
+    """
+    Read the information used to identify a notebook from its file.
+
+    Parameters
+    ----------
+    notebook_path : str or pathlib.Path
+        The path to the notebook.
+
+    Returns
+    -------
+    tuple or None
+        The ID in the notebook's metadata (`str`, or `None` if it has
+        none) and the IDs of its cells (`frozenset` of `str`), or `None`
+        if the notebook can't be read.
+    """
+    notebook_path = str(notebook_path)
+    try:
+        mtime = os.stat(notebook_path).st_mtime
+        cached = _IDENTITY_CACHE.get(notebook_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(notebook_path, encoding='utf-8') as f:
+            notebook = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(notebook, dict):
+        return None
+    metadata = notebook.get('metadata')
+    notebook_id = None
+    if isinstance(metadata, dict) and isinstance(metadata.get('davos'), dict):
+        notebook_id = metadata['davos'].get('notebook_id')
+        if not isinstance(notebook_id, str):
+            notebook_id = None
+    cells = notebook.get('cells')
+    cell_ids = frozenset(
+        cell['id'] for cell in (cells if isinstance(cells, list) else ())
+        if isinstance(cell, dict) and isinstance(cell.get('id'), str)
+    )
+    identity = (notebook_id, cell_ids)
+    _IDENTITY_CACHE[notebook_path] = (mtime, identity)
+    return identity
@@ -0,0 +1,12 @@
+from pathlib import PosixPath
+from typing import Final, Literal
+
+__all__ = list[Literal['adopt_previous_project', 'read_notebook_identity']]
+
+_IDENTITY_CACHE: dict[str, tuple[float, tuple[str | None, frozenset[str]]]]
+_MIN_CELL_OVERLAP: Final[float]
+_MIN_RENAME_CELL_OVERLAP: Final[float]
+
+def _find_previous_project(notebook_path: str) -> tuple[str, bool] | None: ...
+def adopt_previous_project(notebook_path: str) -> bool: ...
+def read_notebook_identity(notebook_path: PosixPath | str) -> tuple[str | None, frozenset[str]] | None: ...
@@ -0,0 +1,438 @@
+"""
+Lockfiles for davos projects.
+
+A lockfile lists the exact version of each distribution installed in a
+project, one `name==version` requirement per line -- the same format
+`Project.freeze()` (and `pip freeze`) outputs. This module implements
+`Project.lock()`, which writes a project's lockfile, and
+`Project.sync()`, which brings a project's installed packages in line
+with a lockfile.
+
+Syncing a project is incremental: distributions already installed at
+the locked version are left alone, distributions not in the lockfile
+are removed, and everything missing or installed at a different version
+is installed together -- by linking it from the package store (see
+`davos.core.store`) where possible and otherwise with a single
+`pip install` command.
+
+Notebook-specific projects also keep a lockfile next to their notebook
+(`<notebook-name>.davos.lock`), which is updated whenever packages are
+installed into the project. When the notebook is run in a new
+interpreter session (e.g., after restarting the kernel or on another
+machine), any locked packages missing from its project are installed
+together the first time a package is smuggled, rather than one `smuggle`
+statement at a time. Since those packages are installed without their
+dependencies, the lockfile also records the interpreter and platform it
+was written on (as a comment on its first line), and is only used this
+way in a matching environment. This can be disabled by setting
+`davos.config.use_lockfile` to `False`.
+"""
+
+
+__all__ = [
+    'LOCKFILE_SUFFIX',
+    'notebook_lockfile_path',
+    'sync_notebook_lockfile',
+    'sync_project',
+    'update_notebook_lockfile',
+    'write_lockfile'
+]
+
+
+import os
+import warnings
+from pathlib import Path, PurePath
+from subprocess import CalledProcessError
+
+from davos import config
+from davos.core.exceptions import DavosProjectError, InstallerError
+from davos.core.finders import invalidate_path_caches
+
+
+LOCKFILE_SUFFIX = '.davos.lock'
+# first line of a notebook's lockfile, recording the environment it was
+# written in
+_ENVIRONMENT_HEADER = '# davos environment: '
+# names of projects whose notebook lockfile has been synced during the
+# current interpreter session
+_SYNCED_PROJECTS = set()
+
+
+def _environment_tag():
+    """
+    Get a tag identifying the current interpreter and platform.
+
+    Returns
+    -------
+    str
+        The current environment's interpreter, ABI, and platform tags,
+        in the format used in wheel filenames (e.g.,
+        `'cp311-cp311-linux_x86_64'`).
+    """
+    import sysconfig
+
+    from packaging.tags import sys_tags
+
+    # the most specific tag supported by the running interpreter
+    tag = next(sys_tags())
+    platform = sysconfig.get_platform().replace('-', '_').replace('.', '_')
+    return f'{tag.interpreter}-{tag.abi}-{platform}'
+
+
+def _parse_lock(lock_text):
+    """
+    Parse the requirements in a lockfile.
+
+    Parameters
+    ----------
+    lock_text : str
+        The lockfile's contents. Blank lines and comments (starting with
+        "#") are ignored, as are requirements whose environment markers
+        (e.g., `; sys_platform == "win32"`) don't apply to the current
+        environment.
+
+    Returns
+    -------
+    dict
+        The locked requirements (`packaging.requirements.Requirement`)
+        and the versions they're pinned to (`str`), keyed by their
+        canonicalized distribution names.
+
+    Raises
+    ------
+    davos.core.exceptions.DavosProjectError
+        If a line isn't a valid requirement pinned to an exact version
+        (`name==version`).
+    """
+    from packaging.requirements import InvalidRequirement, Requirement
+    from packaging.utils import canonicalize_name
+
+    requirements = {}
+    for line in lock_text.splitlines():
+        line = line.split('#', maxsplit=1)[0].strip()
+        if not line:
+            continue
+        try:
+            req = Requirement(line)
+        except InvalidRequirement:
+            req = None
+        if (
+                req is None
+                or req.url is not None
+                or len(req.specifier) != 1
+                or next(iter(req.specifier)).operator != '=='
+        ):
+            raise DavosProjectError(
+                f"Invalid lockfile requirement: {line!r}. Lockfiles may "
+                "only contain requirements pinned to exact versions "
+                "(e.g., 'numpy==1.26.4')."
+            )
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+        version = next(iter(req.specifier)).version
+        requirements[canonicalize_name(req.name)] = (req, version)
+    return requirements
+
+
+def _read_lock(lock):
+    """
+    Get the contents of a lockfile.
+
+    Parameters
+    ----------
+    lock : str or pathlib.Path
+        A path to a lockfile, or the contents of one. Strings are
+        treated as paths if they name an existing file.
+
+    Returns
+    -------
+    str
+        The lockfile's contents.
+    """
+    if isinstance(lock, PurePath):
+        path = lock
+    else:
+        path = Path(os.path.expandvars(lock)).expanduser()
+        try:
+            is_file = path.is_file()
+        except OSError:
+            # e.g., multi-line text too long to be a path
+            is_file = False
+        if not is_file:
+            return lock
+    return path.read_text(encoding='utf-8')
+
+
+def notebook_lockfile_path(project):
+    """
+    Get the path to a notebook-specific project's lockfile.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project.
+
+    Returns
+    -------
+    pathlib.Path or None
+        The path to the lockfile next to the project's notebook (which
+        may not exist yet), or `None` if `project` isn't a
+        notebook-specific project.
+    """
+    # imported here to avoid a circular import
+    from davos.core.project import ConcreteProject
+
+    if not (isinstance(project, ConcreteProject)
+            and project.name.endswith('.ipynb')):
+        return None
+    notebook_path = Path(project.name)
+    return notebook_path.with_name(f'{notebook_path.stem}{LOCKFILE_SUFFIX}')
+
+
+def sync_notebook_lockfile(project):
+    """
+    Install packages missing from a project listed in its lockfile.
+
+    Called before the first `smuggle` statement that uses a project in
+    each interpreter session, so a notebook's packages are installed all
+    at once (e.g., when it's first run on a new machine) rather than
+    one `smuggle` statement at a time. Packages installed in the project
+    but not in the lockfile are kept. Does nothing if
+    `davos.config.use_lockfile` is `False`, `project` isn't a
+    notebook-specific project, its notebook has no lockfile, or the
+    lockfile was written with a different interpreter or on a different
+    platform (since locked packages are installed without their
+    dependencies, which may differ between environments).
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project being used to smuggle a package.
+    """
+    if not config._use_lockfile or project.name in _SYNCED_PROJECTS:
+        return
+    _SYNCED_PROJECTS.add(project.name)
+    lockfile_path = notebook_lockfile_path(project)
+    if lockfile_path is None:
+        return
+    try:
+        lock_text = lockfile_path.read_text(encoding='utf-8')
+    except OSError:
+        # no lockfile
+        return
+    header, _, lock_text = lock_text.partition('\n')
+    if header != f'{_ENVIRONMENT_HEADER}{_environment_tag()}':
+        # written in a different environment (or by an older version of
+        # davos), so let smuggle statements resolve dependencies
+        return
+    if lock_text.strip() == project.freeze():
+        # fast path for the usual case where nothing has changed
+        return
+    try:
+        sync_project(project, lock_text, remove_extra=False)
+    except (DavosProjectError, InstallerError) as e:
+        # packages will be installed by individual smuggle statements
+        warnings.warn(
+            f"Failed to install packages from {lockfile_path}: {e}",
+            category=RuntimeWarning
+        )
+
+
+def sync_project(project, lock, remove_extra=True):
+    """
+    Make a project's installed packages match a lockfile.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project to sync.
+    lock : str or pathlib.Path
+        A path to a lockfile, or the contents of one (e.g., the output
+        of `Project.freeze()`).
+    remove_extra : bool, optional
+        Whether to remove distributions installed in the project that
+        aren't in the lockfile (default: `True`).
+
+    Raises
+    ------
+    davos.core.exceptions.DavosProjectError
+        If the lockfile contains a requirement that isn't pinned to an
+        exact version.
+    davos.core.exceptions.InstallerError
+        If `pip` fails to install the missing distributions.
+
+    Notes
+    -----
+    Since a lockfile is expected to list every distribution the
+    project needs, distributions are installed without their
+    dependencies (i.e., with `pip install --no-deps`), so `pip` doesn't
+    need to resolve them.
+
+    Installed distributions are only removed once their replacements
+    have been installed. Distributions installed at a different version
+    than the lockfile's are replaced by `pip` (which restores them if
+    the installation fails) or, when the locked version is linked from
+    the package store, unlinked just before it's linked. Distributions
+    not in the lockfile are removed only if `pip` succeeds, so a failed
+    sync leaves every previously installed distribution in place.
+    """
+    # imported here to avoid circular imports
+    from packaging.utils import canonicalize_name
+    from davos.core.catalog import record_install
+    from davos.core.core import _get_pip_interpreter, run_shell_command
+    from davos.core.store import (
+        _find_store_entry,
+        _store_available,
+        _store_lock,
+        _unlink_dist,
+        DAVOS_STORE_DIR,
+        ingest_project,
+        link_tree
+    )
+
+    locked = _parse_lock(_read_lock(lock))
+    project._refresh_installed_pkgs()
+    to_install = []
+    # metadata directories of installed distributions to be replaced
+    # with their locked versions, keyed by their canonicalized names
+    to_replace = {}
+    # (metadata directory, name, version) of each distribution to
+    # remove (i.e., not in the lockfile)
+    to_remove = []
+    installed_keys = set()
+    for dirname, (_, (name, version)) in project._dist_info_cache.items():
+        key = canonicalize_name(name)
+        installed_keys.add(key)
+        metadata_dir = project.site_packages_dir.joinpath(dirname)
+        if key not in locked:
+            if remove_extra:
+                to_remove.append((metadata_dir, name, version))
+            continue
+        req, locked_version = locked[key]
+        if not req.specifier.contains(version, prereleases=True):
+            to_replace[key] = metadata_dir
+            to_install.append((req, locked_version))
+    to_install += [locked_req for key, locked_req in locked.items()
+                   if key not in installed_keys]
+    if not (to_install or to_remove):
+        # already in sync
+        return
+
+    linked = []
+    # an empty project's directory may have been cleaned up
+    project.project_dir.mkdir(parents=False, exist_ok=True)
+    if (
+            config._pip_executable == config._default_pip_executable
+            and _store_available(project.project_dir)
+    ):
+        interpreter = _get_pip_interpreter(config._pip_executable)
+        with _store_lock():
+            for req, version in to_install:
+                key = canonicalize_name(req.name)
+                replaced = to_replace.get(key)
+                if (
+                        replaced is not None
+                        and not replaced.joinpath('RECORD').is_file()
+                ):
+                    # can't be unlinked, so let pip replace it
+                    continue
+                found = _find_store_entry(req, interpreter)
+                if found is not None:
+                    if replaced is not None:
+                        _unlink_dist(replaced, project.project_dir)
+                    link_tree(found[0], project.project_dir)
+                    linked.append(f'{req.name}-{version}')
+        to_install = [(req, version) for req, version in to_install
+                      if f'{req.name}-{version}' not in linked]
+    pip_cmd = (f'PYTHONUSERBASE="{project.project_dir}" '
+               f'{config._pip_executable}')
+    no_input = ' --no-input' if config.noninteractive else ''
+    try:
+        if to_install:
+            # pip replaces other versions of these distributions
+            # installed in the project itself
+            specs = ' '.join(f'{req.name}=={version}'
+                             for req, version in to_install)
+            run_shell_command(f'{pip_cmd} install --no-warn-script-location '
+                              f'--user --no-deps{no_input} {specs}')
+        # distributions with a RECORD file can just be unlinked. Others
+        # (e.g., legacy .egg-info installs) are uninstalled by pip
+        to_uninstall = []
+        for metadata_dir, name, _ in to_remove:
+            if metadata_dir.joinpath('RECORD').is_file():
+                _unlink_dist(metadata_dir, project.project_dir)
+            else:
+                to_uninstall.append(name)
+        if to_uninstall:
+            run_shell_command(f'{pip_cmd} uninstall --yes{no_input} '
+                              f'{" ".join(to_uninstall)}')
+    except CalledProcessError as e:
+        raise InstallerError.from_error(e) from None
+    finally:
+        # make sure the import system notices the changes
+        invalidate_path_caches(project.site_packages_dir)
+        ingest_project(project)
+        record_install(project)
+        update_notebook_lockfile(project)
+    if not config.suppress_stdout:
+        if linked:
+            print(f'Linked from davos package store ({DAVOS_STORE_DIR}):\n'
+                  f'Successfully installed {" ".join(linked)}')
+        if to_remove:
+            removed = ' '.join(f'{name}-{version}'
+                               for _, name, version in to_remove)
+            print(f'Removed {removed} (not in lockfile)')
+
+
+def update_notebook_lockfile(project):
+    """
+    Update a notebook-specific project's lockfile.
+
+    Called after packages are installed into a project. Does nothing if
+    `davos.config.use_lockfile` is `False` or `project` isn't a
+    notebook-specific project. Unlike `write_lockfile()`, the lockfile's
+    first line is a comment recording the current environment (see
+    `sync_notebook_lockfile()`).
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project packages were installed into.
+    """
+    if not config._use_lockfile:
+        return
+    lockfile_path = notebook_lockfile_path(project)
+    if lockfile_path is None:
+        return
+    freeze = project.freeze()
+    lock_text = f'{_ENVIRONMENT_HEADER}{_environment_tag()}\n'
+    if freeze:
+        lock_text += f'{freeze}\n'
+    try:
+        lockfile_path.write_text(lock_text, encoding='utf-8')
+    except OSError:
+        # e.g., notebook's directory isn't writable
+        pass
+
+
+def write_lockfile(project, path):
+    """
+    Write a project's lockfile.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project whose installed packages should be locked.
+    path : str or pathlib.Path
+        Path to the lockfile to write. An existing file at this path is
+        replaced.
+
+    Returns
+    -------
+    pathlib.Path
+        The absolute path to the lockfile.
+    """
+    path = Path(os.path.expandvars(path)).expanduser().resolve()
+    freeze = project.freeze()
+    path.write_text(f'{freeze}\n' if freeze else '', encoding='utf-8')
+    return path
@@ -0,0 +1,22 @@
+from pathlib import PosixPath
+from typing import Final, Literal
+
+from packaging.requirements import Requirement
+
+from davos.core.project import Project
+
+__all__ = list[Literal['LOCKFILE_SUFFIX', 'notebook_lockfile_path', 'sync_notebook_lockfile', 'sync_project',
+                       'update_notebook_lockfile', 'write_lockfile']]
+
+LOCKFILE_SUFFIX: Final[Literal['.davos.lock']]
+_ENVIRONMENT_HEADER: Final[Literal['# davos environment: ']]
+_SYNCED_PROJECTS: set[str]
+
+def _environment_tag() -> str: ...
+def _parse_lock(lock_text: str) -> dict[str, tuple[Requirement, str]]: ...
+def _read_lock(lock: PosixPath | str) -> str: ...
+def notebook_lockfile_path(project: Project) -> PosixPath | None: ...
+def sync_notebook_lockfile(project: Project) -> None: ...
+def sync_project(project: Project, lock: PosixPath | str, remove_extra: bool = ...) -> None: ...
+def update_notebook_lockfile(project: Project) -> None: ...
+def write_lockfile(project: Project, path: PosixPath | str) -> PosixPath: ...
@@ -0,0 +1,407 @@
+"""
+Precomputed module manifests for project `site-packages` directories.
+
+Finding a module with the standard path-based import machinery costs a
+`stat` of each directory searched plus a `listdir` of each the first
+time it's searched (or after its cache is invalidated) -- one for the
+`site-packages` directory, and one more for each package whose
+submodules are imported. When `davos.DAVOS_PROJECT_DIR` is on a network
+filesystem (e.g., an NFS-mounted home directory), each of these is a
+round trip to the server. To avoid them, `davos` keeps a manifest
+mapping the name of each module in a project's `site-packages`
+directory to its file (`davos-manifest.json`, alongside the
+`site-packages` directory), which the project finder
+(`davos.core.finders.project_finder`) uses to resolve imports from the
+project without listing any directories.
+
+Manifests are updated after packages are installed into a project, and
+whenever the `site-packages` directory has been modified since its
+manifest was written (checked with a single `stat`). Updates are
+incremental: only top-level entries and distributions whose
+modification times have changed are re-read. Top-level modules are
+found by listing the `site-packages` directory, and submodules are
+read from the `RECORD` files of installed distributions.
+
+Some filesystems (including many NFS servers) record modification times
+with a resolution as coarse as one second, so a change made shortly
+after a manifest was written may not change the directory's
+modification time. Manifests (and entries within them) written within
+`_MTIME_PRECISION` seconds of a modification are therefore rebuilt once
+more after that much time has passed.
+"""
+
+
+__all__ = ['load_manifest', 'MANIFEST_NAME', 'update_manifest']
+
+
+import csv
+import json
+import os
+import time
+from importlib.machinery import (
+    BYTECODE_SUFFIXES,
+    EXTENSION_SUFFIXES,
+    SOURCE_SUFFIXES
+)
+
+
+MANIFEST_NAME = 'davos-manifest.json'
+# incremented when the manifest format changes, so manifests written by
+# other versions of davos are rebuilt
+_MANIFEST_VERSION = 2
+# coarsest resolution (in seconds) of filesystem modification times
+# manifests should remain accurate with. Modification times this recent
+# when a manifest was written don't rule out later changes
+_MTIME_PRECISION = 2
+# module file suffixes, and the rank of each type of module (lower
+# ranks take precedence, in the same order as the standard
+# `importlib.machinery.FileFinder`): regular packages, extension
+# modules, source modules, bytecode modules, then namespace packages
+_SUFFIX_RANKS = [
+    *((suffix, 1) for suffix in EXTENSION_SUFFIXES),
+    *((suffix, 2) for suffix in SOURCE_SUFFIXES),
+    *((suffix, 3) for suffix in BYTECODE_SUFFIXES)
+]
+_PACKAGE_RANK = 0
+_NAMESPACE_RANK = 4
+# cache of loaded manifests, by site-packages directory
+# format: {site_packages_dir: (site-packages mtime [ns], recheck time,
+# modules), ...}, where the recheck time is when the manifest should be
+# checked for changes its mtime may not have caught (or `None` if it's
+# known to be current), and `modules` maps module names to (absolute
+# path to module file [or `None` for namespace packages], whether it's
+# a package)
+_MANIFESTS = {}
+
+
+def _build_manifest(site_packages_dir, previous):
+    """
+    Build the manifest for a `site-packages` directory.
+
+    Parameters
+    ----------
+    site_packages_dir : str
+        The `site-packages` directory.
+    previous : dict
+        The directory's previous manifest (empty if it has none).
+        Entries whose modification times haven't changed (and were
+        already `_MTIME_PRECISION` seconds old when it was written) are
+        reused.
+
+    Returns
+    -------
+    dict
+        The new manifest.
+    """
+    prev_entries = previous.get('entries', {})
+    prev_dists = previous.get('dists', {})
+    # entries modified this recently when the previous manifest was
+    # written may have changed since without their mtimes changing
+    reuse_before_ns = int(
+        (previous.get('checked_at', 0) - _MTIME_PRECISION) * 1e9
+    )
+    entries = {}
+    dists = {}
+    with os.scandir(site_packages_dir) as dir_entries:
+        for entry in dir_entries:
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                # removed while scanning directory
+                continue
+            if entry.name.endswith('.dist-info'):
+                cached = prev_dists.get(entry.name)
+                if (
+                        cached is not None
+                        and cached[0] == mtime < reuse_before_ns
+                ):
+                    dists[entry.name] = cached
+                else:
+                    dists[entry.name] = [mtime, _dist_modules(entry.path)]
+                continue
+            cached = prev_entries.get(entry.name)
+            if cached is not None and cached[0] == mtime < reuse_before_ns:
+                entries[entry.name] = cached
+            else:
+                modules = _top_level_modules(entry)
+                if modules:
+                    entries[entry.name] = [mtime, modules]
+    return {'version': _MANIFEST_VERSION, 'entries': entries, 'dists': dists}
+
+
+def _dist_modules(dist_info_path):
+    """
+    Get the submodules a distribution installed from its `RECORD`.
+
+    Parameters
+    ----------
+    dist_info_path : str
+        Path to the distribution's `.dist-info` directory.
+
+    Returns
+    -------
+    list of list
+        The fully qualified name (`str`), file path relative to the
+        `site-packages` directory (`str`), and rank (`int`) of each
+        module in a package (top-level modules are found separately).
+    """
+    try:
+        with open(os.path.join(dist_info_path, 'RECORD'),
+                  newline='', encoding='utf-8') as f:
+            paths = [row[0] for row in csv.reader(f) if row]
+    except OSError:
+        return []
+    modules = []
+    for path in paths:
+        parts = path.split('/')
+        if len(parts) < 2 or '__pycache__' in parts:
+            continue
+        suffix_rank = _match_suffix(parts[-1])
+        if suffix_rank is None:
+            continue
+        suffix, rank = suffix_rank
+        stem = parts[-1][:-len(suffix)]
+        if stem == '__init__':
+            name_parts = parts[:-1]
+            rank = _PACKAGE_RANK
+        else:
+            name_parts = [*parts[:-1], stem]
+        if all(part.isidentifier() for part in name_parts):
+            modules.append(['.'.join(name_parts), path, rank])
+    return modules
+
+
+def _is_settled(manifest):
+    """
+    Check whether a manifest's modification time can be relied on.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest.
+
+    Returns
+    -------
+    bool
+        `True` if the `site-packages` directory hadn't been modified for
+        at least `_MTIME_PRECISION` seconds when the manifest was
+        written, so any later change would have changed its
+        modification time.
+    """
+    return (manifest['checked_at'] - manifest['site_packages_mtime_ns'] / 1e9
+            >= _MTIME_PRECISION)
+
+
+def _manifest_modules(site_packages_dir, manifest):
+    """
+    Map module names to their files using a manifest.
+
+    Parameters
+    ----------
+    site_packages_dir : str
+        The `site-packages` directory the manifest describes.
+    manifest : dict
+        The manifest.
+
+    Returns
+    -------
+    dict
+        Absolute paths to module files (`str`, or `None` for namespace
+        packages) and whether the modules are packages (`bool`), keyed
+        by module name.
+    """
+    ranked = {}
+    module_lists = [modules for _, modules in manifest['entries'].values()]
+    module_lists += [modules for _, modules in manifest['dists'].values()]
+    for modules in module_lists:
+        for name, rel_path, rank in modules:
+            if name not in ranked or rank < ranked[name][1]:
+                ranked[name] = (rel_path, rank)
+    return {
+        name: (
+            None if rel_path is None
+            else os.path.join(site_packages_dir, *rel_path.split('/')),
+            rank in (_PACKAGE_RANK, _NAMESPACE_RANK)
+        )
+        for name, (rel_path, rank) in ranked.items()
+    }
+
+
+def _match_suffix(filename):
+    """
+    Get the module suffix of a filename, if it has one.
+
+    Parameters
+    ----------
+    filename : str
+        The name of a file.
+
+    Returns
+    -------
+    tuple or None
+        The matching suffix (`str`) and its rank (`int`), or `None` if
+        the file isn't a module. Longer suffixes take precedence (e.g.,
+        ".cpython-311-darwin.so" over ".so").
+    """
+    best = None
+    for suffix, rank in _SUFFIX_RANKS:
+        if filename.endswith(suffix) and (best is None
+                                          or len(suffix) > len(best[0])):
+            best = (suffix, rank)
+    return best
+
+
+def _top_level_modules(entry):
+    """
+    Get the top-level module(s) a `site-packages` directory entry
+    provides.
+
+    Parameters
+    ----------
+    entry : os.DirEntry
+        An entry in a `site-packages` directory.
+
+    Returns
+    -------
+    list of list
+        The name (`str`), file path relative to the `site-packages`
+        directory (`str`, or `None` for namespace packages), and rank
+        (`int`) of the module the entry provides, if any.
+    """
+    name = entry.name
+    if entry.is_dir():
+        if not name.isidentifier() or name == '__pycache__':
+            # e.g., "*.data" directories
+            return []
+        for suffix, _ in _SUFFIX_RANKS:
+            init_path = f'{name}/__init__{suffix}'
+            if os.path.isfile(os.path.join(entry.path, f'__init__{suffix}')):
+                return [[name, init_path, _PACKAGE_RANK]]
+        return [[name, None, _NAMESPACE_RANK]]
+    suffix_rank = _match_suffix(name)
+    if suffix_rank is None:
+        return []
+    suffix, rank = suffix_rank
+    stem = name[:-len(suffix)]
+    if not stem.isidentifier():
+        return []
+    return [[stem, name, rank]]
+
+
+def _write_manifest(site_packages_dir, previous):
+    """
+    Rebuild a `site-packages` directory's manifest and write it to disk.
+
+    Parameters
+    ----------
+    site_packages_dir : str
+        The `site-packages` directory.
+    previous : dict
+        The directory's previous manifest (empty if it has none).
+
+    Returns
+    -------
+    dict
+        The new manifest.
+    """
+    # record the directory's modification time (and the current time)
+    # *before* scanning it, so changes made while it's being scanned
+    # cause another update
+    mtime = os.stat(site_packages_dir).st_mtime_ns
+    checked_at = time.time()
+    manifest = _build_manifest(site_packages_dir, previous)
+    manifest['site_packages_mtime_ns'] = mtime
+    manifest['checked_at'] = checked_at
+    manifest_path = os.path.join(os.path.dirname(site_packages_dir),
+                                 MANIFEST_NAME)
+    # write to a temporary file and move it into place, so other
+    # processes never read a partially written manifest
+    tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        # the manifest can still be used for the current session
+    return manifest
+
+
+def load_manifest(site_packages_dir):
+    """
+    Get the module manifest for a `site-packages` directory.
+
+    The manifest is read from disk the first time it's needed in each
+    interpreter session, and updated if the directory has been modified
+    since it was written (or may have been, if it was modified within
+    `_MTIME_PRECISION` seconds of when the manifest was written).
+
+    Parameters
+    ----------
+    site_packages_dir : str
+        The `site-packages` directory.
+
+    Returns
+    -------
+    dict or None
+        Absolute paths to module files (`str`, or `None` for namespace
+        packages) and whether the modules are packages (`bool`), keyed
+        by module name, or `None` if the directory doesn't exist or
+        can't be read.
+    """
+    try:
+        mtime = os.stat(site_packages_dir).st_mtime_ns
+    except OSError:
+        return None
+    cached = _MANIFESTS.get(site_packages_dir)
+    if (
+            cached is not None
+            and cached[0] == mtime
+            and (cached[1] is None or time.time() < cached[1])
+    ):
+        return cached[2]
+    manifest_path = os.path.join(os.path.dirname(site_packages_dir),
+                                 MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != _MANIFEST_VERSION:
+            manifest = {}
+    except (OSError, ValueError, AttributeError):
+        manifest = {}
+    if (
+            manifest.get('site_packages_mtime_ns') != mtime
+            or not _is_settled(manifest)
+    ):
+        try:
+            manifest = _write_manifest(site_packages_dir, manifest)
+        except OSError:
+            return None
+        mtime = manifest['site_packages_mtime_ns']
+    if _is_settled(manifest):
+        recheck_at = None
+    else:
+        # until then, changes made in the same process are reflected in
+        # the manifest, but others might not be
+        recheck_at = mtime / 1e9 + _MTIME_PRECISION
+    modules = _manifest_modules(site_packages_dir, manifest)
+    _MANIFESTS[site_packages_dir] = (mtime, recheck_at, modules)
+    return modules
+
+
+def update_manifest(site_packages_dir):
+    """
+    Update the module manifest for a `site-packages` directory.
+
+    Called after packages are installed into a project. Does nothing if
+    the directory doesn't exist or the manifest can't be written.
+
+    Parameters
+    ----------
+    site_packages_dir : str or pathlib.Path
+        The `site-packages` directory.
+    """
+    load_manifest(str(site_packages_dir))
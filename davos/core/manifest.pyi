@@ -0,0 +1,33 @@
+from os import DirEntry
+from pathlib import PosixPath
+from typing import Final, Literal, TypedDict
+
+__all__ = list[Literal['load_manifest', 'MANIFEST_NAME', 'update_manifest']]
+
+MANIFEST_NAME: Final[Literal['davos-manifest.json']]
+_MANIFESTS: dict[str, tuple[int, float | None, _Modules]]
+_MANIFEST_VERSION: Final[int]
+_MTIME_PRECISION: Final[int]
+_NAMESPACE_RANK: Final[int]
+_PACKAGE_RANK: Final[int]
+_SUFFIX_RANKS: Final[list[tuple[str, int]]]
+
+_ModuleEntry = list[str | int | None]
+_Modules = dict[str, tuple[str | None, bool]]
+
+class _Manifest(TypedDict, total=False):
+    version: int
+    site_packages_mtime_ns: int
+    checked_at: float
+    entries: dict[str, list[int | list[_ModuleEntry]]]
+    dists: dict[str, list[int | list[_ModuleEntry]]]
+
+def _build_manifest(site_packages_dir: str, previous: _Manifest) -> _Manifest: ...
+def _dist_modules(dist_info_path: str) -> list[_ModuleEntry]: ...
+def _is_settled(manifest: _Manifest) -> bool: ...
+def _manifest_modules(site_packages_dir: str, manifest: _Manifest) -> _Modules: ...
+def _match_suffix(filename: str) -> tuple[str, int] | None: ...
+def _top_level_modules(entry: DirEntry[str]) -> list[_ModuleEntry]: ...
+def _write_manifest(site_packages_dir: str, previous: _Manifest) -> _Manifest: ...
+def load_manifest(site_packages_dir: str) -> _Modules | None: ...
+def update_manifest(site_packages_dir: PosixPath | str) -> None: ...
@@ -704,3 +704,28 @@ pip_general_opts.add_argument(
     metavar='<feature>',
     help="Enable deprecated functionality, that will be removed in the future."
 )
+
+
+def _positive_float(value):
+    """Convert a command line argument to a positive `float`."""
+    try:
+        float_value = float(value)
+    except ValueError:
+        float_value = None
+    if float_value is None or float_value <= 0:
+        raise ArgumentTypeError(f"expected a positive number, got {value!r}")
+    return float_value
+
+
+# ======== davos Options ========
+# options handled by davos itself rather than passed to the installer
+davos_opts = pip_parser.add_argument_group(title='davos Options')
+davos_opts.add_argument(
+    '--install-timeout',
+    type=_positive_float,
+    metavar='<sec>',
+    help="Maximum number of seconds installing the package may take before "
+         "the installer is terminated (and, if installing into a project, "
+         "the partial installation is rolled back). Overrides "
+         "`davos.config.install_timeout` for this package."
+)
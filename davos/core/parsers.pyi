@@ -23,3 +23,5 @@ class SubtractAction(Action):
 
 _pip_install_usage: list[str]
 pip_parser: Final[OnionParser]
+
+def _positive_float(value: str) -> float: ...
@@ -47,20 +47,18 @@ import atexit
 import errno
 import json
 import os
+import re
 import shutil
 import sys
 import warnings
+import weakref
 from os.path import expandvars
 from pathlib import Path
 from subprocess import CalledProcessError
-from urllib.request import urlopen
 from urllib.parse import parse_qs, unquote, urlencode, urljoin, urlparse
 
-import ipykernel
-from IPython.display import clear_output
-from IPython.terminal.interactiveshell import TerminalInteractiveShell
-
 from davos import config
+from davos.core.config import _get_jupyter_interface, DAVOS_CONFIG_DIR
 from davos.core.core import prompt_input, run_shell_command
 from davos.core.exceptions import DavosProjectError
 
@@ -76,7 +74,6 @@ __all__ = [
 ]
 
 
-DAVOS_CONFIG_DIR = Path.home().joinpath('.davos')
 DAVOS_PROJECT_DIR = DAVOS_CONFIG_DIR.joinpath('projects')
 PATHSEP = os.sep               # '/' for Unix, '\' for Windows
 PATHSEP_REPLACEMENT = "___"    # safe replacement for os.sep in dir name
@@ -85,6 +82,17 @@ SITE_PACKAGES_SUFFIX = PATHSEP.join((
     f'python{sys.version_info.major}.{sys.version_info.minor}',
     'site-packages'
 ))
+# max number of seconds to wait for each Jupyter server to respond to a
+# request for its running sessions
+_SESSIONS_API_TIMEOUT = 3
+# maps the current kernel's ID to the path to the notebook it's running.
+# Filled the first time `get_notebook_path()` finds the notebook path
+_NOTEBOOK_PATH_CACHE = {}
+# maps project names to the single `Project` instance for each project
+# currently in use in the interpreter session. Holds weak references so
+# unused instances can still be garbage collected (and their empty
+# project directories removed by `Project.__del__`)
+_PROJECT_REGISTRY = weakref.WeakValueDictionary()
 
 
 class ProjectChecker(type):
@@ -98,7 +106,7 @@ class ProjectChecker(type):
         cleaned_name, cls_to_init = _get_project_name_type(name)
         # `name` passed to __init__ is now a str: either a simple name
         # or a fully substituted path to a .ipynb file
-        return type.__call__(cls_to_init, cleaned_name)
+        return _get_registered_project(cleaned_name, cls_to_init)
 
 
 class Project(metaclass=ProjectChecker):
@@ -134,15 +142,19 @@ class Project(metaclass=ProjectChecker):
         self.safe_name = _filepath_to_safename(name)
         self.project_dir = DAVOS_PROJECT_DIR.joinpath(self.safe_name)
         self.site_packages_dir = self.project_dir.joinpath(SITE_PACKAGES_SUFFIX)
-        # eagerly create project dir since it's low-cost
+        # eagerly create project dir since it's low-cost. Note: this
+        # happens once per project per interpreter session, since
+        # subsequent lookups return the same (registered) instance
         self.project_dir.mkdir(parents=False, exist_ok=True)
-        # register atexit hook to remove project dir if empty
-        atexit.register(cleanup_project_dir_atexit, self.project_dir)
         # last modified time of self.site_packages_dir
         self._site_packages_mtime = -1
         # cache of installed packages as of self._site_packages_mtime
         # format: [(name, version), ...]
         self._installed_packages = []
+        # cache of each distribution's name and version, by the name of
+        # its metadata directory in self.site_packages_dir
+        # format: {dist_info_dirname: (mtime, (name, version)), ...}
+        self._dist_info_cache = {}
 
     def __del__(self):
         """
@@ -151,7 +163,7 @@ class Project(metaclass=ProjectChecker):
         this can't be relied on, and specifically won't run if the
         Project's __repr__ has appeared in any notebook cell output,
         because IPython caches those outputs internally. The atexit hook
-        registered in the constructor takes care of these cases.
+        `cleanup_project_dirs_atexit` takes care of these cases.
          """
         try:
             self.project_dir.rmdir()
@@ -193,6 +205,12 @@ class Project(metaclass=ProjectChecker):
         """
         Update cache of installed packages if site-packages dir has
         been modified since last check.
+
+        Distributions' names and versions are read directly from their
+        metadata (`*.dist-info` and `*.egg-info`) in the site-packages
+        directory rather than via `pip list`, and only metadata
+        directories modified since the last check are re-read.
+        Packages are sorted by name, as `pip list` sorts them.
         """
         try:
             site_pkgs_mtime = self.site_packages_dir.stat().st_mtime
@@ -201,29 +219,157 @@ class Project(metaclass=ProjectChecker):
             self._installed_packages = []
             return
         if site_pkgs_mtime != self._site_packages_mtime:
-            cmd = (
-                f'{config.pip_executable} list '
-                '--disable-pip-version-check '
-                f'--path "{self.site_packages_dir}" '
-                f'--format json'
+            dist_info_cache = {}
+            with os.scandir(self.site_packages_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(('.dist-info', '.egg-info')):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        # removed while scanning directory
+                        continue
+                    cached = self._dist_info_cache.get(entry.name)
+                    if cached is not None and cached[0] == mtime:
+                        dist_info_cache[entry.name] = cached
+                        continue
+                    name_version = _read_dist_name_version(entry.path)
+                    if name_version is not None:
+                        dist_info_cache[entry.name] = (mtime, name_version)
+            self._dist_info_cache = dist_info_cache
+            self._installed_packages = sorted(
+                (name_version for _, name_version in dist_info_cache.values()),
+                key=lambda pkg: re.sub(r'[-_.]+', '-', pkg[0]).lower()
             )
-            pip_list_stdout = run_shell_command(cmd, live_stdout=False)
-            try:
-                pip_list_json = json.loads(pip_list_stdout)
-            except json.JSONDecodeError:
-                if pip_list_stdout == '':
-                    # no packages installed
-                    self._installed_packages = []
-                else:
-                    raise
-            else:
-                self._installed_packages = [tuple(pkg.values()) for pkg in pip_list_json]
             self._site_packages_mtime = site_pkgs_mtime
 
+    def clone(self, new_name):
+        """
+        Create a copy of the project named `new_name`.
+
+        The new project contains the same installed packages as the
+        original, but its files are hard links to those in the shared
+        package store (see `davos.core.store`), so cloning a project is
+        fast and uses almost no additional disk space. Packages can be
+        installed into or removed from either project without affecting
+        the other. However, since the two projects share the same
+        files, modifying an installed file in place (e.g., editing a
+        package's source code) changes it in both projects, and in any
+        other project that uses the same version of the package.
+
+        Parameters
+        ----------
+        new_name : str or pathlib.Path
+            The name for the new project. This name must not already be
+            in use by another project unless that project is empty
+            (i.e., no packages have been installed into it).
+
+        Returns
+        -------
+        AbstractProject or ConcreteProject
+            The new project.
+        """
+        new_project_name, new_project_type = _get_project_name_type(new_name)
+        if new_project_name == self.name:
+            raise DavosProjectError("can't clone a project to itself")
+        new_safe_name = _filepath_to_safename(new_project_name)
+        new_project_dir = DAVOS_PROJECT_DIR.joinpath(new_safe_name)
+        if new_project_dir.is_dir() and not _dir_is_empty(new_project_dir):
+            # new project dir exists and is non-empty
+            raise DavosProjectError(
+               f"a Project named {new_project_name!r} already exists and "
+               "is non-empty. To use this name for another project, first "
+               "`.remove()` the existing project."
+            )
+        # imported here to avoid circular imports
+        from davos.core.catalog import record_install
+        from davos.core.store import ingest_project, link_tree
+        # make sure all of the project's distributions are in the store
+        # so the clone shares their files with it
+        ingest_project(self)
+        link_tree(self.project_dir, new_project_dir)
+        new_project = _get_registered_project(new_project_name,
+                                              new_project_type)
+        record_install(new_project)
+        return new_project
+
+    def export(self, path):
+        """
+        Pack the project into a compressed archive.
+
+        Creates a `.tar.gz` archive containing the project's installed
+        packages, which can be restored on another machine (or in a
+        fresh environment, such as a CI runner) with `Project.import_()`
+        rather than reinstalling each smuggled package. See
+        `davos.core.archive` for details.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path to the archive to create. An existing file at this
+            path is replaced.
+
+        Returns
+        -------
+        pathlib.Path
+            The absolute path to the created archive.
+        """
+        # imported here to avoid a circular import
+        from davos.core.archive import export_project
+        return export_project(self, path)
+
     def freeze(self):
         """Return pip-freeze-like output for the Project."""
         return '\n'.join('=='.join(pkg) for pkg in self.installed_packages)
 
+    @classmethod
+    def import_(cls, path, name=None):
+        """
+        Create a project from an archive created by `Project.export()`.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path to the project archive.
+        name : str or pathlib.Path, optional
+            The name for the imported project. Defaults to the name of
+            the exported project. When importing a notebook-specific
+            project on a different machine, this should usually be the
+            path to the notebook on that machine.
+
+        Returns
+        -------
+        AbstractProject or ConcreteProject
+            The imported project.
+        """
+        # imported here to avoid a circular import
+        from davos.core.archive import import_project
+        return import_project(path, name=name)
+
+    def lock(self, path):
+        """
+        Write the project's lockfile.
+
+        The lockfile lists the exact version of each package installed
+        in the project (in the same format as `Project.freeze()`), and
+        can be used to recreate the project's environment elsewhere
+        with `Project.sync()`.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path to the lockfile to write. An existing file at this
+            path is replaced.
+
+        Returns
+        -------
+        pathlib.Path
+            The absolute path to the lockfile.
+        """
+        # imported here to avoid a circular import
+        from davos.core.lockfile import write_lockfile
+        return write_lockfile(self, path)
+
     def remove(self, yes=False):
         """
         Delete the project and all installed packages.
@@ -266,8 +412,58 @@ class Project(metaclass=ProjectChecker):
                 print(f"{self.name} not removed")
                 return
         shutil.rmtree(self.project_dir)
+        # imported here to avoid a circular import
+        from davos.core.catalog import record_removal
+        record_removal(self.safe_name)
         if self == config._project:
             self.project_dir.mkdir()
+        elif _PROJECT_REGISTRY.get(self.name) is self:
+            # unregister the removed project so the next lookup creates
+            # a new instance (and project directory)
+            del _PROJECT_REGISTRY[self.name]
+
+    def remove_unused(self, days=30, dry_run=False):
+        """
+        Remove packages the project hasn't used recently.
+
+        Removes installed distributions that haven't been imported
+        (i.e., smuggled, or imported by a smuggled package) or
+        installed within the last `days` days, unless they're required
+        (directly or indirectly) by a distribution that has. This
+        cleans up packages smuggled only once (e.g., for a quick
+        experiment) and dependencies left behind when other packages
+        were upgraded.
+
+        Parameters
+        ----------
+        days : int or float, optional
+            How many days a distribution may go unused before it's
+            removed (default: 30).
+        dry_run : bool, optional
+            If `True` (default: `False`), show which distributions would
+            be removed and how much space they use, without removing
+            them.
+
+        Returns
+        -------
+        list of tuple
+            The name (`str`), version (`str`), and disk space freed in
+            bytes (`int`) by removing each distribution removed (or that
+            would be removed, if `dry_run` is `True`). Files still used
+            by other projects through the package store (see
+            `davos.core.store`) aren't counted, since removing them from
+            this project doesn't free any space.
+
+        Notes
+        -----
+        When each distribution was last imported is tracked only by
+        versions of `davos` that implement this method. For
+        distributions never imported since then, the time it was
+        installed is used instead.
+        """
+        # imported here to avoid a circular import
+        from davos.core.usage import collect_garbage
+        return collect_garbage(self, days, dry_run=dry_run)
 
     def rename(self, new_name):
         """
@@ -321,6 +517,8 @@ class Project(metaclass=ProjectChecker):
             )
         # rename the project directory
         self.project_dir.rename(new_project_dir)
+        old_name = self.name
+        old_safe_name = self.safe_name
         # reload self with new name and type, but retain the installed
         # package cache since we're just renaming the project and not
         # modifying its contents. Note: don't really *need* to do this
@@ -329,6 +527,7 @@ class Project(metaclass=ProjectChecker):
         # classes' constructors change
         old_installed_pkgs = self._installed_packages
         old_site_pkgs_mtime = self._site_packages_mtime
+        old_dist_info_cache = self._dist_info_cache
         # can call type.__call__ directly to bypass metaclass's __call__
         # since we already know the Project's new type
         template_instance = type.__call__(new_project_type, new_project_name)
@@ -336,11 +535,44 @@ class Project(metaclass=ProjectChecker):
         self.__dict__ = template_instance.__dict__
         self._installed_packages = old_installed_pkgs
         self._site_packages_mtime = old_site_pkgs_mtime
+        self._dist_info_cache = old_dist_info_cache
         # explicitly delete the temporary new Project instance so its
         # __del__ method is called before this method returns and we
         # can ensure the project directory exists after reload
         del template_instance
         self.project_dir.mkdir(parents=False, exist_ok=True)
+        # register self under the new name, so looking up the project
+        # by its new name returns this instance
+        if _PROJECT_REGISTRY.get(old_name) is self:
+            del _PROJECT_REGISTRY[old_name]
+        _PROJECT_REGISTRY[new_project_name] = self
+        # imported here to avoid a circular import
+        from davos.core.catalog import record_rename
+        record_rename(old_safe_name, self)
+
+    def sync(self, lock):
+        """
+        Make the project's installed packages match a lockfile.
+
+        Compares the packages in a lockfile (or `Project.freeze()`
+        output) to those installed in the project. Packages installed
+        at the locked version are left alone, packages not in the
+        lockfile are removed, and all missing packages (or those
+        installed at a different version) are installed together, by
+        linking them from the package store if possible and otherwise
+        with a single `pip install` command.
+
+        Parameters
+        ----------
+        lock : str or pathlib.Path
+            A path to a lockfile (e.g., created by `Project.lock()`),
+            or the contents of one (e.g., the output of
+            `Project.freeze()`). Each non-empty line must be a
+            requirement pinned to an exact version (`name==version`).
+        """
+        # imported here to avoid a circular import
+        from davos.core.lockfile import sync_project
+        sync_project(self, lock)
 
 
 class AbstractProject(Project):
@@ -398,6 +630,40 @@ class ConcreteProject(Project):
     """
 
 
+def _base_site_packages_dirs():
+    """
+    Get the `site-packages` directories of the configured base projects.
+
+    Returns
+    -------
+    list of str
+        The `site-packages` directory of each project in
+        `davos.config.base_projects` (for the current Python version)
+        that exists, in order.
+    """
+    site_packages_dirs = []
+    for base_project_dir in config._base_projects:
+        site_packages_dir = base_project_dir.joinpath(SITE_PACKAGES_SUFFIX)
+        if site_packages_dir.is_dir():
+            site_packages_dirs.append(str(site_packages_dir))
+    return site_packages_dirs
+
+
+def _clear_output():
+    """
+    Clear the current cell's output.
+
+    Used to update the status display in place when interactively
+    pruning projects. `IPython` is imported here rather than at the
+    module level so that managing projects from outside an `IPython`
+    kernel (e.g., via a script or the command line) doesn't require
+    importing it. Outside `IPython`, this is a no-op.
+    """
+    if config.environment != 'Python':
+        from IPython.display import clear_output
+        clear_output(wait=False)
+
+
 def _dir_is_empty(path):
     """
     Check whether a directory is empty, excluding .DS_Store files.
@@ -559,6 +825,278 @@ def _get_project_name_type(project_name):
     return project_name, project_type
 
 
+def _get_registered_project(name, project_cls):
+    """
+    Get the `Project` instance for a project, creating it if needed.
+
+    Each project is represented by a single `Project` instance per
+    interpreter session, which is reused for subsequent lookups of the
+    same project (e.g., via `Project(name)`, `get_project(name)`, or
+    `davos.all_projects`) for as long as it's referenced elsewhere.
+    This way, repeatedly looking up a project doesn't repeatedly create
+    its directory or allocate a new object.
+
+    Parameters
+    ----------
+    name : str
+        The project's (cleaned) name, as returned by
+        `_get_project_name_type()`.
+    project_cls : type
+        The type of project (`AbstractProject` or `ConcreteProject`)
+        that `name` refers to.
+
+    Returns
+    -------
+    AbstractProject or ConcreteProject
+        The registered `Project` instance for `name`.
+    """
+    project = _PROJECT_REGISTRY.get(name)
+    # also create a new instance if the project's type has changed
+    # (e.g., its notebook has been created or deleted) since it was
+    # registered
+    if type(project) is not project_cls:
+        # call `type.__call__` directly to bypass the `ProjectChecker`
+        # metaclass's `__call__` method
+        project = type.__call__(project_cls, name)
+        _PROJECT_REGISTRY[name] = project
+    return project
+
+
+def _get_servers_from_cli():
+    """
+    Get info about running Jupyter servers from the Jupyter CLI.
+
+    Fallback for `_get_servers_from_runtime_dir` used when no running
+    servers' info files could be found (e.g., if the server was started
+    with a non-default runtime directory).
+
+    Returns
+    -------
+    list of dict
+        Info for each running server, with keys `'url'`, `'token'`,
+        and `'root_dir'`.
+
+    Raises
+    ------
+    RuntimeError
+        If the shell command to list running servers fails.
+    """
+    if config._jupyter_interface is None:
+        config._jupyter_interface = _get_jupyter_interface()
+    nbserver_list_cmd = f'jupyter {config._jupyter_interface} list'
+    try:
+        running_nbservers_stdout = run_shell_command(nbserver_list_cmd,
+                                                     live_stdout=False)
+    except CalledProcessError as e:
+        # raise RuntimeError so it's caught by `use_default_project` and
+        # the fallback project is used
+        raise RuntimeError(
+            "Shell command to get running Jupyter servers "
+            f"({nbserver_list_cmd}) failed"
+        ) from e
+
+    servers = []
+    for line in running_nbservers_stdout.splitlines():
+        # should only need to exclude first line ("Currently running
+        # servers:"), but handle safely in case output format changes in
+        # the future
+        if not line.strip().startswith('http'):
+            continue
+
+        nbserver_url, nbserver_root_dir = line.split('::')
+        parsed_url = urlparse(nbserver_url.strip())
+        if parsed_url.query:
+            # get just the NotebookApp token in case there are multiple parts
+            token = parse_qs(parsed_url.query)['token'][0]
+        else:
+            token = ''
+        servers.append({
+            'url': parsed_url._replace(query='').geturl(),
+            'token': token,
+            'root_dir': nbserver_root_dir.strip()
+        })
+    return servers
+
+
+def _get_servers_from_runtime_dir(*runtime_dirs):
+    """
+    Get info about running Jupyter servers from their runtime files.
+
+    Each running Jupyter server writes a JSON file with its URL, auth
+    token, root directory, and PID to the Jupyter runtime directory
+    (`jpserver-<pid>.json` for `jupyter_server`-based servers,
+    `nbserver-<pid>.json` for classic notebook servers). Reading these
+    directly is much faster than running `jupyter notebook list`, which
+    requires starting a new Python process.
+
+    Parameters
+    ----------
+    *runtime_dirs : pathlib.Path
+        Directories to search for server info files. Duplicates and
+        nonexistent directories are ignored.
+
+    Returns
+    -------
+    list of dict
+        Info for each running server, with keys `'url'`, `'token'`, and
+        `'root_dir'`. Servers whose processes are no longer running
+        (i.e., whose info files are stale) are excluded. Info for the
+        most recently started servers is listed first.
+    """
+    info_files = set()
+    for runtime_dir in runtime_dirs:
+        if runtime_dir.is_dir():
+            info_files.update(runtime_dir.glob('jpserver-*.json'))
+            info_files.update(runtime_dir.glob('nbserver-*.json'))
+
+    servers = []
+    for info_file in info_files:
+        try:
+            mtime = info_file.stat().st_mtime
+            server_info = json.loads(info_file.read_text(encoding='utf-8'))
+            pid = int(server_info['pid'])
+            url = server_info['url']
+        except (OSError, ValueError, KeyError, TypeError):
+            # file was removed after globbing, is partially written, or
+            # isn't a server info file
+            continue
+        if not _pid_is_running(pid):
+            continue
+        # jupyter_server-based servers call it "root_dir", classic
+        # notebook servers call it "notebook_dir"
+        root_dir = server_info.get('root_dir', server_info.get('notebook_dir'))
+        if root_dir is None:
+            continue
+        servers.append((mtime, {
+            'url': url,
+            'token': server_info.get('token', ''),
+            'root_dir': root_dir
+        }))
+    servers.sort(key=lambda mtime_info: mtime_info[0], reverse=True)
+    return [server_info for _, server_info in servers]
+
+
+def _is_terminal_shell(ipython_shell):
+    """
+    Check whether an `IPython` shell is a terminal (non-kernel) shell.
+
+    Parameters
+    ----------
+    ipython_shell : IPython.core.interactiveshell.InteractiveShell
+        The shell instance to check.
+
+    Returns
+    -------
+    bool
+        `True` if `ipython_shell` is an
+        `IPython.terminal.interactiveshell.TerminalInteractiveShell`,
+        otherwise `False`.
+    """
+    # imported here so tools that only manage projects don't need to
+    # import IPython's terminal machinery
+    from IPython.terminal.interactiveshell import TerminalInteractiveShell
+    return isinstance(ipython_shell, TerminalInteractiveShell)
+
+
+def _pid_is_running(pid):
+    """
+    Check whether a process with the given PID is running.
+
+    Parameters
+    ----------
+    pid : int
+        The process ID to check.
+
+    Returns
+    -------
+    bool
+        `True` if the process exists, otherwise `False`.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # process exists but is owned by another user
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _query_server_sessions(server_info):
+    """
+    Get a Jupyter server's running sessions via its REST API.
+
+    Parameters
+    ----------
+    server_info : dict
+        Info for the server to query, as returned by
+        `_get_servers_from_runtime_dir` or `_get_servers_from_cli`.
+
+    Returns
+    -------
+    list of dict
+        The server's running sessions.
+    """
+    from urllib.request import urlopen
+
+    # server URLs may include a base URL (e.g., "/user/<name>/" for
+    # JupyterHub single-user servers), so the API path is relative
+    sessions_api_url = urljoin(f"{server_info['url'].rstrip('/')}/",
+                               'api/sessions')
+    if server_info['token']:
+        token_param = {'token': server_info['token']}
+        sessions_api_url = f'{sessions_api_url}?{urlencode(token_param)}'
+
+    with urlopen(sessions_api_url, timeout=_SESSIONS_API_TIMEOUT) as response:
+        response_data = response.read().decode('utf-8')
+    return json.loads(response_data)
+
+
+def _read_dist_name_version(metadata_path):
+    """
+    Read a distribution's name and version from its metadata.
+
+    Only the metadata file's headers are read, since the rest of the
+    file (the package's long description) may be quite large.
+
+    Parameters
+    ----------
+    metadata_path : str or pathlib.Path
+        Path to the distribution's `.dist-info` directory, or its
+        `.egg-info` directory or file.
+
+    Returns
+    -------
+    tuple of str or None
+        The distribution's `(name, version)`, or `None` if its metadata
+        is missing or incomplete.
+    """
+    metadata_path = Path(metadata_path)
+    if metadata_path.suffix == '.dist-info':
+        metadata_path = metadata_path.joinpath('METADATA')
+    elif metadata_path.is_dir():
+        # .egg-info directory (rather than single file)
+        metadata_path = metadata_path.joinpath('PKG-INFO')
+    name = version = None
+    try:
+        with metadata_path.open(encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip():
+                    # end of headers
+                    break
+                if line.startswith('Name:'):
+                    name = line[5:].strip()
+                elif line.startswith('Version:'):
+                    version = line[8:].strip()
+                if name is not None and version is not None:
+                    return name, version
+    except OSError:
+        pass
+    return None
+
+
 def _safename_to_filepath(safename):
     """
     Convert a project name in "safe" format to a filepath.
@@ -582,9 +1120,9 @@ def _safename_to_filepath(safename):
     return f'{safename.replace(PATHSEP_REPLACEMENT, PATHSEP)}.ipynb'
 
 
-def cleanup_project_dir_atexit(dirpath):
+def cleanup_project_dirs_atexit():
     """
-    Remove project directory on interpreter termination, if empty.
+    Remove project directories on interpreter termination, if empty.
 
     Each Project instance eagerly creates its `.project_dir` on
     instantiation so it's available for use, then if it isn't used,
@@ -599,18 +1137,17 @@ def cleanup_project_dir_atexit(dirpath):
     so any Project whose repr is displayed in the notebook also won't
     have its reference count drop to zero before shutdown.
 
-    As a backup, each Project instance registers a call to this function
-    with `atexit.register()`, so any empty project dirs that still exist
-    at shutdown will be caught and removed. This function is defined
-    outside the Project class so the atexit registry doesn't store a
-    reference to the instance unnecessarily for the whole session.
-
-    Parameters
-    ----------
-    dirpath : pathlib.Path
-        The path to the project directory to be removed.
+    As a backup, this function is registered (once) with
+    `atexit.register()` and sweeps the directories of all `Project`
+    instances still alive at shutdown (i.e., those in the project
+    registry), so any empty project dirs that still exist will be caught
+    and removed. Projects garbage collected earlier in the session have
+    already removed their own directories in `Project.__del__`.
     """
-    if dirpath.is_dir() and _dir_is_empty(dirpath):
+    for project in list(_PROJECT_REGISTRY.values()):
+        dirpath = project.project_dir
+        if not dirpath.is_dir() or not _dir_is_empty(dirpath):
+            continue
         try:
             dirpath.rmdir()
         except OSError as e:
@@ -631,76 +1168,99 @@ def get_notebook_path():
     """
     Get the absolute path to the current notebook.
 
-    Use the Jupyter Server REST API and a smidge of the notebook CLI to
-    get the path to the current notebook. If running in a Jupyter
-    notebook, this returns the absolute path to the notebook file. If
-    running in Google Colab notebook, however, this returns just the
-    name of the notebook since Colab notebooks don't actually exist on
-    the Colab VM filesystem.
+    Use the Jupyter Server REST API to get the path to the current
+    notebook. If running in a Jupyter notebook, this returns the
+    absolute path to the notebook file. If running in Google Colab
+    notebook, however, this returns just the name of the notebook since
+    Colab notebooks don't actually exist on the Colab VM filesystem.
 
     Returns
     -------
     str
         The absolute path (Jupyter) or name (Colab) of the current
+        notebook.
+
+    Notes
+    -----
+    Running servers are found by reading their info files from the
+    Jupyter runtime directory (falling back to `jupyter notebook list`
+    or `jupyter lab list` if none are found), and all candidate servers
+    are queried concurrently, with a short timeout, rather than one
+    after another. The result is cached for the life of the kernel, so
+    subsequent calls return immediately.
     """
+    from concurrent.futures import as_completed, ThreadPoolExecutor
+    from urllib.error import URLError
+
+    import ipykernel
+    from jupyter_core.paths import jupyter_runtime_dir
+
     kernel_filepath = ipykernel.connect.get_connection_file()
     kernel_id = kernel_filepath.split('/kernel-')[-1].split('.json')[0]
-
-    nbserver_list_cmd = f'jupyter {config._jupyter_interface} list'
     try:
-        running_nbservers_stdout = run_shell_command(nbserver_list_cmd,
-                                                     live_stdout=False)
-    except CalledProcessError as e:
-        # raise RuntimeError so it's caught by `use_default_project` and
-        # the fallback project is used
-        raise RuntimeError(
-            "Shell command to get running Jupyter servers "
-            f"({nbserver_list_cmd}) failed"
-        ) from e
-
-    for line in running_nbservers_stdout.splitlines():
-        # should only need to exclude first line ("Currently running
-        # servers:"), but handle safely in case output format changes in
-        # the future
-        if not line.strip().startswith('http'):
-            continue
-
-        nbserver_url, nbserver_root_dir = line.split('::')
-        nbserver_url = nbserver_url.strip()
-        nbserver_root_dir = nbserver_root_dir.strip().rstrip('/')
-
-        notebook_api_url = urljoin(nbserver_url, '/api/sessions')
-        parsed_url = urlparse(nbserver_url)
-        if parsed_url.query:
-            # get just the NotebookApp token in case there are multiple parts
-            token_param = {'token': parse_qs(parsed_url.query)['token'][0]}
-            notebook_api_url = f'{notebook_api_url}?{urlencode(token_param)}'
-
-        with urlopen(notebook_api_url, timeout=10) as response:
-            response_data = response.read().decode('utf-8')
-
-        response_json = json.loads(response_data)
-        for session in response_json:
-            if session['kernel']['id'] == kernel_id:
-                if config.environment == 'Colaboratory':
-                    # Colab notebooks don't actually live on Colab VM
-                    # filesystem, so just use notebook name
-                    return unquote(session['notebook']['name'])
-
-                notebook_relpath = unquote(session['notebook']['path'])
-                return f'{nbserver_root_dir}/{notebook_relpath}'
-
-    # VS Code doesn't actually start a Jupyter server when connecting to
-    # kernels, so the Jupyter API won't work. Fortunately, it's easy to
-    # check if the notebook is being run through VS Code, and to get its
-    # absolute path, if so.
-    # environment variable defined only if running in VS Code
-    if os.getenv('VSCODE_PID') is not None:
+        return _NOTEBOOK_PATH_CACHE[kernel_id]
+    except KeyError:
+        pass
+
+    # servers write their info files to the same runtime directory as
+    # kernels' connection files by default, but check both in case the
+    # kernel's was set explicitly
+    servers = _get_servers_from_runtime_dir(Path(jupyter_runtime_dir()),
+                                            Path(kernel_filepath).parent)
+    if not servers:
+        servers = _get_servers_from_cli()
+
+    notebook_path = None
+    if servers:
+        pool = ThreadPoolExecutor(max_workers=min(len(servers), 16))
+        futures = {
+            pool.submit(_query_server_sessions, server_info): server_info
+            for server_info in servers
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    sessions = future.result()
+                except (URLError, OSError, ValueError):
+                    # server is unresponsive, requires different
+                    # authentication, or returned an invalid response
+                    continue
+                for session in sessions:
+                    if session['kernel']['id'] != kernel_id:
+                        continue
+                    if config.environment == 'Colaboratory':
+                        # Colab notebooks don't actually live on Colab VM
+                        # filesystem, so just use notebook name
+                        notebook_path = unquote(session['notebook']['name'])
+                    else:
+                        root_dir = futures[future]['root_dir'].rstrip('/')
+                        notebook_relpath = unquote(session['notebook']['path'])
+                        notebook_path = f'{root_dir}/{notebook_relpath}'
+                    break
+                if notebook_path is not None:
+                    break
+        finally:
+            # don't wait for any other servers to respond
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    if notebook_path is None:
+        # VS Code doesn't actually start a Jupyter server when
+        # connecting to kernels, so the Jupyter API won't work.
+        # Fortunately, it's easy to check if the notebook is being run
+        # through VS Code, and to get its absolute path, if so.
+        # environment variable defined only if running in VS Code
+        if os.getenv('VSCODE_PID') is None:
+            # shouldn't ever get here, but just in case
+            raise RuntimeError(
+                "Could not find notebook path for current kernel"
+            )
         # global variable that holds absolute path to notebook file
-        return config.ipython_shell.user_ns['__vsc_ipynb_file__']
+        notebook_path = config.ipython_shell.user_ns['__vsc_ipynb_file__']
 
-    # shouldn't ever get here, but just in case
-    raise RuntimeError("Could not find notebook path for current kernel")
+    _NOTEBOOK_PATH_CACHE[kernel_id] = notebook_path
+    return notebook_path
 
 
 def get_project(project_name, create=False):
@@ -739,16 +1299,15 @@ def get_project(project_name, create=False):
     # rather than creating `Project(project_name)` and checking for it
     # in `davos.all_projects`, determine what the project's directory
     # *would* be named and check whether it exists. This avoids creating
-    # a bunch of `Project` instances and registering duplicate `atexit`
-    # callbacks unnecessarily
+    # a bunch of `Project` instances (and project directories)
+    # unnecessarily
     cleaned_name, project_cls = _get_project_name_type(project_name)
     safe_name = _filepath_to_safename(cleaned_name)
     project_dir = DAVOS_PROJECT_DIR.joinpath(safe_name)
     if project_dir.is_dir():
         # since we already got the project's name and type above, we can
-        # call `type.__call__` directly and bypass the `ProjectChecker`
-        # metaclass's `__call__` method.
-        return type.__call__(project_cls, cleaned_name)
+        # bypass the `ProjectChecker` metaclass's `__call__` method
+        return _get_registered_project(cleaned_name, project_cls)
 
     # else, the project doesn't exist
     return None
@@ -783,6 +1342,15 @@ def prune_projects(yes=False):
        behavior is for empty projects to be removed automatically when
        the interpreter is shut down -- they're only checked for and
        dealt with here as a fallback in case one somehow sneaks through.
+    3. Projects are found via the project catalog
+       (`davos.core.catalog`) rather than by walking
+       `DAVOS_PROJECT_DIR`, so only the notebook paths of
+       notebook-specific projects (and the directories of projects
+       recorded as taking up no space) are checked. The catalog is
+       first reconciled with the directories in `DAVOS_PROJECT_DIR`,
+       so projects it doesn't know about yet (e.g., empty project
+       directories, or projects created by other versions of `davos`)
+       are included.
     """
     if config.noninteractive and not yes:
         raise DavosProjectError(
@@ -790,42 +1358,51 @@ def prune_projects(yes=False):
             "explicitly pass 'yes=True'."
         )
 
+    # imported here to avoid a circular import
+    from davos.core.catalog import catalog_projects, record_removal
+
     # dict of projects to remove -- keys: "safe"-formatted project
     # directory names; values: corresponding notebook filepaths
     to_remove = {}
-    # iterate through project directory and do checks manually rather
+    # iterate through the project catalog and do checks manually rather
     # than checking `davos.all_projects` to avoid creating a bunch of
-    # Project instances and registering duplicate `atexit` callbacks
-    # unnecessarily
-    for project_dir in DAVOS_PROJECT_DIR.iterdir():
+    # Project instances (and project directories) unnecessarily
+    current_project = config.project
+    for entry in catalog_projects():
+        project_dirname = entry['safe_name']
         if (
-                not project_dir.is_dir()
-                or project_dir.name == config._project.safe_name
+                current_project is not None
+                and project_dirname == current_project.safe_name
         ):
-            # skip .DS_Store files and the project currently in use
+            # skip the project currently in use
             continue
 
-        project_dirname = project_dir.name
-        if PATHSEP_REPLACEMENT in project_dirname:
-            # if the project is notebook-specific...
-            as_filepath = _safename_to_filepath(project_dirname)
-            if not Path(as_filepath).is_file():
-                # ... and the associated notebook does not exist (i.e.,
-                # it's an "AbstractProject"), mark it for removal
+        project_dir = DAVOS_PROJECT_DIR.joinpath(project_dirname)
+        as_filepath = entry['notebook_path']
+        if as_filepath is not None and not Path(as_filepath).is_file():
+            # if the project is notebook-specific and the associated
+            # notebook does not exist (i.e., it's an "AbstractProject"),
+            # mark it for removal
+            if project_dir.is_dir():
                 to_remove[project_dirname] = as_filepath
-                continue
-        if _dir_is_empty(project_dir):
+            else:
+                # project directory was already removed outside of davos
+                record_removal(project_dirname)
+        elif entry['size_bytes'] == 0 and (not project_dir.is_dir()
+                                           or _dir_is_empty(project_dir)):
             # if the project directory is somehow empty, clean it up
             # (see "Notes" section of docstring).
             # Uses `shutil.rmtree()` rather than `Path.rmdir()` to
             # account for potential `.DS_Store` files if the project
             # directory was ever opened in Finder on a Mac
             shutil.rmtree(project_dir, ignore_errors=True)
+            record_removal(project_dirname)
 
     if yes:
         # don't list to-be-removed projects or prompt for confirmation
         for project_dirname in to_remove:
             shutil.rmtree(DAVOS_PROJECT_DIR.joinpath(project_dirname))
+            record_removal(project_dirname)
     elif to_remove:
         # escape codes for styled output
         ANSI_BOLD = '\033[1m'
@@ -855,6 +1432,7 @@ def prune_projects(yes=False):
                 except Exception:
                     statuses[i] = f"{ANSI_BOLD}{ANSI_YELLOW}failed to remove{ANSI_RESET}"
                 else:
+                    record_removal(project_dirname)
                     statuses[i] = f"{ANSI_BOLD}{ANSI_RED}removed{ANSI_RESET}"
             else:
                 statuses[i] = f"   {ANSI_BOLD}{ANSI_GREEN}kept{ANSI_RESET}"
@@ -862,7 +1440,7 @@ def prune_projects(yes=False):
             if i + 1 < len(to_remove):
                 statuses[i + 1] = CURRENT_PROJECT_INDICATOR
             # update project removal statuses and prompt in place
-            clear_output(wait=False)
+            _clear_output()
         # print final status for all projects processed
         print(template.format(*statuses))
     elif not config.suppress_stdout:
@@ -877,9 +1455,17 @@ def use_default_project():
     `davos.project` to it. In IPython notebooks, this is a
     notebook-specific project named for the notebook's filepath. In an
     IPython shell, this is a project named "ipython-shell", which is
-    shared by all IPython shell instances.
+    shared by all IPython shell instances. If a notebook without a
+    project of its own was moved, renamed, or copied from a notebook
+    that had one, that project is renamed or cloned to match (see
+    `davos.core.identity`).
     """
-    if isinstance(config._ipython_shell, TerminalInteractiveShell):
+    if config.environment == 'Python':
+        # davos was imported outside of IPython (e.g., by a script that
+        # manages projects), so there's no notebook to name the project
+        # for
+        proj_name = "davos-fallback"
+    elif _is_terminal_shell(config._ipython_shell):
         proj_name = "ipython-shell"
     else:
         try:
@@ -898,8 +1484,23 @@ def use_default_project():
                 "default project"
             )
 
+    if proj_name.endswith('.ipynb') and config.environment != 'Colaboratory':
+        safe_name = _filepath_to_safename(proj_name)
+        project_dir = DAVOS_PROJECT_DIR.joinpath(safe_name)
+        if not project_dir.is_dir() or _dir_is_empty(project_dir):
+            # if the notebook was moved or copied, reuse the project it
+            # used before rather than reinstalling its packages
+            # (imported here to avoid a circular import)
+            from davos.core.identity import adopt_previous_project
+            adopt_previous_project(proj_name)
+
     # will always be an absolute path to a real Jupyter notebook file,
     # name of real Colab notebook, or one of the non-path strings
     # explicitly set above, so we can skip project type decision logic
     default_project = ConcreteProject(proj_name)
     config.project = default_project
+
+
+# a single hook removes all empty project directories at shutdown,
+# rather than one per Project instance
+atexit.register(cleanup_project_dirs_atexit)
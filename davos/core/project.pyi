@@ -1,6 +1,7 @@
 from pathlib import PosixPath
 from types import NotImplementedType
-from typing import Any, Final, Literal, NoReturn, overload, TypeVar
+from typing import Any, Final, Literal, NoReturn, overload, TypedDict, TypeVar
+from weakref import WeakValueDictionary
 
 __all__ = list[Literal['DAVOS_CONFIG_DIR', 'DAVOS_PROJECT_DIR', 'Project', 'get_notebook_path', 'get_project',
                        'prune_projects', 'use_default_project']]
@@ -10,14 +11,23 @@ DAVOS_PROJECT_DIR: Final[PosixPath]
 PATHSEP: Final[Literal['/', '\\']]
 PATHSEP_REPLACEMENT: Final[Literal['___']]
 SITE_PACKAGES_SUFFIX: Final[str]
+_NOTEBOOK_PATH_CACHE: dict[str, str]
+_PROJECT_REGISTRY: WeakValueDictionary[str, AbstractProject | ConcreteProject]
+_SESSIONS_API_TIMEOUT: Final[int]
 
 _P = TypeVar('_P', bound=Project)
 _InstalledPkgs = list[tuple[str, str]]
 
+class _ServerInfo(TypedDict):
+    url: str
+    token: str
+    root_dir: str
+
 class ProjectChecker(type):
     def __call__(cls, name: PosixPath | str) -> AbstractProject | ConcreteProject: ...
 
 class Project(metaclass=ProjectChecker):
+    _dist_info_cache: dict[str, tuple[float, tuple[str, str]]]
     _installed_packages: _InstalledPkgs
     _site_packages_mtime: float
     name: str
@@ -38,9 +48,16 @@ class Project(metaclass=ProjectChecker):
     @property
     def installed_packages(self) -> _InstalledPkgs: ...
     def _refresh_installed_pkgs(self) -> None: ...
+    def clone(self, new_name: PosixPath | str) -> AbstractProject | ConcreteProject: ...
+    def export(self, path: PosixPath | str) -> PosixPath: ...
     def freeze(self) -> str: ...
+    @classmethod
+    def import_(cls, path: PosixPath | str, name: PosixPath | str | None = ...) -> AbstractProject | ConcreteProject: ...
+    def lock(self, path: PosixPath | str) -> PosixPath: ...
     def remove(self, yes: bool = ...) -> None: ...
+    def remove_unused(self, days: float = ..., dry_run: bool = ...) -> list[tuple[str, str, int]]: ...
     def rename(self, new_name: PosixPath | str) -> None: ...
+    def sync(self, lock: PosixPath | str) -> None: ...
 
 class AbstractProject(Project):
     def __getattr__(self, item: str) -> NoReturn: ...
@@ -48,11 +65,20 @@ class AbstractProject(Project):
 
 class ConcreteProject(Project): ...
 
+def _base_site_packages_dirs() -> list[str]: ...
+def _clear_output() -> None: ...
 def _dir_is_empty(path: PosixPath) -> bool: ...
 def _filepath_to_safename(filepath: str) -> str: ...
 def _get_project_name_type(project_name: PosixPath | str) -> tuple[str, AbstractProject | ConcreteProject]: ...
+def _get_registered_project(name: str, project_cls: type[_P]) -> _P: ...
+def _get_servers_from_cli() -> list[_ServerInfo]: ...
+def _get_servers_from_runtime_dir(*runtime_dirs: PosixPath) -> list[_ServerInfo]: ...
+def _is_terminal_shell(ipython_shell: object) -> bool: ...
+def _pid_is_running(pid: int) -> bool: ...
+def _query_server_sessions(server_info: _ServerInfo) -> list[dict[str, Any]]: ...
+def _read_dist_name_version(metadata_path: PosixPath | str) -> tuple[str, str] | None: ...
 def _safename_to_filepath(safename: str) -> str: ...
-def cleanup_project_dir_atexit(dirpath: PosixPath) -> None: ...
+def cleanup_project_dirs_atexit() -> None: ...
 def get_notebook_path() ->  str: ...
 @overload
 def get_project(name: PosixPath | str, create: Literal[True] = ...) -> AbstractProject | ConcreteProject: ...
@@ -0,0 +1,213 @@
+"""
+Size limit for the projects in `davos.DAVOS_PROJECT_DIR`.
+
+Projects are only removed automatically when their notebooks are
+deleted (see `davos.prune_projects()`), so on a shared server where
+each user's `~/.davos` directory counts against a home-directory quota,
+projects for old notebooks can accumulate indefinitely. Setting
+`davos.config.max_projects_bytes` limits the total size of all projects
+and the package store (see `davos.core.store`): after packages are
+installed into a project, if the space they use on disk exceeds the
+limit, the least recently used projects are removed until it doesn't.
+Since projects' files are hard links to files in the package store, each
+file is counted once no matter how many projects link to it, and
+removing a project only counts as freeing the space of files that no
+remaining project links to. This runs in a daemon thread, so it doesn't
+delay the `smuggle` statement that triggered it.
+
+The current project and any other project in use in the current
+interpreter session are never removed, nor are projects used within the
+last `_EVICTION_MIN_IDLE` seconds, since they may be in use by another
+notebook kernel. Distributions in the package store (see
+`davos.core.store`) that were linked into the removed projects and
+aren't linked into any other project are removed afterward.
+"""
+
+
+__all__ = ['evict_projects', 'evict_projects_in_background']
+
+
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+
+from davos import config
+from davos.core.project import _PROJECT_REGISTRY, DAVOS_PROJECT_DIR
+
+
+# min number of seconds since a project was last used before it may be
+# removed to free up space
+_EVICTION_MIN_IDLE = 24 * 60 * 60
+# thread currently running `evict_projects()` in the background, if any
+_EVICTION_THREAD = None
+
+
+def _count_links(path, files):
+    """
+    Count the hard links to each file under a directory.
+
+    Symbolic links are counted as files (not followed), and files that
+    disappear while the directory is being walked are skipped.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The directory to walk.
+    files : dict
+        Mapping of files' device and inode numbers to their sizes and
+        total numbers of hard links (anywhere on the filesystem). Files
+        found under `path` are added to it.
+
+    Returns
+    -------
+    collections.Counter
+        The number of links to each file (identified by its device and
+        inode numbers) found under `path`.
+    """
+    links = Counter()
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return links
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    links.update(_count_links(entry.path, files))
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            inode = (stat.st_dev, stat.st_ino)
+            files[inode] = (stat.st_size, stat.st_nlink)
+            links[inode] += 1
+    return links
+
+
+def _run_eviction():
+    """
+    Target of the background eviction thread.
+
+    Failures to read or update the project catalog are turned into
+    warnings, as they are when the catalog is updated after installing
+    packages.
+    """
+    # imported here to avoid circular imports
+    from davos.core.catalog import _warn_on_error
+
+    with _warn_on_error():
+        evict_projects()
+
+
+def evict_projects(max_bytes=None):
+    """
+    Remove least recently used projects until under a size limit.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The maximum total size (in bytes) of all projects. Defaults to
+        `davos.config.max_projects_bytes`. If `None`, nothing is
+        removed.
+
+    Returns
+    -------
+    list of str
+        The names of the removed projects, least recently used first.
+
+    Notes
+    -----
+    Projects' sizes recorded in the project catalog count files shared
+    with other projects through the package store once per project, so
+    the space used is instead measured by walking the projects and the
+    store, counting each file (i.e., inode) once. Removing a project is
+    credited with the size of each of its files whose remaining links
+    are all in the store (or that have no other links), since the store
+    entries those belong to are removed along with the project.
+    """
+    # imported here to avoid circular imports
+    from davos.core.catalog import catalog_projects, record_removal
+    from davos.core.store import (
+        DAVOS_STORE_DIR,
+        _linked_records,
+        prune_store
+    )
+
+    if max_bytes is None:
+        max_bytes = config._max_projects_bytes
+        if max_bytes is None:
+            return []
+    entries = catalog_projects()
+    # (device, inode) -> (size, number of links)
+    files = {}
+    project_links = {
+        entry['safe_name']: _count_links(
+            DAVOS_PROJECT_DIR.joinpath(entry['safe_name']), files
+        )
+        for entry in entries
+    }
+    store_links = _count_links(DAVOS_STORE_DIR, files)
+    total_bytes = sum(size for size, _ in files.values())
+    if total_bytes <= max_bytes:
+        return []
+    remaining_links = {inode: n_links
+                       for inode, (_, n_links) in files.items()}
+    # never remove the current project (if it's been determined yet) or
+    # other projects in use during this interpreter session
+    protected = {project.safe_name
+                 for project in list(_PROJECT_REGISTRY.values())}
+    current_project = config._project
+    if hasattr(current_project, 'safe_name'):
+        protected.add(current_project.safe_name)
+    idle_cutoff = time.time() - _EVICTION_MIN_IDLE
+    entries.sort(key=lambda entry: entry['last_used'] or 0)
+    evicted = []
+    # RECORD files of the evicted projects' distributions, which
+    # identify the stored distributions they were linked to
+    evicted_records = set()
+    for entry in entries:
+        if total_bytes <= max_bytes:
+            break
+        if (
+                entry['safe_name'] in protected
+                or (entry['last_used'] or 0) > idle_cutoff
+        ):
+            continue
+        project_dir = DAVOS_PROJECT_DIR.joinpath(entry['safe_name'])
+        evicted_records |= _linked_records(project_dir)
+        shutil.rmtree(project_dir, ignore_errors=True)
+        record_removal(entry['safe_name'])
+        for inode, n_links in project_links[entry['safe_name']].items():
+            n_remaining = remaining_links[inode] - n_links
+            # freed once only the store (if anything) still links to it
+            if remaining_links[inode] > store_links[inode] >= n_remaining:
+                total_bytes -= files[inode][0]
+            remaining_links[inode] = n_remaining
+        evicted.append(entry['name'])
+    if evicted:
+        # only remove stored distributions freed by removing these
+        # projects, not others kept in the store on purpose (e.g., so a
+        # project can quickly switch back to a previous version)
+        prune_store(evicted_records)
+    return evicted
+
+
+def evict_projects_in_background():
+    """
+    Run `evict_projects()` in a daemon thread.
+
+    Called after packages are installed into a project. Does nothing if
+    `davos.config.max_projects_bytes` is `None` or a previous call's
+    thread is still running.
+    """
+    global _EVICTION_THREAD
+    if config._max_projects_bytes is None:
+        return
+    if _EVICTION_THREAD is not None and _EVICTION_THREAD.is_alive():
+        return
+    _EVICTION_THREAD = threading.Thread(target=_run_eviction,
+                                        name='davos-evict-projects',
+                                        daemon=True)
+    _EVICTION_THREAD.start()
@@ -0,0 +1,14 @@
+from collections import Counter
+from pathlib import PosixPath
+from threading import Thread
+from typing import Final, Literal
+
+__all__ = list[Literal['evict_projects', 'evict_projects_in_background']]
+
+_EVICTION_MIN_IDLE: Final[int]
+_EVICTION_THREAD: Thread | None
+
+def _count_links(path: PosixPath | str, files: dict[tuple[int, int], tuple[int, int]]) -> Counter[tuple[int, int]]: ...
+def _run_eviction() -> None: ...
+def evict_projects(max_bytes: int | None = ...) -> list[str]: ...
+def evict_projects_in_background() -> None: ...
@@ -9,11 +9,19 @@ them into their component syntactic elements. `pip_installed_pkgs_regex`
 is used to extract names of just-installed/updated packages from the
 stdout generated by the `pip install` command. davos uses these names to
 check for and reload packages that were previously imported as a
-different version.
+different version. `pip_progress_regex` is used to match the log
+messages `pip install` emits at the start of each stage of the install
+process (and the counts it reports along the way), so that a compact
+progress display can be shown in place of the full output.
 """
 
 
-__all__ = ['pip_installed_pkgs_regex', 'smuggle_statement_regex']
+__all__ = [
+    'install_timeout_arg_regex',
+    'pip_installed_pkgs_regex',
+    'pip_progress_regex',
+    'smuggle_statement_regex'
+]
 
 
 import re
@@ -29,9 +37,24 @@ _smuggle_subexprs = {
     'comment_re': r'(?m:\#+.*$)'
 }
 
+# davos's own `--install-timeout` onion comment option (and its value)
+install_timeout_arg_regex = re.compile(r'--install-timeout(?:=| +)\S+')
+
 pip_installed_pkgs_regex = re.compile("^Successfully installed (.*)$",
                                       re.MULTILINE)
 
+pip_progress_regex = re.compile(
+    r'^\s*(?:'
+    r'Collecting (?P<collecting>\S+)'
+    r'|Requirement already satisfied: (?P<satisfied>\S+)'
+    r'|(?:Downloading|Using cached) (?P<downloading>\S+)'
+    # amount downloaded so far, shown in pip's progress bar (pip>=22)
+    r'|.*?(?P<transferred>\d+(?:\.\d+)?/\d+(?:\.\d+)? [kMG]?B)\b'
+    r'|Building wheel for (?P<building>\S+)'
+    r'|Installing collected packages: (?P<installing>.+)'
+    r')'
+)
+
 # pylint: disable=line-too-long, trailing-whitespace
 smuggle_statement_regex = re.compile((    # noqa: E131
     r'^\s*'                                                               # match only if statement is first non-whitespace chars
@@ -1,7 +1,7 @@
 from re import Pattern
 from typing import Final, final, Literal, TypedDict
 
-__all__ = list[Literal['pip_installed_pkgs_regex', 'smuggle_statement_regex']]
+__all__ = list[Literal['install_timeout_arg_regex', 'pip_installed_pkgs_regex', 'pip_progress_regex', 'smuggle_statement_regex']]
 
 _name_re: Final[Literal[r'[a-zA-Z_]\w*']]
 
@@ -14,5 +14,7 @@ class _smuggle_subexprs(TypedDict):
     onion_re: Literal[r'\# *(?:pip|conda) *: *[^#\n ].+?(?= +\#| *\n| *$)']
     qualname_re: Literal[r'[a-zA-Z_]\w*(?: *\. *[a-zA-Z_]\w*)*']
 
+install_timeout_arg_regex: Final[Pattern[str]]
 pip_installed_pkgs_regex: Final[Pattern[str]]
+pip_progress_regex: Final[Pattern[str]]
 smuggle_statement_regex: Final[Pattern[str]]
@@ -0,0 +1,799 @@
+"""
+Content-addressed store of installed distributions shared by projects.
+
+Rather than each project keeping its own copy of every package installed
+into it, the files of each distribution installed into a project are
+moved into a shared store (`~/.davos/store/`) and hard-linked back into
+the project directory, so projects that use the same version of a
+package share a single copy of its files on disk. Each distribution in
+the store is identified by its name, version, and a digest of the file
+hashes listed in its `RECORD`, so different builds of the same version
+(e.g., for different Python versions or platforms) are stored
+separately.
+
+When a package pinned to an exact version (e.g., `numpy==1.26.4`) is
+smuggled into a project, `davos` first checks whether it (and any of its
+dependencies not already available) can be satisfied from the store,
+and if so, links them into the project instead of running
+`pip install`. Requirements that aren't pinned are always installed
+with `pip`, since it would install the newest available version, which
+may be newer than any in the store. `Project.clone()` similarly creates
+a new project by hard-linking an existing project's files.
+
+Hard links can't span filesystems, so the store is used only when it's
+on the same filesystem as `davos.DAVOS_PROJECT_DIR` (as it is by
+default). Changes to the store, and linking distributions from it, are
+serialized across threads and processes by an exclusive lock on a file
+in the store directory (see `_store_lock()`), so a distribution can't
+be removed from the store while it's being linked into a project.
+"""
+
+
+__all__ = [
+    'DAVOS_STORE_DIR',
+    'ingest_project',
+    'link_from_store',
+    'link_tree',
+    'prune_store'
+]
+
+
+import csv
+import hashlib
+import os
+import shutil
+import sys
+import warnings
+from contextlib import contextmanager
+from pathlib import Path
+
+from davos import config
+from davos.core.config import DAVOS_CONFIG_DIR
+from davos.core.core import _get_pip_interpreter
+from davos.core.project import _read_dist_name_version, SITE_PACKAGES_SUFFIX
+
+
+DAVOS_STORE_DIR = DAVOS_CONFIG_DIR.joinpath('store')
+# file locked while the store is modified or distributions are linked
+# from it (its name starts with "." so it's never mistaken for a stored
+# distribution)
+_STORE_LOCK_NAME = '.lock'
+# files in a distribution's .dist-info directory whose contents depend
+# on how (rather than what) it was installed. These are excluded from
+# the digest that identifies the distribution in the store
+_INSTALL_SPECIFIC_FILES = ('INSTALLER', 'RECORD', 'REQUESTED')
+# set of wheel tags supported by the current interpreter (filled the
+# first time the store is searched)
+_SUPPORTED_TAGS = set()
+
+
+def _dist_store_name(name, version):
+    """
+    Get the prefix of a distribution's directory name in the store.
+
+    Parameters
+    ----------
+    name : str
+        The distribution's name.
+    version : str
+        The distribution's version.
+
+    Returns
+    -------
+    str
+        The distribution's normalized name and version, separated by a
+        hyphen (e.g., `'scikit_learn-1.3.0'`).
+    """
+    from packaging.utils import canonicalize_name
+    from packaging.version import Version
+
+    name = canonicalize_name(name).replace('-', '_')
+    return f'{name}-{Version(version)}'
+
+
+def _find_store_entry(requirement, interpreter):
+    """
+    Find the newest distribution in the store that satisfies a
+    requirement.
+
+    Parameters
+    ----------
+    requirement : packaging.requirements.Requirement
+        The requirement to satisfy.
+    interpreter : str or None
+        The Python interpreter `pip` installs packages with. Stored
+        distributions that include scripts written for a different
+        interpreter are skipped.
+
+    Returns
+    -------
+    tuple or None
+        The distribution's store directory (`pathlib.Path`), its
+        `.dist-info` directory within the store directory
+        (`pathlib.Path`), its name (`str`), and its version (`str`), or
+        `None` if no compatible distribution satisfies `requirement`.
+    """
+    from packaging.utils import canonicalize_name
+    from packaging.version import InvalidVersion, Version
+
+    prefix = f"{canonicalize_name(requirement.name).replace('-', '_')}-"
+    versions = {}
+    try:
+        with os.scandir(DAVOS_STORE_DIR) as entries:
+            for entry in entries:
+                if not entry.name.startswith(prefix):
+                    continue
+                version = entry.name[len(prefix):].rsplit('-', maxsplit=1)[0]
+                try:
+                    versions.setdefault(Version(version), []).append(
+                        Path(entry.path)
+                    )
+                except InvalidVersion:
+                    continue
+    except FileNotFoundError:
+        return None
+    # filter versions the way pip does (e.g., exclude prereleases unless
+    # the requirement explicitly allows them)
+    for version in sorted(requirement.specifier.filter(versions),
+                          reverse=True):
+        for entry_dir in versions[version]:
+            site_packages_dir = entry_dir.joinpath(SITE_PACKAGES_SUFFIX)
+            for dist_info in site_packages_dir.glob('*.dist-info'):
+                name_version = _read_dist_name_version(dist_info)
+                if (
+                        name_version is not None
+                        and _is_compatible(entry_dir, dist_info, interpreter)
+                ):
+                    return (entry_dir, dist_info, *name_version)
+    return None
+
+
+def _find_stored_dist(dist_info_name, record_id):
+    """
+    Find the store directory of a distribution by its `RECORD` file.
+
+    Parameters
+    ----------
+    dist_info_name : str
+        The name of the distribution's `.dist-info` directory.
+    record_id : tuple of int
+        The device and inode numbers of the distribution's `RECORD`
+        file, which is shared by the stored distribution and projects
+        it's linked into.
+
+    Returns
+    -------
+    pathlib.Path or None
+        The distribution's store directory, or `None` if it isn't in
+        the store.
+    """
+    try:
+        with os.scandir(DAVOS_STORE_DIR) as entries:
+            entry_dirs = [Path(entry.path) for entry in entries
+                          if not entry.name.startswith('.')]
+    except FileNotFoundError:
+        return None
+    for entry_dir in entry_dirs:
+        record = entry_dir.joinpath(SITE_PACKAGES_SUFFIX, dist_info_name,
+                                    'RECORD')
+        try:
+            record_stat = record.stat()
+        except OSError:
+            continue
+        if (record_stat.st_dev, record_stat.st_ino) == record_id:
+            return entry_dir
+    return None
+
+
+def _ingest_dist(dist_info, project_dir):
+    """
+    Add an installed distribution's files to the store.
+
+    If the distribution isn't in the store yet, its files are hard
+    linked into a new store directory. Otherwise, its files in the
+    project are replaced with hard links to the stored copies.
+
+    Parameters
+    ----------
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory.
+    project_dir : pathlib.Path
+        The directory of the project the distribution is installed in.
+    """
+    from packaging.version import InvalidVersion
+
+    name_version = _read_dist_name_version(dist_info)
+    if name_version is None:
+        return
+    try:
+        store_name = _dist_store_name(*name_version)
+    except InvalidVersion:
+        return
+    site_packages_dir = dist_info.parent
+    rel_paths = []
+    digest = hashlib.sha256()
+    with dist_info.joinpath('RECORD').open(newline='', encoding='utf-8') as f:
+        records = sorted(row for row in csv.reader(f) if row)
+    for record in records:
+        path = os.path.normpath(site_packages_dir.joinpath(record[0]))
+        rel_path = os.path.relpath(path, project_dir)
+        if rel_path.startswith(os.pardir):
+            # distribution installed files outside the project (e.g.,
+            # via --install-option), so its files can't be managed
+            return
+        if (
+                Path(rel_path).parent.name.endswith('.dist-info')
+                and Path(rel_path).name in _INSTALL_SPECIFIC_FILES
+        ):
+            if Path(rel_path).name != 'REQUESTED':
+                rel_paths.append(rel_path)
+            continue
+        rel_paths.append(rel_path)
+        if len(record) > 1 and record[1] and not rel_path.endswith('.pyc'):
+            # .pyc files embed their source files' modification times,
+            # so they differ between otherwise identical installations
+            digest.update(f'{rel_path},{record[1]}\n'.encode('utf-8'))
+    entry_dir = DAVOS_STORE_DIR.joinpath(
+        f'{store_name}-{digest.hexdigest()[:16]}'
+    )
+    if not entry_dir.is_dir():
+        # link the project's files into a temporary directory, then
+        # move it into place so other processes never see a partially
+        # added distribution
+        tmp_dir = DAVOS_STORE_DIR.joinpath(f'.{entry_dir.name}.{os.getpid()}')
+        for rel_path in rel_paths:
+            src = project_dir.joinpath(rel_path)
+            if src.is_file():
+                _link_file(src, tmp_dir.joinpath(rel_path))
+        try:
+            tmp_dir.rename(entry_dir)
+        except OSError:
+            # another process added the same distribution first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            return
+    for rel_path in rel_paths:
+        stored = entry_dir.joinpath(rel_path)
+        if stored.is_file():
+            _link_file(stored, project_dir.joinpath(rel_path))
+
+
+def _is_compatible(entry_dir, dist_info, interpreter):
+    """
+    Check whether a stored distribution can be used by this interpreter.
+
+    Parameters
+    ----------
+    entry_dir : pathlib.Path
+        The distribution's store directory.
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory within `entry_dir`.
+    interpreter : str or None
+        The Python interpreter `pip` installs packages with.
+
+    Returns
+    -------
+    bool
+        `True` if one of the distribution's wheel tags is supported by
+        the current interpreter, and any scripts it includes run with
+        `interpreter`. Otherwise, `False`.
+    """
+    if not _SUPPORTED_TAGS:
+        from packaging.tags import sys_tags
+        _SUPPORTED_TAGS.update(map(str, sys_tags()))
+    try:
+        wheel_lines = dist_info.joinpath('WHEEL').read_text().splitlines()
+    except OSError:
+        return False
+    tags = (line[4:].strip() for line in wheel_lines
+            if line.startswith('Tag:'))
+    if not any(tag in _SUPPORTED_TAGS for tag in tags):
+        return False
+    site_packages_dir = str(entry_dir.joinpath(SITE_PACKAGES_SUFFIX))
+    for dirpath, dirnames, filenames in os.walk(entry_dir):
+        if dirpath == os.path.dirname(site_packages_dir):
+            # only check files outside site-packages
+            dirnames[:] = [d for d in dirnames if d != 'site-packages']
+        for filename in filenames:
+            # scripts' shebang lines point to the interpreter that ran
+            # pip when they were installed. For pip's /bin/sh
+            # "trampoline", the interpreter is on the second line
+            with open(os.path.join(dirpath, filename), 'rb') as f:
+                head = f.read(2)
+                header = head + f.readline() + f.readline()
+            if head == b'#!' and (
+                    interpreter is None
+                    or os.fsencode(interpreter) not in header
+            ):
+                return False
+    return True
+
+
+def _link_file(src, dst):
+    """
+    Replace a file with a hard link to another file.
+
+    Falls back to copying `src` if it can't be hard linked (e.g., if
+    `src` and `dst` are on different filesystems).
+
+    Parameters
+    ----------
+    src : str or pathlib.Path
+        The file to link to.
+    dst : str or pathlib.Path
+        The path of the link. Any existing file at this path is
+        (atomically) replaced, and parent directories are created as
+        needed.
+    """
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    tmp_path = dst.with_name(f'.{dst.name}.{os.getpid()}.davos-tmp')
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _linked_records(project_dir):
+    """
+    Identify the `RECORD` files of a project's installed distributions.
+
+    Parameters
+    ----------
+    project_dir : str or pathlib.Path
+        The project's directory.
+
+    Returns
+    -------
+    set of tuple
+        The device and inode numbers (`int`) of the `RECORD` file of
+        each distribution installed in the project, which are shared by
+        the `RECORD` files of the stored distributions they're linked
+        to.
+    """
+    records = set()
+    # projects used with other Python versions have different
+    # "lib/python*" directories
+    for record in Path(project_dir).glob(
+            'lib/*/site-packages/*.dist-info/RECORD'
+    ):
+        try:
+            record_stat = record.stat()
+        except OSError:
+            continue
+        records.add((record_stat.st_dev, record_stat.st_ino))
+    return records
+
+
+def _read_requires_dist(dist_info):
+    """
+    Read a distribution's requirements from its metadata.
+
+    Parameters
+    ----------
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory.
+
+    Returns
+    -------
+    list of str
+        The distribution's `Requires-Dist` headers.
+    """
+    requirements = []
+    metadata_path = dist_info.joinpath('METADATA')
+    with metadata_path.open(encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.strip():
+                # end of headers
+                break
+            if line.startswith('Requires-Dist:'):
+                requirements.append(line[14:].strip())
+    return requirements
+
+
+def _resolve_from_store(requirement, project):
+    """
+    Determine the stored distributions needed to install a requirement.
+
+    Recursively resolves the requirement's dependencies, using installed
+    distributions where possible and otherwise the newest compatible
+    distribution in the store. Different versions of any of these
+    distributions installed in the project can be replaced (e.g., to
+    switch between versions of a package requested by different
+    `smuggle` statements) if they're also in the store, so they can
+    later be switched back just as quickly.
+
+    Parameters
+    ----------
+    requirement : packaging.requirements.Requirement
+        The requirement to install.
+    project : davos.core.project.ConcreteProject
+        The project the requirement will be installed into.
+
+    Returns
+    -------
+    tuple of list or None
+        A list containing the store directory (`pathlib.Path`), name
+        (`str`), and version (`str`) of each distribution to link into
+        the project, and a list of the `.dist-info` directories
+        (`pathlib.Path`) of the distributions they replace, or `None` if
+        the requirement can't be satisfied without running `pip`.
+    """
+    if sys.version_info < (3, 8):
+        import importlib_metadata as metadata
+    else:
+        from importlib import metadata
+    from packaging.requirements import InvalidRequirement, Requirement
+    from packaging.utils import canonicalize_name
+
+    interpreter = _get_pip_interpreter(config._pip_executable)
+    # canonical names of distributions installed in the project ->
+    # their .dist-info directories
+    project_dists = {}
+    try:
+        for dist_info in project.site_packages_dir.glob('*.dist-info'):
+            name_version = _read_dist_name_version(dist_info)
+            if name_version is not None:
+                project_dists[canonicalize_name(name_version[0])] = dist_info
+    except OSError:
+        pass
+    to_unlink = []
+    # canonical names of distributions to link -> (store dir,
+    # .dist-info dir, name, version)
+    to_link = {}
+    # canonical names of distributions to link -> extras whose
+    # requirements have been added ('' for the base requirements)
+    extras_added = {}
+    pending = [(requirement, True)]
+    while pending:
+        req, is_smuggled_pkg = pending.pop()
+        key = canonicalize_name(req.name)
+        if key in to_link:
+            if not req.specifier.contains(to_link[key][3], prereleases=True):
+                # conflicting requirements -- let pip sort it out
+                return None
+            extras = req.extras - extras_added[key]
+            if not extras:
+                continue
+        else:
+            if not is_smuggled_pkg:
+                try:
+                    installed_version = metadata.version(req.name)
+                except metadata.PackageNotFoundError:
+                    installed_version = None
+                if (
+                        installed_version is not None
+                        and not req.extras
+                        and req.specifier.contains(installed_version,
+                                                   prereleases=True)
+                ):
+                    # dependency is already satisfied
+                    continue
+            if key in project_dists:
+                # another version is installed in the project. Replace
+                # it only if it's in the store, since otherwise it'd
+                # have to be reinstalled to switch back to it
+                installed_dist_info = project_dists[key]
+                record = installed_dist_info.joinpath('RECORD')
+                try:
+                    if record.stat().st_nlink < 2:
+                        return None
+                except OSError:
+                    return None
+                to_unlink.append(installed_dist_info)
+            found = _find_store_entry(req, interpreter)
+            if found is None:
+                return None
+            to_link[key] = found
+            extras_added[key] = set()
+            extras = {'', *req.extras}
+        extras_added[key].update(extras)
+        for dep_str in _read_requires_dist(to_link[key][1]):
+            try:
+                dep = Requirement(dep_str)
+            except InvalidRequirement:
+                return None
+            if dep.marker is None:
+                is_needed = '' in extras
+            else:
+                is_needed = any(dep.marker.evaluate({'extra': extra})
+                                for extra in extras)
+            if is_needed:
+                pending.append((dep, False))
+    to_link = [(entry_dir, name, version)
+               for entry_dir, _, name, version in to_link.values()]
+    return to_link, to_unlink
+
+
+def _store_available(project_dir):
+    """
+    Check whether the store can be used with a project.
+
+    Parameters
+    ----------
+    project_dir : pathlib.Path
+        The project's directory.
+
+    Returns
+    -------
+    bool
+        `True` if the store (which is created if necessary) is on the
+        same filesystem as `project_dir`, so files can be hard linked
+        between them. Otherwise, `False`.
+    """
+    try:
+        DAVOS_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        store_device = DAVOS_STORE_DIR.stat().st_dev
+        project_device = Path(project_dir).stat().st_dev
+    except OSError:
+        return False
+    return store_device == project_device
+
+
+@contextmanager
+def _store_lock():
+    """
+    Hold an exclusive lock on the store.
+
+    Blocks until no other thread or process holds the lock. The lock
+    isn't reentrant, so functions that acquire it must not call each
+    other while holding it.
+    """
+    import fcntl
+
+    DAVOS_STORE_DIR.mkdir(parents=True, exist_ok=True)
+    with DAVOS_STORE_DIR.joinpath(_STORE_LOCK_NAME).open('a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _unlink_dist(dist_info, project_dir):
+    """
+    Remove an installed distribution's files from a project.
+
+    Like `pip uninstall`, but only removes the project's links to the
+    files, which remain in the store.
+
+    Parameters
+    ----------
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory.
+    project_dir : pathlib.Path
+        The directory of the project the distribution is installed in.
+    """
+    import importlib.util
+
+    site_packages_dir = dist_info.parent
+    with dist_info.joinpath('RECORD').open(newline='', encoding='utf-8') as f:
+        paths = [os.path.normpath(site_packages_dir.joinpath(row[0]))
+                 for row in csv.reader(f) if row]
+    # also remove bytecode compiled by the current Python version
+    paths += [importlib.util.cache_from_source(path)
+              for path in paths if path.endswith('.py')]
+    parent_dirs = set()
+    for path in paths:
+        if os.path.relpath(path, project_dir).startswith(os.pardir):
+            continue
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        parent_dirs.add(os.path.dirname(path))
+    # remove directories left empty, deepest first
+    stop_dirs = (str(site_packages_dir), str(project_dir))
+    for dirpath in sorted(parent_dirs, key=len, reverse=True):
+        while dirpath not in stop_dirs:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                # not empty
+                break
+            dirpath = os.path.dirname(dirpath)
+
+
+def ingest_project(project):
+    """
+    Add the distributions installed in a project to the store.
+
+    Distributions already linked to the store are skipped, so this is
+    cheap to call after every installation.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project whose distributions should be added.
+    """
+    site_packages_dir = project.site_packages_dir
+    if not _store_available(project.project_dir):
+        return
+    try:
+        entries = list(os.scandir(site_packages_dir))
+    except FileNotFoundError:
+        return
+    with _store_lock():
+        for entry in entries:
+            if not entry.name.endswith('.dist-info'):
+                continue
+            dist_info = Path(entry.path)
+            try:
+                if dist_info.joinpath('RECORD').stat().st_nlink > 1:
+                    # already linked to the store
+                    continue
+                _ingest_dist(dist_info, project.project_dir)
+            except OSError as e:
+                warnings.warn(
+                    f"Failed to add {entry.name} to the davos package "
+                    f"store: {e}",
+                    category=RuntimeWarning
+                )
+
+
+def link_from_store(onion, project):
+    """
+    Install a smuggled package by linking it from the store.
+
+    Used in place of running `pip install` when the package (and any
+    of its dependencies that aren't already installed) are available in
+    the store. Other versions of these packages installed in the
+    project are unlinked first, so switching between versions already
+    in the store doesn't require downloading, building, or installing
+    anything. Only requirements pinned to an exact version (e.g.,
+    `numpy==1.26.4`) without additional `pip` options are installed
+    this way, and only with the default `pip` executable. Otherwise,
+    `pip` would install the newest version available, rather than the
+    newest version in the store (which may be much older). The
+    package's dependencies are linked from the store if it has a
+    version that satisfies the package's requirements.
+
+    Parameters
+    ----------
+    onion : davos.core.core.Onion
+        The package to install.
+    project : davos.core.project.ConcreteProject
+        The project to install the package into.
+
+    Returns
+    -------
+    str or None
+        Output in the format `pip install` uses to report installed
+        packages (`"Successfully installed <name>-<version> ..."`), or
+        `None` if the package couldn't be installed from the store.
+    """
+    from packaging.requirements import InvalidRequirement, Requirement
+
+    if (
+            onion.installer != 'pip'
+            or onion.is_editable
+            or onion.installer_kwargs
+            or '/' in onion.install_name
+            or '+' in onion.install_name
+            or config._pip_executable != config._default_pip_executable
+            or not _store_available(project.project_dir)
+    ):
+        return None
+    try:
+        requirement = Requirement(f'{onion.install_name}{onion.version_spec}')
+    except InvalidRequirement:
+        return None
+    specifiers = list(requirement.specifier)
+    if not (
+            len(specifiers) == 1
+            and (specifiers[0].operator == '==='
+                 or specifiers[0].operator == '=='
+                 and not specifiers[0].version.endswith('.*'))
+    ):
+        return None
+    # keep the distributions from being pruned from the store while
+    # they're being linked
+    with _store_lock():
+        resolved = _resolve_from_store(requirement, project)
+        if resolved is None:
+            return None
+        to_link, to_unlink = resolved
+        for dist_info in to_unlink:
+            _unlink_dist(dist_info, project.project_dir)
+        for entry_dir, _, _ in to_link:
+            link_tree(entry_dir, project.project_dir)
+    installed = ' '.join(f'{name}-{version}' for _, name, version in to_link)
+    stdout = f'Successfully installed {installed}'
+    if not config.suppress_stdout:
+        print(f'Linked from davos package store ({DAVOS_STORE_DIR}):\n'
+              f'{stdout}')
+    return stdout
+
+
+def prune_store(records=None):
+    """
+    Remove distributions from the store that no project uses.
+
+    A stored distribution is unused once no project has a hard link to
+    its `RECORD` file (e.g., after the projects it was installed into
+    are removed).
+
+    Parameters
+    ----------
+    records : collection of tuple, optional
+        If passed, only stored distributions whose `RECORD` files are
+        among these (identified by device and inode numbers, as
+        returned by `_linked_records()`) are removed if unused -- e.g.,
+        those that were linked into projects that were just removed.
+        Otherwise, every unused distribution is removed, including
+        those kept in the store so a project can quickly switch back
+        to them.
+
+    Returns
+    -------
+    int
+        The number of distributions removed.
+    """
+    removed = 0
+    if records is not None and not records:
+        return removed
+    try:
+        with os.scandir(DAVOS_STORE_DIR) as entries:
+            entry_dirs = [Path(entry.path) for entry in entries
+                          if entry.is_dir() and not entry.name.startswith('.')]
+    except FileNotFoundError:
+        return removed
+    with _store_lock():
+        for entry_dir in entry_dirs:
+            # entries for other Python versions have different
+            # "lib/python*" directories
+            entry_records = list(
+                entry_dir.glob('lib/*/site-packages/*.dist-info/RECORD')
+            )
+            try:
+                record_stats = [record.stat() for record in entry_records]
+            except OSError:
+                continue
+            if (
+                    not record_stats
+                    or any(st.st_nlink > 1 for st in record_stats)
+                    or records is not None and not any(
+                        (st.st_dev, st.st_ino) in records
+                        for st in record_stats
+                    )
+            ):
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def link_tree(src_dir, dst_dir):
+    """
+    Recursively hard link the contents of one directory into another.
+
+    Like `shutil.copytree()`, but files are hard linked (or copied, if
+    they can't be linked) rather than copied, and `dst_dir` may already
+    exist.
+
+    Parameters
+    ----------
+    src_dir : str or pathlib.Path
+        The directory whose contents should be linked.
+    dst_dir : str or pathlib.Path
+        The directory to link them into. Existing files with the same
+        paths are replaced.
+    """
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        rel_dir = os.path.relpath(dirpath, src_dir)
+        dst_subdir = os.path.join(dst_dir, rel_dir)
+        os.makedirs(dst_subdir, exist_ok=True)
+        for name in [*dirnames, *filenames]:
+            src = os.path.join(dirpath, name)
+            dst = os.path.join(dst_subdir, name)
+            if os.path.islink(src):
+                # os.walk() doesn't follow symlinks to directories, so
+                # recreate symlinks (to files or directories) as-is
+                if os.path.lexists(dst):
+                    os.unlink(dst)
+                os.symlink(os.readlink(src), dst)
+            elif name in filenames:
+                _link_file(src, dst)
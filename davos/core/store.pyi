@@ -0,0 +1,39 @@
+from collections.abc import Collection
+from contextlib import AbstractContextManager
+from pathlib import PosixPath
+from typing import Final, Literal
+
+from packaging.requirements import Requirement
+
+from davos.core.core import Onion
+from davos.core.project import ConcreteProject, Project
+
+__all__ = list[Literal['DAVOS_STORE_DIR', 'ingest_project', 'link_from_store', 'link_tree',
+                       'prune_store']]
+
+DAVOS_STORE_DIR: Final[PosixPath]
+_STORE_LOCK_NAME: Final[Literal['.lock']]
+_INSTALL_SPECIFIC_FILES: Final[tuple[Literal['INSTALLER'], Literal['RECORD'], Literal['REQUESTED']]]
+_SUPPORTED_TAGS: set[str]
+
+_StoreEntry = tuple[PosixPath, PosixPath, str, str]
+
+def _dist_store_name(name: str, version: str) -> str: ...
+def _find_store_entry(requirement: Requirement, interpreter: str | None) -> _StoreEntry | None: ...
+def _find_stored_dist(dist_info_name: str, record_id: tuple[int, int]) -> PosixPath | None: ...
+def _ingest_dist(dist_info: PosixPath, project_dir: PosixPath) -> None: ...
+def _is_compatible(entry_dir: PosixPath, dist_info: PosixPath, interpreter: str | None) -> bool: ...
+def _link_file(src: PosixPath | str, dst: PosixPath | str) -> None: ...
+def _linked_records(project_dir: PosixPath | str) -> set[tuple[int, int]]: ...
+def _read_requires_dist(dist_info: PosixPath) -> list[str]: ...
+def _resolve_from_store(
+        requirement: Requirement,
+        project: ConcreteProject
+) -> tuple[list[tuple[PosixPath, str, str]], list[PosixPath]] | None: ...
+def _store_available(project_dir: PosixPath) -> bool: ...
+def _store_lock() -> AbstractContextManager[None]: ...
+def _unlink_dist(dist_info: PosixPath, project_dir: PosixPath) -> None: ...
+def ingest_project(project: Project) -> None: ...
+def link_from_store(onion: Onion, project: ConcreteProject) -> str | None: ...
+def link_tree(src_dir: PosixPath | str, dst_dir: PosixPath | str) -> None: ...
+def prune_store(records: Collection[tuple[int, int]] | None = ...) -> int: ...
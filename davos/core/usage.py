@@ -0,0 +1,302 @@
+"""
+Usage tracking and garbage collection for distributions in projects.
+
+Packages smuggled once (e.g., for a quick experiment) and dependencies
+left behind when other packages are upgraded otherwise remain in a
+project's `site-packages` directory indefinitely. To identify these,
+the finder `davos` uses to load packages from projects
+(`davos.core.finders.project_finder`) notes each top-level module it
+loads from a project, and after each `smuggle` statement, the
+distributions those modules belong to are marked as just used in the
+project catalog (see `davos.core.catalog`). `Project.remove_unused()`
+can then remove distributions that haven't been used recently and
+aren't required by any that have.
+"""
+
+
+__all__ = ['collect_garbage', 'flush_imports']
+
+
+import csv
+import os
+import time
+
+from davos import config
+from davos.core.finders import invalidate_path_caches, project_finder
+from davos.core.project import _read_dist_name_version
+
+
+# cache of each distribution's top-level module names
+# format: {dist_info_path: (RECORD mtime, {name, ...}), ...}
+_TOP_LEVEL_NAMES = {}
+
+
+def _dist_files(dist_info):
+    """
+    List the files a distribution installed.
+
+    Parameters
+    ----------
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory.
+
+    Returns
+    -------
+    list of str
+        Paths (as listed in the distribution's `RECORD`) relative to its
+        `site-packages` directory.
+    """
+    with dist_info.joinpath('RECORD').open(newline='', encoding='utf-8') as f:
+        return [row[0] for row in csv.reader(f) if row]
+
+
+def _dist_top_level_names(dist_info):
+    """
+    Get the names of the top-level modules a distribution provides.
+
+    Parameters
+    ----------
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory.
+
+    Returns
+    -------
+    set of str
+        The names of the distribution's top-level packages and modules.
+    """
+    key = str(dist_info)
+    try:
+        mtime = dist_info.joinpath('RECORD').stat().st_mtime
+        cached = _TOP_LEVEL_NAMES.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        paths = _dist_files(dist_info)
+    except OSError:
+        return set()
+    names = set()
+    for path in paths:
+        first_part, sep, _ = path.partition('/')
+        if (
+                first_part in (os.pardir, '__pycache__')
+                or first_part.endswith(('.dist-info', '.data', '.pth'))
+        ):
+            # scripts, metadata, etc.
+            continue
+        if not sep:
+            # top-level module file (e.g., "six.py" or an extension
+            # module like "_cffi_backend.cpython-311-darwin.so")
+            first_part = first_part.split('.', maxsplit=1)[0]
+        names.add(first_part)
+    _TOP_LEVEL_NAMES[key] = (mtime, names)
+    return names
+
+
+def _read_dependencies(dist_info):
+    """
+    Get the names of a distribution's (possible) dependencies.
+
+    Requirements for optional features ("extras") are included, since
+    it's unknown which extras were requested when the distribution was
+    installed, as are requirements whose environment markers apply to
+    the current environment.
+
+    Parameters
+    ----------
+    dist_info : pathlib.Path
+        The distribution's `.dist-info` directory.
+
+    Returns
+    -------
+    set of str
+        The canonicalized names of the distribution's dependencies.
+    """
+    from packaging.markers import (
+        UndefinedComparison,
+        UndefinedEnvironmentName
+    )
+    from packaging.requirements import InvalidRequirement, Requirement
+    from packaging.utils import canonicalize_name
+
+    extras = ['']
+    requirements = []
+    metadata_path = dist_info.joinpath('METADATA')
+    try:
+        with metadata_path.open(encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip():
+                    # end of headers
+                    break
+                if line.startswith('Provides-Extra:'):
+                    extras.append(line[15:].strip())
+                elif line.startswith('Requires-Dist:'):
+                    requirements.append(line[14:].strip())
+    except OSError:
+        return set()
+    dependencies = set()
+    for req_str in requirements:
+        try:
+            req = Requirement(req_str)
+        except InvalidRequirement:
+            continue
+        if req.marker is not None:
+            try:
+                applies = any(req.marker.evaluate({'extra': extra})
+                              for extra in extras)
+            except (UndefinedComparison, UndefinedEnvironmentName):
+                # keep the dependency if in doubt
+                applies = True
+            if not applies:
+                continue
+        dependencies.add(canonicalize_name(req.name))
+    return dependencies
+
+
+def collect_garbage(project, days, dry_run=False):
+    """
+    Remove distributions a project hasn't used recently.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project to remove distributions from.
+    days : int or float
+        Distributions not imported within this many days are removed,
+        unless required by a distribution that was.
+    dry_run : bool, optional
+        If `True` (default: `False`), report which distributions would
+        be removed without removing them.
+
+    Returns
+    -------
+    list of tuple
+        The name (`str`), version (`str`), and disk space freed in bytes
+        (`int`) by removing each removed distribution (or each that
+        would be removed, if `dry_run` is `True`).
+
+    Notes
+    -----
+    A distribution counts as used when a module from it is loaded from
+    the project (i.e., when it's smuggled, or imported by a package that
+    is) or when it's installed, whichever was more recent. Only
+    distributions installed from wheels (which have a `.dist-info`
+    directory and `RECORD` file) are removed.
+
+    Distributions' files are usually hard linked to the package store
+    (see `davos.core.store`), so removing them from the project alone
+    doesn't free any space. After they're removed, their entries in the
+    store are removed too, unless other projects still use them. Only
+    files left with no remaining links count toward the space freed.
+    """
+    # imported here to avoid circular imports
+    from packaging.utils import canonicalize_name
+    from davos.core.catalog import distribution_last_imported, record_install
+    from davos.core.lockfile import update_notebook_lockfile
+    from davos.core.store import _store_available, _unlink_dist, prune_store
+
+    if days < 0:
+        raise ValueError("'days' must not be negative")
+    # make sure modules imported in the current session are counted
+    flush_imports(project)
+    last_imported = distribution_last_imported(project.safe_name)
+    cutoff = time.time() - days * 24 * 60 * 60
+    # canonical names of installed distributions -> (.dist-info
+    # directory, name, version)
+    installed = {}
+    in_use = []
+    for dist_info in project.site_packages_dir.glob('*.dist-info'):
+        name_version = _read_dist_name_version(dist_info)
+        if name_version is None:
+            continue
+        key = canonicalize_name(name_version[0])
+        installed[key] = (dist_info, *name_version)
+        try:
+            last_used = max(last_imported.get(key, 0),
+                            dist_info.stat().st_mtime)
+        except OSError:
+            continue
+        if last_used >= cutoff:
+            in_use.append(key)
+    # keep distributions required (directly or indirectly) by those in
+    # use
+    keep = set()
+    while in_use:
+        key = in_use.pop()
+        if key in keep or key not in installed:
+            continue
+        keep.add(key)
+        in_use.extend(_read_dependencies(installed[key][0]))
+
+    store_available = _store_available(project.project_dir)
+    # RECORD files of the removed distributions, which identify the
+    # stored distributions they're linked to
+    removed_records = set()
+    removed = []
+    for key in sorted(installed.keys() - keep):
+        dist_info, name, version = installed[key]
+        try:
+            record_stat = dist_info.joinpath('RECORD').stat()
+        except OSError:
+            continue
+        # if the distribution's only other link is the store, its store
+        # entry will be removed along with it
+        if store_available and record_stat.st_nlink == 2:
+            max_links = 2
+        else:
+            max_links = 1
+        size = 0
+        for path in _dist_files(dist_info):
+            try:
+                file_stat = os.lstat(dist_info.parent.joinpath(path))
+            except OSError:
+                continue
+            if file_stat.st_nlink <= max_links:
+                size += file_stat.st_size
+        removed.append((name, version, size))
+        if not dry_run:
+            removed_records.add((record_stat.st_dev, record_stat.st_ino))
+            _unlink_dist(dist_info, project.project_dir)
+    if removed and not dry_run:
+        prune_store(removed_records)
+        invalidate_path_caches(project.site_packages_dir)
+        record_install(project)
+        update_notebook_lockfile(project)
+    if not config.suppress_stdout:
+        verb = 'Would remove' if dry_run else 'Removed'
+        for name, version, size in removed:
+            print(f'{verb} {name}-{version} ({size} bytes)')
+        total = sum(size for _, _, size in removed)
+        freed = 'would be freed' if dry_run else 'freed'
+        print(f'{len(removed)} distribution(s), {total} bytes {freed}')
+    return removed
+
+
+def flush_imports(project):
+    """
+    Record imports of a project's distributions in the project catalog.
+
+    Marks the distributions whose modules were loaded from the project
+    since the last time this was called as just used. Called after
+    each `smuggle` statement that uses a project.
+
+    Parameters
+    ----------
+    project : davos.core.project.Project
+        The project modules were loaded from.
+    """
+    # imported here to avoid circular imports
+    from packaging.utils import canonicalize_name
+    from davos.core.catalog import record_imports
+
+    site_packages_dir = project.site_packages_dir
+    module_names = project_finder.imported_modules.pop(str(site_packages_dir),
+                                                       None)
+    if not module_names:
+        return
+    dist_names = []
+    for dist_info in site_packages_dir.glob('*.dist-info'):
+        if _dist_top_level_names(dist_info) & module_names:
+            name_version = _read_dist_name_version(dist_info)
+            if name_version is not None:
+                dist_names.append(canonicalize_name(name_version[0]))
+    if dist_names:
+        record_imports(project, dist_names)
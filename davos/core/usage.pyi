@@ -0,0 +1,14 @@
+from pathlib import PosixPath
+from typing import Literal
+
+from davos.core.project import Project
+
+__all__ = list[Literal['collect_garbage', 'flush_imports']]
+
+_TOP_LEVEL_NAMES: dict[str, tuple[float, set[str]]]
+
+def _dist_files(dist_info: PosixPath) -> list[str]: ...
+def _dist_top_level_names(dist_info: PosixPath) -> set[str]: ...
+def _read_dependencies(dist_info: PosixPath) -> set[str]: ...
+def collect_garbage(project: Project, days: float, dry_run: bool = ...) -> list[tuple[str, str, int]]: ...
+def flush_imports(project: Project) -> None: ...
@@ -54,9 +54,8 @@ if import_environment == 'Python':
     # noinspection PyUnresolvedReferences
     from davos.implementations.python import (
         _activate_helper,
-        _check_conda_avail_helper,
         _deactivate_helper,
-        _run_shell_command_helper,
+        _display_progress_helper,
         auto_restart_rerun,
         generate_parser_func,
         prompt_restart_rerun_buttons
@@ -64,8 +63,7 @@ if import_environment == 'Python':
 else:
     # noinspection PyUnresolvedReferences
     from davos.implementations.ipython_common import (
-        _check_conda_avail_helper,
-        _run_shell_command_helper,
+        _display_progress_helper,
         _set_custom_showsyntaxerror
     )
 
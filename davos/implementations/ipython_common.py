@@ -8,107 +8,45 @@ __all__ = []
 
 import sys
 import textwrap
-from contextlib import redirect_stdout
-from io import StringIO
-from pathlib import Path
-from subprocess import CalledProcessError
 
-from IPython.utils.process import system as _run_shell_cmd
+from IPython.display import display, Pretty
 
 from davos import config
 from davos.core.exceptions import DavosParserError
 
 
-def _check_conda_avail_helper():
+def _display_progress_helper(text, display_handle=None, final=False):
     """
-    Check whether the `conda` executable is available.
+    Create or update a single-line progress display.
 
     `IPython` implementation of the helper function for
-    `davos.core.core.check_conda`. Runs a command shell (`conda list
-    IPython`) whose stdout contains the path to the current conda
-    environment, which can be parsed by the main `check_conda` function.
-    Uses the `%conda` IPython line magic, if available (usually if
-    `IPython>=7.3`). Otherwise, looks for `conda` history file and runs
-    some logic to determine whether -- if the `conda` exe is available,
-    whether `davos` is running from the base environment or not, and if
-    not, passes the `--prefix` to the command. If successful, returns
-    the (suppressed) stdout generated by the command. Otherwise, returns
-    `None`.
-
-    Returns
-    -------
-    str or None
-        If the command runs successfully, the captured stdout.
-        Otherwise, `None`.
-
-    See Also
-    --------
-    davos.core.core.check_conda : core function that calls this helper.
-    """
-    if 'conda' in set(config._ipython_shell.magics_manager.magics['line']):
-        # if the %conda line magic is available (IPython>=7.3), use that
-        # directly
-        try:
-            with redirect_stdout(StringIO()) as conda_list_output:
-                config._ipython_shell.run_line_magic('conda', 'list IPython')
-        except ValueError:
-            # kernel is not running within a conda environment
-            return None
-
-    else:
-        conda_history_path = Path(sys.prefix, "conda-meta", "history")
-        # if conda history file doesn't exist at this location, davos
-        # isn't running in a conda environment
-        if not conda_history_path.is_file():
-            return None
-
-        cmd = "conda list IPython"
-        # location we'd expect to find conda executable if davos is
-        # running in the 'base' environment (and no prefix is needed)
-        base_exe_loc = Path(sys.executable).parent.joinpath('conda')
-
-        if not base_exe_loc.is_file():
-            cmd += f" --prefix {sys.prefix}"
-
-        with redirect_stdout(StringIO()) as conda_list_output:
-            _run_shell_cmd(cmd)
-
-    return conda_list_output.getvalue()
-
-
-def _run_shell_command_helper(command):
-    """
-    Run a shell command in a subprocess, piping stdout & stderr.
-
-    `IPython` implementation of helper function for
-    `davos.core.core.run_shell_command`. stdout & stderr streams are
-    captured or suppressed by the outer function. If the command runs
-    successfully, return its exit status (`0`). Otherwise, raise an
-    error.
+    `davos.core.core.capture_progress`. The first call creates a new
+    display in the cell's output area and returns a handle to it.
+    Subsequent calls that pass the handle replace the display's contents
+    in place, so the output area only ever contains one line of progress
+    text regardless of how many updates are rendered.
 
     Parameters
     ----------
-    command : str
-        The command to execute.
+    text : str
+        The progress message to display.
+    display_handle : IPython.display.DisplayHandle, optional
+        The handle returned by a previous call. If `None` (default), a
+        new display is created.
+    final : bool, optional
+        Whether this is the last update for the display. Has no effect
+        in `IPython` environments; exists to match the signature of
+        the pure Python implementation.
 
     Returns
     -------
-    int
-        The exit code of the command. This will always be `0` if the
-        function returns. Otherwise, an error is raised.
-
-    Raises
-    ------
-    subprocess.CalledProcessError :
-        If the command returned a non-zero exit status.
-
-    See Also
-    --------
-    IPython.utils.process.system : `IPython` shell command runner.
+    IPython.display.DisplayHandle
+        The handle for the (new or updated) display.
     """
-    retcode = _run_shell_cmd(command)
-    if retcode != 0:
-        raise CalledProcessError(returncode=retcode, cmd=command)
+    if display_handle is None:
+        return display(Pretty(text), display_id=True)
+    display_handle.update(Pretty(text))
+    return display_handle
 
 
 def _set_custom_showsyntaxerror():
@@ -8,8 +8,6 @@ import sys
 import time
 from textwrap import dedent
 
-import ipykernel
-import zmq
 from IPython.display import display, Javascript
 
 from davos import config
@@ -160,6 +158,11 @@ def prompt_restart_rerun_buttons(pkgs):
         displayButtonPrompt(buttonArgs, true);
     """)
 
+    # imported here rather than at the module level since they're only
+    # needed if the user has to be prompted to restart the kernel
+    import ipykernel
+    import zmq
+
     # get_ipython() exists globally when imported into IPython context
     kernel = get_ipython().kernel
     stdin_sock = kernel.stdin_socket
@@ -13,13 +13,7 @@ __all__ = [
 ]
 
 
-import locale
-import shlex
-import signal
 import sys
-from contextlib import redirect_stdout
-from io import StringIO
-from subprocess import CalledProcessError, PIPE, Popen
 
 
 # noinspection PyUnusedLocal
@@ -49,42 +43,6 @@ def _activate_helper(smuggle_func, parser_func):
     )
 
 
-def _check_conda_avail_helper():
-    """
-    Check whether the `conda` executable is available.
-
-    Pure Python implementation of helper function for
-    `davos.core.core.check_conda`. Tries to access the `conda`
-    executable by running `conda list IPython`. If successful, returns
-    the (suppressed) stdout generated by the command. Otherwise, returns
-    `None`.
-
-    Returns
-    -------
-    str or None
-        If `conda list IPython` executes successfully, the captured
-        stdout. Otherwise, `None`.
-
-    Raises
-    ------
-    subprocess.CalledProcessError
-        If the `conda` executable is not available.
-
-    See Also
-    --------
-    davos.core.core.check_conda : core function that calls this helper.
-    """
-    try:
-        with redirect_stdout(StringIO()) as conda_list_output:
-            # using `conda list` instead of a more straightforward
-            # command so stdout is formatted the same as the IPython
-            # implementation (which must use `conda list`)
-            _run_shell_command_helper('conda list Python')
-    except CalledProcessError:
-        return None
-    return conda_list_output.getvalue()
-
-
 # noinspection PyUnusedLocal
 def _deactivate_helper(smuggle_func, parser_func):
     """
@@ -108,51 +66,39 @@ def _deactivate_helper(smuggle_func, parser_func):
     )
 
 
-def _run_shell_command_helper(command):
+def _display_progress_helper(text, display_handle=None, final=False):
     """
-    Run a shell command in a subprocess, piping stdout & stderr.
+    Create or update a single-line progress display.
 
-    Pure Python implementation of helper function for
-    `davos.core.core.run_shell_command`. stdout & stderr streams are
-    captured or suppressed by the outer function. If the command runs
-    successfully, return its exit status (`0`). Otherwise, raise an
-    error.
+    Pure Python implementation of the helper function for
+    `davos.core.core.capture_progress`. Writes `text` to stderr preceded
+    by a carriage return, so each update overwrites the previous one on
+    the same terminal line.
 
     Parameters
     ----------
-    command : str
-        The command to execute.
+    text : str
+        The progress message to display.
+    display_handle : int, optional
+        The length of the previously displayed message, used to blank
+        out any leftover characters when the new message is shorter. If
+        `None` (default), nothing has been displayed yet.
+    final : bool, optional
+        If `True` (default: `False`), end the line after writing `text`
+        so subsequent output starts on a new line.
 
     Returns
     -------
     int
-        The exit code of the command. This will always be `0` if the
-        function returns. Otherwise, an error is raised.
-
-    Raises
-    ------
-    subprocess.CalledProcessError :
-        If the command returned a non-zero exit status.
+        The length of the displayed message, to be passed as
+        `display_handle` to the next call.
     """
-    cmd = shlex.split(command)
-    process = Popen(cmd,    # pylint: disable=consider-using-with
-                    stdout=PIPE,
-                    stderr=PIPE,
-                    encoding=locale.getpreferredencoding())
-    try:
-        while True:
-            retcode = process.poll()
-            if retcode is None:
-                output = process.stdout.readline()
-                if output:
-                    sys.stdout.write(output)
-            elif retcode != 0:
-                # processed returned with non-zero exit status
-                raise CalledProcessError(returncode=retcode, cmd=cmd)
-    except KeyboardInterrupt:
-        # forward CTRL + C to process before raising
-        process.send_signal(signal.SIGINT)
-        raise
+    padding = ' ' * max((display_handle or 0) - len(text), 0)
+    sys.stderr.write(f'\r{text}{padding}')
+    if final:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+    return len(text)
 
 
 # noinspection PyUnusedLocal
@@ -185,8 +131,11 @@ def generate_parser_func(line_parser):
     """
     Pure Python implementation of `generate_parser_func`.
 
-    Raises `NotImplementedError` whenever called, as `davos` does not
-    yet support non-interactive Python environments.
+    Returns a parser function that raises `NotImplementedError`
+    whenever called, as `davos` does not yet support non-interactive
+    Python environments. The error is deferred until the parser is
+    called (rather than raised here) so that `davos` can still be
+    imported outside `IPython` to manage projects.
 
     Parameters
     ----------
@@ -194,14 +143,18 @@ def generate_parser_func(line_parser):
         Function that parses a single line of user code (typically,
         `davos.core.core.parse_line`).
 
-    Raises
+    Returns
     -------
-    NotImplementedError
-        In all cases.
+    callable
+        A placeholder parser that raises `NotImplementedError` whenever
+        called.
     """
-    raise NotImplementedError(
-        "davos does not yet support non-interactive Python environments"
-    )
+    def full_parser(lines):
+        raise NotImplementedError(
+            "davos does not yet support non-interactive Python environments"
+        )
+
+    return full_parser
 
 
 # noinspection PyUnusedLocal
@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from typing import Literal, NoReturn
 from davos.core.core import SmuggleFunc
 from davos.implementations import LineParserFunc
@@ -5,9 +6,8 @@ from davos.implementations import LineParserFunc
 __all__ = list[Literal['auto_restart_rerun', 'generate_parser_func', 'prompt_restart_rerun_buttons']]
 
 def _activate_helper(smuggle_func: SmuggleFunc, parser_func: LineParserFunc) -> NoReturn: ...
-def _check_conda_avail_helper() -> str | None: ...
 def _deactivate_helper(smuggle_func: SmuggleFunc, parser_func: LineParserFunc) -> NoReturn: ...
-def _run_shell_command_helper(command: str) -> None: ...
+def _display_progress_helper(text: str, display_handle: int | None = ..., final: bool = ...) -> int: ...
 def auto_restart_rerun(pkgs: list[str]) -> NoReturn: ...
-def generate_parser_func(line_parser: LineParserFunc) -> NoReturn: ...
+def generate_parser_func(line_parser: LineParserFunc) -> Callable[[list[str]], NoReturn]: ...
 def prompt_restart_rerun_buttons(pkgs: list[str]) -> NoReturn: ...
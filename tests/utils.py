@@ -1,16 +1,20 @@
 """shared utilities for davos tests"""
 
 import ast
+import base64
 import functools
+import hashlib
 import html
 import inspect
 import os
 import re
+import shutil
 import signal
 import sys
 import types
 from collections.abc import Sequence
 from contextlib import redirect_stdout
+from pathlib import Path
 
 # use typing generics for compatibility with Python 3.6
 from typing import (
@@ -110,6 +114,52 @@ def expected_parser_output(
     return expected
 
 
+def fake_install_dist(
+        site_packages_dir: Path,
+        dist_name: str,
+        version: str = '1.0',
+        files: Optional[Dict[str, str]] = None,
+        requires: Sequence[str] = ()
+) -> Path:
+    # simulates pip installing (or upgrading to) `version` of a
+    # distribution whose top-level package is `dist_name`
+    for old_dist_info in site_packages_dir.glob(f'{dist_name}-*.dist-info'):
+        shutil.rmtree(old_dist_info)
+    dist_info = site_packages_dir.joinpath(f'{dist_name}-{version}.dist-info')
+    dist_info.mkdir(parents=True)
+    metadata_text = (
+        f"Metadata-Version: 2.1\nName: {dist_name.replace('_', '-')}\n"
+        f"Version: {version}\n"
+    )
+    for req in requires:
+        metadata_text += f"Requires-Dist: {req}\n"
+    if files is None:
+        files = {f'{dist_name}/__init__.py': 'x = 1\n'}
+    files = {
+        **files,
+        f'{dist_info.name}/METADATA': metadata_text + '\n',
+        f'{dist_info.name}/WHEEL': (
+            "Wheel-Version: 1.0\nRoot-Is-Purelib: true\nTag: py3-none-any\n"
+        )
+    }
+    record_lines = []
+    for rel_path, content in files.items():
+        path = site_packages_dir.joinpath(rel_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            # don't modify a previous version's file in the package store
+            path.unlink()
+        data = content.encode()
+        path.write_bytes(data)
+        digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest())
+        record_lines.append(
+            f'{rel_path},sha256={digest.rstrip(b"=").decode()},{len(data)}'
+        )
+    record_lines.append(f'{dist_info.name}/RECORD,,')
+    dist_info.joinpath('RECORD').write_text('\n'.join(record_lines) + '\n')
+    return dist_info
+
+
 def format_traceback(err: _E) -> str:
     tb_formatter = FormattedTB('Context', 'NoColor')
     structured_tb: List[str] = tb_formatter.structured_traceback(